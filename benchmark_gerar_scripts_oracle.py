@@ -0,0 +1,325 @@
+# Benchmark do gerar_scripts_oracle.py
+# Gera planilhas sintéticas (xlsx e CSV) com dados típicos das incorporações e mede cada etapa do pipeline.
+#
+# Uso:
+#   python benchmark_gerar_scripts_oracle.py                          (tamanhos e formatos padrão)
+#   python benchmark_gerar_scripts_oracle.py --linhas 10000 100000 --formatos csv
+#   python benchmark_gerar_scripts_oracle.py --comparar resultados_benchmark/a.json resultados_benchmark/b.json
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+
+import openpyxl
+
+import gerar_scripts_oracle as gso
+
+# --- Configurações do benchmark ---
+TAMANHOS_PADRAO = [10000, 100000, 1000000, 5000000]
+FORMATOS_PADRAO = ['excel', 'csv']
+SEMENTE = 20240601  # Mesma semente = mesmos dados em qualquer máquina/versão
+PASTA_DADOS_BENCHMARK = 'dados_benchmark'  # Arquivos gerados são reaproveitados entre execuções
+PASTA_RESULTADOS_BENCHMARK = 'resultados_benchmark'
+LIMITE_LINHAS_EXCEL = 1048576 - 1  # Limite de linhas do Excel menos o cabeçalho; acima disso só CSV
+PERCENTUAL_VAZIOS = 0.05
+TOLERANCIA_REGRESSAO = 0.10  # Na comparação, quedas de vazão/aumentos de memória acima disso são sinalizados
+
+# As etapas rodam cumulativamente (cada uma inclui as anteriores, pois o pipeline é em streaming);
+# o tempo de cada etapa é a diferença para a etapa anterior.
+ETAPAS = ['leitura', 'normalizacao', 'inferencia', 'gravacao_csv', 'geracao_scripts']
+
+# --- Gerador de dados sintéticos ---
+# "Código do Plano" repetido de propósito (cabeçalho duplicado)
+CABECALHO = ['Nome do Beneficiário', 'CPF', 'Código do Plano', 'Data de Nascimento', 'Valor da Mensalidade',
+             'Situação', 'Município', 'Nº da Carteirinha', 'Observação', 'Código do Plano', 'Titular']
+NOMES = ['José', 'João', 'Maria', 'Conceição', 'Ângela', 'Antônio', 'Fábio', 'Inês', 'Luíza', 'Raimundo',
+         'Sebastião', 'Cecília', 'Mônica', 'Heitor', 'Gonçalo', 'Iara', 'Otávio', 'Lúcia', 'Cláudio', 'Débora']
+SOBRENOMES = ['Silva', 'Araújo', 'Magalhães', 'Conceição', 'Gonçalves', 'Simões', 'Lôbo', 'Brandão',
+              'Guimarães', 'Ribeiro', 'Cavalcanti', 'Assunção', 'Feitosa', 'Bezerra', 'Nóbrega', 'Sá']
+MUNICIPIOS = ['Fortaleza', 'São Paulo', 'Maceió', 'Goiânia', 'Belém', 'Ribeirão Preto', 'Jaboatão dos Guararapes',
+              'Vitória da Conquista', 'Juazeiro do Norte', "Santa Bárbara d'Oeste", 'São Luís', 'João Pessoa']
+SITUACOES = ['Ativo', 'Suspenso', 'Cancelado', 'Em análise', 'Inadimplência', 'Carência']
+TRECHO_OBSERVACAO = 'Beneficiário com pendência de documentação; aguardando análise da operação. '
+
+
+def gerar_linha_sintetica(rng):
+    observacao = None
+    sorteio_observacao = rng.random()
+    if sorteio_observacao < 0.02:
+        observacao = TRECHO_OBSERVACAO * rng.randint(40, 80)  # Texto longo: passa de 4000 bytes (CLOB)
+    elif sorteio_observacao < 0.15:
+        observacao = TRECHO_OBSERVACAO.strip()
+    linha = [
+        f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+        f"{rng.randrange(10 ** 11):011d}",  # Código numérico com zeros à esquerda
+        rng.randrange(1000, 99999) if rng.random() < 0.7 else f"PL-{rng.randrange(1000, 9999)}",  # Misto
+        date(1940, 1, 1) + timedelta(days=rng.randrange(30000)),
+        round(rng.uniform(50, 5000), 2),
+        rng.choice(SITUACOES),
+        rng.choice(MUNICIPIOS),
+        f"{rng.randrange(10 ** 17):017d}",
+        observacao,
+        f"{rng.randrange(100, 999)}{rng.choice('ABC')}",
+        rng.random() < 0.5,
+    ]
+    for idx in range(1, len(linha)):
+        if rng.random() < PERCENTUAL_VAZIOS:
+            linha[idx] = None
+    return linha
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'S' if valor else 'N'
+    if isinstance(valor, date):
+        return valor.strftime('%d/%m/%Y')
+    return valor
+
+
+def gerar_arquivo_sintetico(formato, num_linhas, pasta=None):
+    pasta = pasta or PASTA_DADOS_BENCHMARK
+    os.makedirs(pasta, exist_ok=True)
+    extensao = 'xlsx' if formato == 'excel' else 'csv'
+    caminho = os.path.abspath(os.path.join(pasta, f"bench_{num_linhas}_{SEMENTE}.{extensao}"))
+    if os.path.exists(caminho):
+        return caminho
+
+    rng = random.Random(SEMENTE)
+    caminho_tmp = f"{caminho}.tmp"
+    inicio = time.perf_counter()
+    if formato == 'excel':
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet('Beneficiários')
+        sheet.append(CABECALHO)
+        for _ in range(num_linhas):
+            sheet.append(gerar_linha_sintetica(rng))
+        workbook.save(caminho_tmp)
+    else:
+        with open(caminho_tmp, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, delimiter=gso.DELIMITADOR_ENTRADA_CSV)
+            writer.writerow(CABECALHO)
+            for _ in range(num_linhas):
+                writer.writerow([_valor_csv(valor) for valor in gerar_linha_sintetica(rng)])
+    os.replace(caminho_tmp, caminho)
+    print(f"Arquivo sintético gerado: {caminho} ({time.perf_counter() - inicio:.1f}s)")
+    return caminho
+
+
+# --- Etapas medidas ---
+def _consumir(linhas):
+    for _ in linhas:
+        pass
+
+
+def _etapa_leitura(caminho_arquivo, tipo_arquivo):
+    if tipo_arquivo == 'excel':
+        _consumir(gso.ler_linhas_excel(caminho_arquivo))
+    else:
+        _consumir(gso.ler_blocos_csv(caminho_arquivo))
+
+
+def _etapa_normalizacao(caminho_arquivo, tipo_arquivo):
+    _, linhas = gso.ler_linhas_normalizadas(caminho_arquivo, tipo_arquivo)
+    _consumir(linhas)
+
+
+def _etapa_inferencia(caminho_arquivo, tipo_arquivo):
+    nomes_colunas, linhas = gso.ler_linhas_normalizadas(caminho_arquivo, tipo_arquivo)
+    estatisticas_por_coluna = [gso.novas_estatisticas_coluna() for _ in nomes_colunas]
+    for linha in linhas:
+        for estatisticas, valor in zip(estatisticas_por_coluna, linha):
+            gso.atualizar_estatisticas_coluna(estatisticas, valor)
+    gso.montar_ddl_colunas(nomes_colunas, estatisticas_por_coluna)
+
+
+def _etapa_gravacao_csv(caminho_arquivo, tipo_arquivo):
+    if tipo_arquivo == 'excel':
+        gso.processar_excel_streaming(caminho_arquivo)
+    else:
+        gso.processar_csv_em_blocos(caminho_arquivo)
+
+
+def _etapa_geracao_scripts(caminho_arquivo, tipo_arquivo):
+    gso.gerar_scripts_execucao(gso.gerar_scripts_oracle(caminho_arquivo, tipo_arquivo))
+
+
+FUNCOES_ETAPAS = {
+    'leitura': _etapa_leitura,
+    'normalizacao': _etapa_normalizacao,
+    'inferencia': _etapa_inferencia,
+    'gravacao_csv': _etapa_gravacao_csv,
+    'geracao_scripts': _etapa_geracao_scripts,
+}
+
+
+def _executar_etapa(etapa, caminho_arquivo, tipo_arquivo, pasta_trabalho, motor_leitura=None):
+    # Roda num processo novo: cache de normalização vazio e pico de memória só desta etapa
+    gso.CACHE_LEITURA = False  # Mede sempre a leitura de verdade, não o cache das repetições anteriores
+    if motor_leitura:
+        gso.MOTOR_LEITURA_EXCEL = motor_leitura
+    os.makedirs(pasta_trabalho, exist_ok=True)
+    os.chdir(pasta_trabalho)
+    inicio = time.perf_counter()
+    FUNCOES_ETAPAS[etapa](caminho_arquivo, tipo_arquivo)
+    tempo = time.perf_counter() - inicio
+    return {
+        'tempo_acumulado_s': tempo,
+        'pico_memoria_mb': gso.pico_memoria_mb(),
+        'cache_normalizacao': gso.estatisticas_cache_normalizacao(),
+    }
+
+
+def medir_arquivo(formato, num_linhas, repeticoes=1, motor_leitura=None):
+    caminho_arquivo = gerar_arquivo_sintetico(formato, num_linhas)
+    tamanho_bytes = os.path.getsize(caminho_arquivo)
+    pasta_trabalho = os.path.abspath(os.path.join(PASTA_DADOS_BENCHMARK, f"trabalho_{formato}_{num_linhas}"))
+    contexto = multiprocessing.get_context('spawn')  # Igual ao Windows em qualquer plataforma
+
+    etapas = {}
+    tempo_anterior = 0.0
+    for etapa in ETAPAS:
+        medicoes = []
+        for _ in range(repeticoes):
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+                medicoes.append(executor.submit(_executar_etapa, etapa, caminho_arquivo, formato,
+                                                pasta_trabalho, motor_leitura).result())
+        medicao = min(medicoes, key=lambda m: m['tempo_acumulado_s'])  # Melhor de N
+        tempo_etapa = max(medicao['tempo_acumulado_s'] - tempo_anterior, 0.0)
+        tempo_anterior = medicao['tempo_acumulado_s']
+        medicao['tempo_s'] = tempo_etapa
+        medicao['linhas_por_s'] = num_linhas / medicao['tempo_acumulado_s'] if medicao['tempo_acumulado_s'] else None
+        medicao['mb_por_s'] = (tamanho_bytes / (1024 * 1024)) / medicao['tempo_acumulado_s'] \
+            if medicao['tempo_acumulado_s'] else None
+        etapas[etapa] = medicao
+        print(f"  {formato:5} {num_linhas:>9} linhas | {etapa:16} {tempo_etapa:8.2f}s "
+              f"(acumulado {medicao['tempo_acumulado_s']:8.2f}s, pico {medicao['pico_memoria_mb'] or 0:8.1f} MB)")
+
+    return {
+        'formato': formato,
+        'linhas': num_linhas,
+        'colunas': len(CABECALHO),
+        'tamanho_arquivo_mb': tamanho_bytes / (1024 * 1024),
+        'motor_leitura': gso.escolher_motor_leitura(caminho_arquivo, motor_leitura) if formato == 'excel' else None,
+        'etapas': etapas,
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(gso.__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _versao_script():
+    with open(gso.__file__, encoding='utf-8') as f:
+        primeira_linha = f.readline().strip()
+    return primeira_linha.split(':', 1)[1].strip() if primeira_linha.startswith('# Versão:') else None
+
+
+def executar_benchmark(tamanhos=None, formatos=None, repeticoes=1, arquivo_saida=None, motor_leitura=None):
+    tamanhos = tamanhos or TAMANHOS_PADRAO
+    formatos = formatos or FORMATOS_PADRAO
+    resultados = []
+    for num_linhas in tamanhos:
+        for formato in formatos:
+            if formato == 'excel' and num_linhas > LIMITE_LINHAS_EXCEL:
+                print(f"  excel {num_linhas:>9} linhas | ignorado: acima do limite de linhas do Excel")
+                continue
+            resultados.append(medir_arquivo(formato, num_linhas, repeticoes, motor_leitura))
+
+    relatorio = {
+        'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'versao_script': _versao_script(),
+        'commit': _commit_atual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': SEMENTE,
+        'repeticoes': repeticoes,
+        'resultados': resultados,
+    }
+    if not arquivo_saida:
+        os.makedirs(PASTA_RESULTADOS_BENCHMARK, exist_ok=True)
+        arquivo_saida = os.path.join(
+            PASTA_RESULTADOS_BENCHMARK,
+            f"benchmark_{relatorio['commit'] or 'sem_commit'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(arquivo_saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em: {arquivo_saida}")
+    return relatorio
+
+
+def verificar_paridade(tamanhos=None):
+    # Confere que todos os motores de leitura instalados produzem o mesmo CSV para a planilha sintética
+    identicos = True
+    for num_linhas in tamanhos or TAMANHOS_PADRAO:
+        if num_linhas > LIMITE_LINHAS_EXCEL:
+            continue
+        resultado = gso.verificar_paridade_motores(gerar_arquivo_sintetico('excel', num_linhas))
+        print(f"  excel {num_linhas:>9} linhas | motores {', '.join(resultado['motores'])}: "
+              f"{'idênticos' if resultado['identicos'] else 'DIVERGENTES'}")
+        for divergencia in resultado['divergencias']:
+            print(f"    linha {divergencia['linha']}: {divergencia['valores']}")
+        identicos = identicos and resultado['identicos']
+    return identicos
+
+
+def comparar_resultados(arquivo_base, arquivo_novo, tolerancia=None):
+    # Compara vazão (linhas/s acumuladas) e pico de memória por formato/tamanho/etapa
+    tolerancia = TOLERANCIA_REGRESSAO if tolerancia is None else tolerancia
+    with open(arquivo_base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(arquivo_novo, encoding='utf-8') as f:
+        novo = json.load(f)
+    indice_base = {(r['formato'], r['linhas']): r for r in base['resultados']}
+
+    regressoes = []
+    print(f"Base: {base.get('commit')} ({base['data']})  x  Novo: {novo.get('commit')} ({novo['data']})")
+    for resultado in novo['resultados']:
+        anterior = indice_base.get((resultado['formato'], resultado['linhas']))
+        if not anterior:
+            continue
+        for etapa, medicao in resultado['etapas'].items():
+            medicao_base = anterior['etapas'].get(etapa)
+            if not medicao_base or not medicao_base.get('linhas_por_s') or not medicao.get('linhas_por_s'):
+                continue
+            razao_vazao = medicao['linhas_por_s'] / medicao_base['linhas_por_s']
+            razao_memoria = (medicao['pico_memoria_mb'] / medicao_base['pico_memoria_mb']
+                             if medicao.get('pico_memoria_mb') and medicao_base.get('pico_memoria_mb') else None)
+            regrediu = razao_vazao < 1 - tolerancia or (razao_memoria is not None and razao_memoria > 1 + tolerancia)
+            if regrediu:
+                regressoes.append((resultado['formato'], resultado['linhas'], etapa))
+            texto_memoria = f"{razao_memoria:6.2f}x" if razao_memoria is not None else "   n/d"
+            print(f"  {resultado['formato']:5} {resultado['linhas']:>9} {etapa:16} "
+                  f"vazão {razao_vazao:6.2f}x  memória {texto_memoria}{'  <-- REGRESSÃO' if regrediu else ''}")
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do gerar_scripts_oracle.py com dados sintéticos.")
+    parser.add_argument('--linhas', type=int, nargs='+', help=f"Tamanhos em linhas (padrão: {TAMANHOS_PADRAO})")
+    parser.add_argument('--formatos', nargs='+', choices=FORMATOS_PADRAO, help="Formatos de entrada (padrão: ambos)")
+    parser.add_argument('--repeticoes', type=int, default=1, help="Execuções por etapa; vale a mais rápida")
+    parser.add_argument('--saida', help="Arquivo JSON de resultados")
+    parser.add_argument('--motor', choices=['auto', *gso.MOTORES_LEITURA_EXCEL],
+                        help="Motor de leitura das planilhas (padrão: MOTOR_LEITURA_EXCEL do script)")
+    parser.add_argument('--paridade', action='store_true',
+                        help="Só confere se os motores de leitura instalados geram o mesmo CSV")
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NOVO'), help="Compara dois JSONs de resultados")
+    args = parser.parse_args()
+
+    if args.comparar:
+        exit(1 if comparar_resultados(*args.comparar) else 0)
+    if args.paridade:
+        exit(0 if verificar_paridade(args.linhas) else 1)
+    executar_benchmark(args.linhas, args.formatos, args.repeticoes, args.saida, args.motor)
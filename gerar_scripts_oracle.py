@@ -1,19 +1,62 @@
 # Versão: 3.9
 import pandas as pd
+import numpy as np
 import os
 import re
-from datetime import datetime
+import array
+import csv
+import contextlib
+import cProfile
+import functools
+import glob
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import multiprocessing
+import pickle
+import shutil
+from datetime import datetime, date
 import openpyxl
+import pstats
+import sys
 import unicodedata  # Para normalização de caracteres
 import logging
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+try:
+    import oracledb  # Opcional: só é necessário para a carga direta pelo Python (MODO_CARGA = 'python')
+except ImportError:
+    oracledb = None
+
+try:
+    from python_calamine import CalamineWorkbook  # Opcional: motor de leitura em Rust (xlsx/xlsm/xlsb/xls/ods)
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    import resource  # Pico de memória (RSS) em Linux/macOS
+except ImportError:
+    resource = None
+
+try:
+    import psutil  # Opcional: pico de memória no Windows
+except ImportError:
+    psutil = None
 
 # --- Configuração de Logging ---
 LOG_FILE = 'script_execution.log'
-# Zera o arquivo de log ao iniciar o script
-with open(LOG_FILE, 'w') as f:
-    f.write('')
+NIVEL_LOG = 'INFO'  # 'DEBUG' grava também os nomes/mapeamentos de colunas e o perfil de cada coluna
+# Zera o arquivo de log ao iniciar o script (os processos filhos do modo lote reimportam o módulo e não devem zerá-lo)
+if __name__ == "__main__":
+    with open(LOG_FILE, 'w') as f:
+        f.write('')
 
-logging.basicConfig(filename=LOG_FILE, level=logging.DEBUG,
+logging.basicConfig(filename=LOG_FILE, level=getattr(logging, NIVEL_LOG),
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
 logging.info("Script iniciado.")
@@ -29,9 +72,36 @@ CSV_DELIMITADOR_SAIDA = ';'
 # Delimitador de ENTRADA para arquivos CSV, SE O TIPO_ARQUIVO for 'csv'.
 DELIMITADOR_ENTRADA_CSV = ';'
 
-# CHUNKSIZE é usado para dividir o DataFrame em blocos (se aplicável para leitura/processamento).
+# CHUNKSIZE é a quantidade de linhas lidas por bloco na entrada CSV (memória constante por bloco).
 CHUNKSIZE = 10000
 
+# --- Inferência de tipos ---
+# 'completa' = perfil de todos os valores (tipos mínimos). 'amostra' = decide os tipos pelas primeiras
+# AMOSTRA_INFERENCIA_LINHAS linhas e depois só valida cada valor contra o tipo da coluna, alargando-o
+# (VARCHAR2 maior, NUMBER -> VARCHAR2, VARCHAR2 -> CLOB...) quando um valor não cabe.
+MODO_INFERENCIA = 'completa'
+AMOSTRA_INFERENCIA_LINHAS = 10000
+ARQUIVO_RELATORIO_INFERENCIA = 'relatorio_inferencia_tipos.json'  # Só no modo 'amostra'
+
+# --- Cache da leitura (reexecuções sobre o mesmo arquivo) ---
+# Guarda os valores já normalizados (em colunas compactas) e as estatísticas de tipo de cada arquivo lido,
+# pela chave: hash do conteúdo + versão das regras de normalização + parâmetros de leitura/inferência.
+# Reexecutar só para mudar USUARIO_GRANT, nome da tabela ou delimitador de saída pula a leitura da planilha.
+# Desligado por padrão: durante a leitura a cópia das colunas fica em memória (até CACHE_LEITURA_MAX_LINHAS),
+# o que anula a memória limitada da leitura em streaming nas planilhas grandes.
+CACHE_LEITURA = False
+PASTA_CACHE_LEITURA = os.path.join(os.path.expanduser('~'), '.cache', 'gerar_scripts_oracle')
+CACHE_LEITURA_TAMANHO_MAX_MB = 2048  # Acima disso as entradas usadas há mais tempo são removidas
+CACHE_LEITURA_MAX_LINHAS = 5000000  # Arquivos maiores não entram no cache (a cópia fica em memória durante a leitura)
+
+# --- Leitura paralela por colunas (planilhas largas) ---
+# A leitura continua num só processo; cada bloco de CHUNKSIZE linhas é dividido em grupos de colunas e cada
+# processo do pool normaliza, perfila e formata só as suas colunas. O DDL segue a ordem original das colunas.
+# Só vale para MODO_INFERENCIA = 'completa'; nessa leitura o arquivo não entra no cache de leitura.
+LEITURA_PARALELA_COLUNAS = False
+LEITURA_PARALELA_PROCESSOS = None  # None = um processo por núcleo
+LEITURA_PARALELA_MIN_COLUNAS = 40  # Com menos colunas a troca de dados entre processos custa mais que o ganho
+
 # --- Nomes dos Arquivos de Saída (Definidos Globalmente) ---
 ARQUIVO_DROP_TABLE_SQL = 'drop_table_script.sql'
 ARQUIVO_CREATE_TABLE_SQL = 'create_table_only_script.sql'
@@ -51,27 +121,301 @@ USUARIO_GRANT = 'HUMASTER'
 # --- PARÂMETROS CRÍTICOS PARA LEITURA DO EXCEL COM OPENPYXL ---
 EXCEL_HEADER_ROW_NUM = 1
 EXCEL_DATA_START_ROW_NUM = 2
+# 'auto' usa o motor mais rápido instalado que lê a extensão do arquivo (calamine > openpyxl).
+# 'calamine' exige `pip install python-calamine` e é o único que lê .xlsb/.xls/.ods.
+MOTOR_LEITURA_EXCEL = 'auto'
 NUM_COLUNAS_ESPERADAS_EXCEL = 14
 
 # --- ORACLE_HOME_PATH para o SQL Loader ---
 ORACLE_HOME_PATH = r'E:\app\client\isaacjf\product\12.2.0\client_1' # CAMINHO VALIDADO POR VOCÊ
 NLS_LANG_VALUE = 'BRAZILIAN PORTUGUESE_BRAZIL.AL32UTF8'
 
+# Caminho da pasta local na VPN onde os arquivos residem.
+PASTA_LOCAL_VPN_PARA_EXECUCAO = r'\\tsclient\C\Users\jeffe\OneDrive\Arquivos e Pastas antigas\Documentos\Hapvida - SublimeText\PROJETOS PYTHON'
+
+# --- Parâmetros do SQL*Loader (gravados no .ctl/.par gerados pelo Python) ---
+SQLLDR_DIRECT = True  # Direct path: formata os blocos no cliente e grava acima do HWM, bem mais rápido que o conventional
+SQLLDR_UNRECOVERABLE = True  # Só vale com DIRECT: não gera redo (a tabela é recriada a cada carga)
+SQLLDR_ROWS = 100000  # DIRECT: linhas entre cada data save / Conventional: linhas por array insert
+SQLLDR_BINDSIZE = 20 * 1024 * 1024  # Só conventional path
+SQLLDR_READSIZE = 20 * 1024 * 1024
+SQLLDR_MULTITHREADING = True  # Só DIRECT: conversão e carga em threads separadas
+SQLLDR_TAMANHO_MAX_CLOB = 1000000  # Tamanho máximo (em caracteres) declarado para campos CLOB no .ctl
+# Carga paralela: 1 = um arquivo de dados e um sqlldr (padrão); N > 1 = o CSV é dividido em N arquivos
+# balanceados e o PowerShell dispara N sessões direct path simultâneas com PARALLEL=TRUE
+SQLLDR_PARTICOES = 1
+# Carga retomável: o CSV é gravado em segmentos numerados, carregados em sequência. O PowerShell anota num
+# checkpoint cada segmento concluído (com as linhas do log do sqlldr); se a carga cair, a nova execução do .bat
+# pula DROP/CREATE e recomeça do primeiro segmento não carregado. Tem precedência sobre SQLLDR_PARTICOES.
+# Com SQLLDR_DIRECT cada segmento é gravado de uma vez (tudo ou nada); no conventional path o sqlldr confirma
+# a cada bind array e um segmento interrompido pode ter sido carregado em parte.
+CARGA_RETOMAVEL = False
+SEGMENTO_LINHAS = 1000000
+ARQUIVO_CHECKPOINT_CARGA = 'checkpoint_carga.txt'  # Gravado pelo PowerShell na pasta de execução
+ARQUIVO_MANIFESTO_SEGMENTOS = 'manifesto_segmentos.json'
+# O formato de data gravado no CSV e a máscara do .ctl precisam corresponder
+FORMATO_DATA_SAIDA = '%Y-%m-%d %H:%M:%S'
+SQLLDR_MASCARA_DATA = 'YYYY-MM-DD HH24:MI:SS'
+
+# --- DDL otimizado para a carga e fase pós-carga ---
+# Cláusulas físicas do CREATE TABLE (a tabela é recriada a cada carga, então NOLOGGING não perde nada de valor;
+# após a carga o pos_carga_script.sql volta LOGGING/NOPARALLEL — faça backup se a base usa Data Guard)
+DDL_NOLOGGING = True  # Só evita redo em cargas direct path/APPEND
+DDL_PCTFREE = 0  # Tabela de carga não sofre UPDATE: blocos cheios. None = padrão do banco (10)
+DDL_COMPRESSAO = None  # None, 'basic' (só comprime em direct path) ou 'advanced' (exige Advanced Compression)
+DDL_PARALELISMO = None  # Grau PARALLEL da tabela durante a carga/estatísticas. None = sem cláusula
+POS_CARGA = True  # Gera e executa o script pós-carga (estatísticas, índices e restauração dos atributos)
+ARQUIVO_POS_CARGA_SQL = 'pos_carga_script.sql'
+POS_CARGA_ESTATISTICAS = True  # DBMS_STATS.GATHER_TABLE_STATS após a carga
+# Índices criados só depois dos dados (uma ordenação em vez de manutenção linha a linha).
+# Cada item é uma lista de colunas Oracle; o índice é criado em toda tabela que tiver todas elas.
+# Ex.: [['CD_PLANO'], ['NU_CPF', 'DT_NASCIMENTO']]
+POS_CARGA_INDICES = []
+
+# --- Detecção de chaves candidatas (perfil de cardinalidade numa passada sobre o CSV final) ---
+# Estima os valores distintos de cada coluna (sketch HyperLogLog sobre o hash dos valores) e confere por hash,
+# exatamente, quais colunas e combinações pequenas de colunas não se repetem. A melhor chave vira PRIMARY KEY
+# e as demais colunas únicas/quase únicas viram índices no pos_carga_script.sql.
+DETECCAO_CHAVES = False
+POS_CARGA_CHAVES_DETECTADAS = True  # False = só gera o relatório, sem PK/índices no pós-carga
+ARQUIVO_RELATORIO_CHAVES = 'relatorio_chaves_cardinalidade.json'
+CHAVES_LIMIAR_QUASE_UNICA = 0.95  # Distintos/não nulos a partir do qual a coluna ganha índice (não único)
+CHAVES_TAMANHO_MAX_COMPOSTA = 3  # Máximo de colunas numa chave composta
+CHAVES_MAX_COLUNAS_COMPOSTAS = 8  # Colunas combinadas entre si na busca por chaves compostas (CD_ primeiro)
+CHAVES_MAX_INDICES = 3  # Índices criados a partir da detecção, além da chave primária
+CHAVES_MIN_LINHAS = 1000  # Tabelas menores não ganham PK/índices (full scan já é barato); só o relatório
+CHAVES_TAMANHO_MAX_TEXTO = 200  # VARCHAR2 maiores que isso não entram em chaves
+CHAVES_PRECISAO_SKETCH = 14  # 2^14 registradores por coluna: erro padrão de ~0,8% na estimativa de distintos
+
+# --- Sessão única no SQL*Plus ---
+# Em vez de um sqlplus (um login pela VPN) por etapa, o .bat roda um script mestre numa única sessão: teste de
+# conexão, DROP, CREATE, GRANT, carga (o SQL*Loader é chamado por HOST), MERGE, pós-carga e verificação final.
+# Cada fase encerra com um código de saída próprio (CODIGOS_SAIDA_SCRIPT_MESTRE), tratado pelo .bat.
+SESSAO_UNICA = False
+ARQUIVO_SCRIPT_MESTRE_SQL = 'script_mestre.sql'
+
+# --- Validação pré-carga (antes de qualquer acesso ao banco) ---
+# Confere cada linha do CSV final contra o DDL gerado e separa as que o SQL*Loader rejeitaria
+# (texto maior que o VARCHAR2 em bytes/caracteres, NUMBER não numérico, data fora do formato, quebra de linha...)
+VALIDACAO_PRE_CARGA = True
+# Por padrão só relata: as linhas seguem para a carga (e acabam no .bad). True = remove do arquivo de carga;
+# o .bat mostra quantas linhas foram removidas e pede confirmação antes de conectar
+VALIDACAO_REMOVER_REJEITADAS = False
+ARQUIVO_REJEITADAS_PRE_CARGA = 'rejeitadas_pre_carga.csv'
+ARQUIVO_RESUMO_VALIDACAO = 'resumo_validacao_pre_carga.json'
+
+# --- Pacote de transferência (só MODO_CARGA = 'sqlldr') ---
+# Em vez de o sqlldr ler o CSV pelo \\tsclient durante a carga, os dados vão em blocos gzip com um manifesto
+# de SHA-256; o execute_sqlldr.ps1 copia, descompacta e confere os blocos em paralelo numa pasta local da VPN.
+PACOTE_TRANSFERENCIA = False
+PASTA_STAGING_VPN = r'C:\Temp\carga_incorporacoes'  # Pasta LOCAL da máquina da VPN (uma subpasta por pasta de saída)
+PACOTE_TAMANHO_BLOCO_MB = 64  # Tamanho (descomprimido) de cada bloco
+PACOTE_NIVEL_COMPRESSAO = 6  # 1 (mais rápido) a 9 (menor arquivo)
+PACOTE_MAX_PARALELO = 4  # Threads de compressão no Python e jobs de cópia/descompressão na VPN
+ARQUIVO_MANIFESTO_PACOTE = 'manifesto_pacote.json'
+ARQUIVO_POWERSHELL_PACOTE = 'preparar_pacote.ps1'
+
+# --- Modo de carga ---
+# 'sqlldr': gera .bat/.ps1/.ctl/.par para execução na VPN (padrão)
+# 'python': executa DROP/CREATE e insere as linhas direto do Python (executemany com array binding),
+#           sem CSV intermediário e com uma única conexão reutilizada
+# 'tabela_externa': gera uma tabela externa (ORACLE_LOADER) sobre o CSV e materializa a TT_OPE_* no próprio
+#           servidor (INSERT /*+ APPEND PARALLEL */ ou CREATE TABLE AS SELECT), sem o sqlldr no cliente.
+#           O CSV precisa estar na pasta do DIRECTORY Oracle TABELA_EXTERNA_DIRETORIO.
+MODO_CARGA = 'sqlldr'
+CARGA_PYTHON_BACKEND = 'oracle'  # 'oracle' (python-oracledb) ou 'sqlite' (banco local para testes)
+CARGA_PYTHON_TAMANHO_LOTE = 10000  # Linhas por executemany/commit
+CAMINHO_SQLITE_CARGA = 'carga_local.sqlite3'
+# True = a passada de perfil guarda as linhas em colunas compactas e a inserção lê da memória (sem reler a origem).
+# Use False para planilhas maiores que a memória disponível.
+CARGA_PYTHON_MEMORIA_COMPACTA = True
+TABELA_EXTERNA_DIRETORIO = 'DIR_INCORPORACOES'  # DIRECTORY Oracle com READ/WRITE para o usuário da carga
+TABELA_EXTERNA_PASTA_SERVIDOR = None  # Caminho (UNC) da pasta do DIRECTORY; se informado, o .bat copia o CSV para lá
+TABELA_EXTERNA_PARALELISMO = 4  # Grau de paralelismo da leitura e do INSERT/CTAS
+TABELA_EXTERNA_MATERIALIZACAO = 'insert'  # 'insert' (INSERT /*+ APPEND PARALLEL */) ou 'ctas' (CREATE TABLE AS SELECT)
+ARQUIVO_TABELA_EXTERNA_SQL = 'carga_tabela_externa.sql'
+
+# --- Carga incremental (delta via MERGE) ---
+# Com MODO_INCREMENTAL = True, cada execução compara as linhas com o manifesto da última carga confirmada e gera
+# apenas as linhas novas/alteradas/removidas + um script MERGE/DELETE contra a tabela existente.
+# Se o esquema inferido mudar (ou não houver manifesto), cai automaticamente na recriação completa.
+# O estado do arquivo atual fica pendente até o .bat/orquestrador gravar ARQUIVO_CONFIRMACAO_DELTA (carga e
+# MERGE sem erro); sem a confirmação, a próxima geração recalcula o delta a partir da carga confirmada anterior.
+MODO_INCREMENTAL = False
+CHAVES_DELTA = []  # Nomes Oracle das colunas que identificam a linha (ex.: ['CD_PLANO']); vazio = linha inteira
+ARQUIVO_MANIFESTO_DELTA = 'manifesto_delta.sqlite3'
+ARQUIVO_MERGE_SQL = 'merge_delta_script.sql'
+ARQUIVO_CONFIRMACAO_DELTA = 'manifesto_delta_confirmado.txt'  # Gravado na pasta de execução após o MERGE
+COLUNA_OPERACAO_DELTA = 'FL_OPERACAO_DELTA'  # 'U' = inserir/atualizar, 'D' = remover
+
+# --- Modo lote (vários arquivos de um diretório/glob processados em paralelo) ---
+# Informe um diretório ou glob em ORIGEM_LOTE para ativar; cada arquivo ganha uma subpasta em PASTA_SAIDA_LOTE
+# (nomeada pela tabela) com seus scripts, e a raiz recebe um orquestrador que carrega todas as tabelas.
+ORIGEM_LOTE = None  # Ex.: r'C:\Users\jeffe\Incorporacoes\*.xlsx'
+PASTA_SAIDA_LOTE = 'saida_lote'  # Deve ficar dentro de PASTA_LOCAL_VPN_PARA_EXECUCAO (é acessada pela VPN)
+LOTE_MAX_PROCESSOS = None  # None = um processo por núcleo
+LOTE_MAX_CARGAS_SIMULTANEAS = 3  # Cargas em andamento ao mesmo tempo no orquestrador
+ARQUIVO_ORQUESTRADOR_LOTE = 'executar_lote.ps1'
+EXTENSOES_POR_TIPO = {'.xlsx': 'excel', '.xlsm': 'excel', '.xlsb': 'excel', '.xls': 'excel', '.ods': 'excel',
+                      '.csv': 'csv'}
+
+# --- Modo multiabas (todas as abas não vazias da planilha, uma tabela por aba) ---
+# Usa LOTE_MAX_PROCESSOS e LOTE_MAX_CARGAS_SIMULTANEAS do modo lote.
+PROCESSAR_TODAS_ABAS = False  # Só vale para TIPO_ARQUIVO = 'excel'
+PASTA_SAIDA_ABAS = 'saida_abas'  # Deve ficar dentro de PASTA_LOCAL_VPN_PARA_EXECUCAO (é acessada pela VPN)
+TAMANHO_MAX_SUFIXO_ABA = 12  # Caracteres do nome da aba acrescentados ao nome da tabela
+
+# --- Modo monitor (processo contínuo que vigia uma pasta de entrada) ---
+# Os processos do pool ficam "quentes" (pandas/openpyxl já importados) entre um arquivo e outro.
+PASTA_ENTRADA_MONITORADA = None  # Ex.: r'C:\Users\jeffe\Incorporacoes\entrada'
+PASTA_SAIDA_MONITORADA = 'saida_monitor'  # Deve ficar dentro de PASTA_LOCAL_VPN_PARA_EXECUCAO (é acessada pela VPN)
+MONITOR_INTERVALO_S = 5  # Intervalo entre as varreduras da pasta de entrada
+MONITOR_TAMANHO_FILA = 4  # Máximo de arquivos em processamento/aguardando no pool; o resto espera na pasta
+SUBPASTA_PROCESSADOS = 'processados'  # Dentro da pasta de entrada
+SUBPASTA_COM_ERRO = 'com_erro'  # Dentro da pasta de entrada
+
+# --- Instrumentação (tempo, vazão e memória por etapa) ---
+ARQUIVO_METRICAS = 'metricas_execucao.json'  # None = não grava o arquivo de métricas
+PERFILAR_CPROFILE = False  # True = roda a execução sob o cProfile (só o processo principal)
+ARQUIVO_CPROFILE = 'perfil_execucao.prof'  # Abra com: python -m pstats perfil_execucao.prof
+
 
 # --- Funções auxiliares (manter como estão, elas foram validadas) ---
+# Quantidade máxima de textos distintos guardados no cache de normalização (LRU).
+# Colunas de baixa cardinalidade (planos, cidades, operadoras) passam a ser normalizadas uma vez por valor.
+TAMANHO_CACHE_NORMALIZACAO = 100000
+
+_RE_CARACTERES_INVALIDOS = re.compile(r'[^A-Z0-9\s_]')
+# Tabela de tradução para textos ASCII: remove os mesmos caracteres que _RE_CARACTERES_INVALIDOS
+# (a tabela é montada com a própria regex, garantindo o mesmo resultado)
+_TABELA_ASCII_INVALIDOS = {
+    codigo: None for codigo in range(128) if _RE_CARACTERES_INVALIDOS.match(chr(codigo))
+}
+
+
+def _normalizar_texto(texto):
+    if texto.isascii():
+        # Em ASCII o NFKD não altera nada e não há acentos combinantes: basta upper + tradução
+        return texto.upper().translate(_TABELA_ASCII_INVALIDOS).strip()
+    texto_normalizado = unicodedata.normalize('NFKD', texto)
+    texto_sem_acentos = "".join([c for c in texto_normalizado if not unicodedata.combining(c)])
+    final_texto_limpo = _RE_CARACTERES_INVALIDOS.sub('', texto_sem_acentos.upper()).strip()
+    # Remover o caractere U+00A0 (non-breaking space)
+    return final_texto_limpo.replace('\u00A0', '')
+
+
+_normalizar_texto_cache = functools.lru_cache(maxsize=TAMANHO_CACHE_NORMALIZACAO)(_normalizar_texto)
+
+
+# --- Instrumentação: tempo, vazão e memória por etapa ---
+_metricas_execucao = {'inicio': time.perf_counter(), 'etapas': [], 'cache_inicial': (0, 0)}
+
+
+def pico_memoria_mb():
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024, 1)  # macOS: bytes / Linux: KB
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1)
+    return None
+
+
+def estatisticas_cache_normalizacao():
+    info = _normalizar_texto_cache.cache_info()
+    acertos = info.hits - _metricas_execucao['cache_inicial'][0]
+    falhas = info.misses - _metricas_execucao['cache_inicial'][1]
+    consultas = acertos + falhas
+    return {'acertos': acertos, 'falhas': falhas, 'taxa_acerto': round(acertos / consultas, 4) if consultas else None,
+            'entradas': info.currsize, 'tamanho_maximo': info.maxsize}
+
+
+def reiniciar_metricas_execucao():
+    # Os processos do modo lote são reaproveitados entre arquivos: cada arquivo começa do zero
+    info = _normalizar_texto_cache.cache_info()
+    _metricas_execucao.update(inicio=time.perf_counter(), etapas=[], cache_inicial=(info.hits, info.misses))
+
+
+@contextlib.contextmanager
+def medir_etapa(nome_etapa, **detalhes):
+    # Quem chama pode preencher 'linhas' e 'bytes' no dicionário recebido para obter a vazão da etapa
+    etapa = {'etapa': nome_etapa, **detalhes}
+    inicio = time.perf_counter()
+    try:
+        yield etapa
+    except BaseException:
+        etapa['erro'] = True
+        raise
+    finally:
+        duracao = time.perf_counter() - inicio
+        etapa['tempo_s'] = round(duracao, 4)
+        if etapa.get('linhas') is not None and duracao > 0:
+            etapa['linhas_por_s'] = round(etapa['linhas'] / duracao, 1)
+        if etapa.get('bytes') is not None and duracao > 0:
+            etapa['bytes_por_s'] = round(etapa['bytes'] / duracao, 1)
+        etapa['pico_memoria_mb'] = pico_memoria_mb()
+        _metricas_execucao['etapas'].append(etapa)
+        vazao = f", {etapa['linhas_por_s']:,.0f} linhas/s" if 'linhas_por_s' in etapa else ""
+        logging.info(f"Etapa '{nome_etapa}': {duracao:.2f}s{vazao}, pico de memória {etapa['pico_memoria_mb']} MB")
+
+
+def gravar_metricas_execucao(caminho_metricas=None):
+    caminho_metricas = caminho_metricas or ARQUIVO_METRICAS
+    metricas = {
+        'data': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'tempo_total_s': round(time.perf_counter() - _metricas_execucao['inicio'], 4),
+        'pico_memoria_mb': pico_memoria_mb(),
+        'cache_normalizacao': estatisticas_cache_normalizacao(),
+        'etapas': _metricas_execucao['etapas'],
+    }
+    if caminho_metricas:
+        with open(caminho_metricas, 'w', encoding='utf-8') as f:
+            json.dump(metricas, f, ensure_ascii=False, indent=2, default=str)
+        logging.info(f"Métricas da execução gravadas em: {caminho_metricas}")
+    return metricas
+
+
+@contextlib.contextmanager
+def perfilar_execucao(ativo=None):
+    if not (PERFILAR_CPROFILE if ativo is None else ativo):
+        yield
+        return
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        perfil.dump_stats(ARQUIVO_CPROFILE)
+        resumo = io.StringIO()
+        pstats.Stats(perfil, stream=resumo).sort_stats('cumulative').print_stats(25)
+        logging.info(f"cProfile gravado em {ARQUIVO_CPROFILE}. Funções mais custosas:\n{resumo.getvalue()}")
+
+
+def _resumo_lista(valores, limite=10):
+    # Evita despejar no log listas com centenas de colunas
+    valores = list(valores)
+    if len(valores) <= limite:
+        return str(valores)
+    return f"{valores[:limite]} ... (+{len(valores) - limite} itens)"
+
+
 def normalizar_string(texto):
+    if isinstance(texto, str):
+        return _normalizar_texto_cache(texto)
     if pd.isna(texto) or texto is None:
         return None
-    texto_normalizado = unicodedata.normalize('NFKD', str(texto))
-    texto_sem_acentos = "".join([c for c in texto_normalizado if not unicodedata.combining(c)])
-    final_texto_limpo = re.sub(r'[^A-Z0-9\s_]', '', texto_sem_acentos.upper()).strip()
-    # Remover o caractere U+00A0 (non-breaking space)
-    final_texto_limpo = re.sub(r'[\u00A0]', '', final_texto_limpo)
-    return final_texto_limpo
+    return _normalizar_texto_cache(str(texto))
+
+
+def normalizar_coluna(valores):
+    # Normaliza uma coluna inteira; só textos passam pelo cache, os demais valores seguem intactos
+    normalizar = _normalizar_texto_cache
+    return [normalizar(valor) if isinstance(valor, str) else valor for valor in valores]
 
 
 def limpar_nome_coluna(nome_original):
-    cleaned_name = normalizar_string(nome_original)
+    cleaned_name = normalizar_string(nome_original) or ''  # Células de cabeçalho vazias chegam como None
     cleaned_name = re.sub(r'[\s]+', '_', cleaned_name)
     cleaned_name = re.sub(r'_+', '_', cleaned_name).strip('_')
     if not cleaned_name:
@@ -98,23 +442,188 @@ def gerar_nome_tabela(caminho_arquivo):
     return f"{prefix_table_object_name}{table_suffix}"
 
 
-def inferir_e_nomear_coluna(col_name_original, series):
+def gerar_nome_tabela_aba(caminho_arquivo, nome_aba):
+    # Nome do arquivo + nome da aba, cortando o nome do arquivo para caber nos 30 caracteres
+    sufixo_aba = re.sub(r'[\s]+', '_', normalizar_string(nome_aba) or '')
+    sufixo_aba = re.sub(r'[^A-Z0-9_]', '', sufixo_aba)
+    sufixo_aba = re.sub(r'_+', '_', sufixo_aba).strip('_')[:TAMANHO_MAX_SUFIXO_ABA].strip('_') or 'ABA'
+    nome_base = gerar_nome_tabela(caminho_arquivo)
+    return f"{nome_base[:30 - len(sufixo_aba) - 1].rstrip('_')}_{sufixo_aba}"
+
+
+# --- Perfil de coluna acumulado em streaming (uma única passada por valor) ---
+# Cada coluna guarda apenas contadores (e não os valores), permitindo inferir o tipo
+# vendo TODOS os valores sem manter a planilha inteira em memória.
+_RE_DIGITO = re.compile(r'\d')
+# Limites do Oracle usados na escolha dos tipos
+MAX_PRECISAO_NUMBER = 38
+MAX_BYTES_VARCHAR2 = 4000
+_CHAVES_CONTADORES_PERFIL = ('total', 'nulos', 'bool', 'int', 'float', 'data', 'texto', 'textos_numericos')
+
+
+def novas_estatisticas_coluna():
+    return {
+        'total': 0,  # Quantidade de valores vistos (inclusive nulos)
+        'nulos': 0,
+        'bool': 0,
+        'int': 0,
+        'float': 0,
+        'data': 0,  # datetime/date
+        'texto': 0,  # Textos e demais tipos
+        'textos_numericos': 0,  # Textos compostos só por dígitos (ficam VARCHAR2 para preservar zeros à esquerda)
+        'int_min': None,
+        'int_max': None,
+        'digitos_inteiros': 0,  # Maior quantidade de dígitos antes da vírgula entre os float
+        'escala': 0,  # Maior quantidade de casas decimais significativas
+        'numero_sem_precisao': False,  # Algum float em notação científica/infinito (usa NUMBER sem precisão)
+        'max_chars': 0,  # Maior len(str(valor)) entre os valores não inteiros e não nulos
+        'max_bytes': 0,  # Maior tamanho em UTF-8 entre os mesmos valores
+        'tem_digito': False,  # Algum valor não numérico contém dígito?
+    }
+
+
+def _registrar_tamanho_texto(estatisticas, texto):
+    tamanho = len(texto)
+    if tamanho > estatisticas['max_chars']:
+        estatisticas['max_chars'] = tamanho
+    tamanho_bytes = tamanho if texto.isascii() else len(texto.encode('utf-8'))
+    if tamanho_bytes > estatisticas['max_bytes']:
+        estatisticas['max_bytes'] = tamanho_bytes
+
+
+def atualizar_estatisticas_coluna(estatisticas, valor):
+    estatisticas['total'] += 1
+    if isinstance(valor, str):
+        estatisticas['texto'] += 1
+        _registrar_tamanho_texto(estatisticas, valor)
+        if not estatisticas['tem_digito'] and _RE_DIGITO.search(valor):
+            estatisticas['tem_digito'] = True
+        if valor.isdigit():
+            estatisticas['textos_numericos'] += 1
+        return
+    if valor is None or valor is pd.NaT or valor is pd.NA or (isinstance(valor, float) and valor != valor):
+        estatisticas['nulos'] += 1
+        return
+    if isinstance(valor, bool):
+        estatisticas['bool'] += 1
+        _registrar_tamanho_texto(estatisticas, str(valor))
+    elif isinstance(valor, int):
+        estatisticas['int'] += 1
+        if estatisticas['int_min'] is None or valor < estatisticas['int_min']:
+            estatisticas['int_min'] = valor
+        if estatisticas['int_max'] is None or valor > estatisticas['int_max']:
+            estatisticas['int_max'] = valor
+    elif isinstance(valor, float):
+        estatisticas['float'] += 1
+        texto = str(valor)
+        _registrar_tamanho_texto(estatisticas, texto)
+        if 'e' in texto or 'n' in texto:  # 1e-05, inf
+            estatisticas['numero_sem_precisao'] = True
+        else:
+            parte_inteira, _, parte_decimal = texto.lstrip('-').partition('.')
+            digitos_inteiros = len(parte_inteira.lstrip('0'))
+            escala = len(parte_decimal.rstrip('0'))
+            if digitos_inteiros > estatisticas['digitos_inteiros']:
+                estatisticas['digitos_inteiros'] = digitos_inteiros
+            if escala > estatisticas['escala']:
+                estatisticas['escala'] = escala
+    elif isinstance(valor, date):
+        estatisticas['data'] += 1
+        # Mede o texto como ele é gravado no CSV (FORMATO_DATA_SAIDA), não o str() da data
+        _registrar_tamanho_texto(estatisticas, formatar_valor_saida(valor))
+    else:
+        estatisticas['texto'] += 1
+        texto = str(valor)
+        _registrar_tamanho_texto(estatisticas, texto)
+        if not estatisticas['tem_digito'] and _RE_DIGITO.search(texto):
+            estatisticas['tem_digito'] = True
+
+
+def mesclar_estatisticas_coluna(destino, origem):
+    for chave in _CHAVES_CONTADORES_PERFIL:
+        destino[chave] += origem[chave]
+    if origem['int_min'] is not None:
+        if destino['int_min'] is None or origem['int_min'] < destino['int_min']:
+            destino['int_min'] = origem['int_min']
+        if destino['int_max'] is None or origem['int_max'] > destino['int_max']:
+            destino['int_max'] = origem['int_max']
+    for chave in ('digitos_inteiros', 'escala', 'max_chars', 'max_bytes'):
+        destino[chave] = max(destino[chave], origem[chave])
+    destino['numero_sem_precisao'] = destino['numero_sem_precisao'] or origem['numero_sem_precisao']
+    destino['tem_digito'] = destino['tem_digito'] or origem['tem_digito']
+    return destino
+
+
+def estatisticas_de_series(series):
+    estatisticas = novas_estatisticas_coluna()
+    for valor in series.tolist():
+        atualizar_estatisticas_coluna(estatisticas, valor)
+    return estatisticas
+
+
+# Classifica a coluna a partir do perfil: 'vazia', 'bool', 'numero', 'data' ou 'texto'
+def categoria_das_estatisticas(estatisticas):
+    validos = estatisticas['total'] - estatisticas['nulos']
+    if validos == 0:
+        return 'vazia'
+    if estatisticas['bool'] == validos:
+        return 'bool'
+    if estatisticas['int'] + estatisticas['float'] == validos:
+        return 'numero'
+    if estatisticas['data'] == validos:
+        return 'data'
+    return 'texto'
+
+
+def _digitos_do_inteiro(valor):
+    return 0 if valor is None or valor == 0 else len(str(abs(valor)))
+
+
+def tipo_oracle_numerico(estatisticas):
+    if estatisticas['numero_sem_precisao']:
+        return "NUMBER"
+    digitos_inteiros = max(estatisticas['digitos_inteiros'],
+                           _digitos_do_inteiro(estatisticas['int_min']),
+                           _digitos_do_inteiro(estatisticas['int_max']))
+    escala = estatisticas['escala']
+    precisao = max(digitos_inteiros + escala, 1)
+    if precisao > MAX_PRECISAO_NUMBER:
+        return "NUMBER"
+    if escala == 0:
+        return f"NUMBER({precisao})"
+    return f"NUMBER({precisao},{escala})"
+
+
+def tipo_oracle_texto(estatisticas):
+    max_chars = estatisticas['max_chars']
+    max_bytes = estatisticas['max_bytes']
+    if estatisticas['int'] > 0:
+        # Inteiros misturados com texto são gravados como texto
+        tamanho_inteiros = max(len(str(estatisticas['int_min'])), len(str(estatisticas['int_max'])))
+        max_chars = max(max_chars, tamanho_inteiros)
+        max_bytes = max(max_bytes, tamanho_inteiros)
+    if max_bytes > MAX_BYTES_VARCHAR2:
+        return "CLOB"
+    # CHAR semantics: o tamanho conta caracteres, não bytes (acentos remanescentes não estouram a coluna)
+    return f"VARCHAR2({max_chars if max_chars > 0 else 255} CHAR)"
+
+
+def inferir_e_nomear_coluna_por_estatisticas(col_name_original, estatisticas):
     clean_col_name = col_name_original
-    oracle_type = "VARCHAR2(255)"
-    prefix = "NM_"
+    categoria = categoria_das_estatisticas(estatisticas)
     if clean_col_name.startswith(('CD_', 'DS_', 'NU_', 'FL_', 'NM_')):
         final_col_name = clean_col_name
     else:
-        if pd.api.types.is_integer_dtype(series):
-            prefix = "NU_"
-        elif pd.api.types.is_float_dtype(series):
+        if categoria == 'numero':
             prefix = "NU_"
-        elif pd.api.types.is_datetime64_any_dtype(series):
+        elif categoria == 'data':
             prefix = "DT_"
-        elif series.dtype == 'bool':
+        elif categoria == 'bool':
             prefix = "FL_"
         else:
-            contains_numbers = series.astype(str).str.contains(r'\d').any()
+            # Números e datas sempre contêm dígitos quando convertidos para texto
+            contains_numbers = (estatisticas['tem_digito'] or estatisticas['int'] > 0
+                                or estatisticas['float'] > 0 or estatisticas['data'] > 0)
             if contains_numbers:
                 prefix = "CD_"
             else:
@@ -124,233 +633,3375 @@ def inferir_e_nomear_coluna(col_name_original, series):
     if len(final_col_name) > 30:
         final_col_name = final_col_name[:30]
 
-    if pd.api.types.is_integer_dtype(series):
-        oracle_type = "NUMBER"
-    elif pd.api.types.is_float_dtype(series):
-        if series.dropna().apply(lambda x: x == int(x)).all():
-            oracle_type = "NUMBER"
-        else:
-            oracle_type = "NUMBER"
-    elif pd.api.types.is_datetime64_any_dtype(series):
+    if categoria == 'numero':
+        oracle_type = tipo_oracle_numerico(estatisticas)
+    elif categoria == 'data':
         oracle_type = "DATE"
-    elif series.dtype == 'bool':
+    elif categoria == 'bool':
         oracle_type = "NUMBER(1)"
     else:
-        max_len = series.astype(str).apply(len).max()
-        if max_len > 4000:
-            oracle_type = "CLOB"
-        else:
-            oracle_type = f"VARCHAR2({max_len if max_len > 0 else 255})"
+        oracle_type = tipo_oracle_texto(estatisticas)
 
+    logging.debug(
+        f"Perfil da coluna {final_col_name}: total={estatisticas['total']} nulos={estatisticas['nulos']} "
+        f"numericos={estatisticas['int'] + estatisticas['float']} inteiros={estatisticas['int']} "
+        f"textos_numericos={estatisticas['textos_numericos']} datas={estatisticas['data']} "
+        f"max_chars={estatisticas['max_chars']} max_bytes={estatisticas['max_bytes']} -> {oracle_type}")
     return final_col_name, oracle_type
 
 
-# (Fim das funções auxiliares)
+def inferir_e_nomear_coluna(col_name_original, series):
+    return inferir_e_nomear_coluna_por_estatisticas(col_name_original, estatisticas_de_series(series))
 
 
-def gerar_scripts_oracle(caminho_arquivo, tipo_arquivo):
-    logging.info(f"Iniciando a geração de scripts para o arquivo: {caminho_arquivo} do tipo: {tipo_arquivo}")
+def deduplicar_nomes_colunas(nomes_colunas):
+    nomes_finais = []
+    seen_cols = set()
+    for col_name in nomes_colunas:
+        if col_name in seen_cols:
+            i = 1
+            while f"{col_name}_{i}" in seen_cols:
+                i += 1
+            new_name = f"{col_name}_{i}"
+            nomes_finais.append(new_name)
+            seen_cols.add(new_name)
+        else:
+            nomes_finais.append(col_name)
+            seen_cols.add(col_name)
+    return nomes_finais
 
-    nome_tabela_objeto = gerar_nome_tabela(caminho_arquivo)
-    nome_tabela_objeto_com_aspas = f'"{nome_tabela_objeto}"'
 
-    logging.info(f"Nome do objeto da tabela gerado: {nome_tabela_objeto}")
+def montar_ddl_colunas(nomes_colunas, estatisticas_por_coluna):
+    columns_ddl_list = []  # Lista final de strings para DDL
+    col_mapping = {}  # Mapeia nomes limpos do Excel (ou CSV) para nomes Oracle finais
+    for col_excel_name, estatisticas in zip(nomes_colunas, estatisticas_por_coluna):
+        final_col_oracle_name = col_excel_name
+        oracle_type = "VARCHAR2(255)"
 
-    try:
-        if tipo_arquivo.lower() == 'excel':
-            logging.info("Processando arquivo Excel com openpyxl.")
-            workbook = openpyxl.load_workbook(CAMINHO_PLANILHA, data_only=True)
-            sheet = workbook.active
-
-            header_names_raw = []
-            for col_idx in range(1, sheet.max_column + 1):
-                cell_value = sheet.cell(row=EXCEL_HEADER_ROW_NUM, column=col_idx).value
-                header_names_raw.append(cell_value)
-            logging.debug(f"Nomes brutos das colunas lidos do Excel: {header_names_raw}")
-
-            header_names_cleaned_temp = [limpar_nome_coluna(name) for name in header_names_raw]
-            header_names_filtered = [name for name in header_names_cleaned_temp if name not in ['COL_VAZIA_PADRAO', 'COL_VAZIA_TEMP']]
-            logging.debug(f"Nomes limpos das colunas do Excel (filtrados): {header_names_filtered}")
-
-            final_column_names_from_excel = []  # Nomes limpos da planilha (temporários)
-            seen_cols = set()
-            for col_name in header_names_filtered:
-                if col_name in seen_cols:
-                    i = 1
-                    while f"{col_name}_{i}" in seen_cols:
-                        i += 1
-                    new_name = f"{col_name}_{i}"
-                    final_column_names_from_excel.append(new_name)
-                    seen_cols.add(new_name)
-                else:
-                    final_column_names_from_excel.append(col_name)
-                    seen_cols.add(col_name)
-            logging.debug(f"Nomes finais das colunas ajustados (para duplicatas): {final_column_names_from_excel}")
-
-            NUM_COLUNAS_REAIS_LIDAS = len(final_column_names_from_excel)
-
-            data_rows = []
-            for row_idx in range(EXCEL_DATA_START_ROW_NUM, sheet.max_row + 1):
-                row_values = []
-                for col_idx in range(1, NUM_COLUNAS_REAIS_LIDAS + 1):
-                    cell_value = sheet.cell(row=row_idx, column=col_idx).value
-                    if isinstance(cell_value, str):
-                        row_values.append(normalizar_string(cell_value))
-                    else:
-                        row_values.append(cell_value)
-                data_rows.append(row_values)
-            logging.debug(f"Número de linhas de dados lidas do Excel: {len(data_rows)}")
-
-            # Criar o DataFrame do pandas usando os nomes de colunas dinâmicos e limpos do Excel
-            df_full = pd.DataFrame(data_rows, columns=final_column_names_from_excel)
-            logging.info("DataFrame do pandas criado a partir do Excel.")
-
-            logging.debug(f"DataFrame inicial com colunas: {df_full.columns.tolist()}")
-
-            # Colunas para DDL e mapeamento para CSV
-            columns_ddl_list = []  # Lista final de strings para DDL
-            col_mapping = {}  # Mapeia nomes limpos do Excel (ou CSV) para nomes Oracle finais
-
-            # Primeira passagem para criar o col_mapping e definir o DDL
-            for col_excel_name in df_full.columns:  # df_full.columns AINDA TEM NOMES LIMPOS DO EXCEL
-                series = df_full[col_excel_name]
-                final_col_oracle_name = col_excel_name
-                oracle_type = "VARCHAR2(255)"
-
-                if col_excel_name.startswith(('CD_', 'DS_', 'NU_', 'FL_', 'NM_')):
-                    final_col_oracle_name = col_excel_name
-                else:
-                    final_col_oracle_name, oracle_type_temp = inferir_e_nomear_coluna(col_excel_name, series)
-                    oracle_type = oracle_type_temp
+        if not col_excel_name.startswith(('CD_', 'DS_', 'NU_', 'FL_', 'NM_')):
+            final_col_oracle_name, oracle_type = inferir_e_nomear_coluna_por_estatisticas(col_excel_name, estatisticas)
 
-                columns_ddl_list.append(f'"{final_col_oracle_name}" {oracle_type}')
-                col_mapping[col_excel_name] = final_col_oracle_name  # Mapeamento: 'EXCEL_NAME' -> 'ORACLE_NAME'
-            logging.debug(f"Lista de colunas para DDL: {columns_ddl_list}")
-            logging.debug(f"Mapeamento de colunas Excel para Oracle: {col_mapping}")
+        columns_ddl_list.append(f'"{final_col_oracle_name}" {oracle_type}')
+        col_mapping[col_excel_name] = final_col_oracle_name  # Mapeamento: 'EXCEL_NAME' -> 'ORACLE_NAME'
+    return columns_ddl_list, col_mapping
 
-            # NOVO: Renomear as colunas do DataFrame para os nomes Oracle ANTES de salvar no CSV
-            # Isso garante que o CSV tenha os nomes exatos do banco
-            df_full.rename(columns=col_mapping, inplace=True)
-            logging.info("Colunas do DataFrame renomeadas para os nomes Oracle antes de salvar CSV.")
 
-            df_full.to_csv(ARQUIVO_DADOS_PLANO, sep=CSV_DELIMITADOR_SAIDA, index=False, encoding='utf-8-sig')
-            logging.info(f"Dados convertidos e salvos em CSV para SQL Loader: {ARQUIVO_DADOS_PLANO}")
+# --- Inferência por amostra: tipos decididos no início e alargados quando um valor não cabe ---
+_TAMANHO_MAX_TEXTO_DATA = len(str(datetime(2000, 1, 1, 0, 0, 0, 1)))
+_TAMANHO_MAX_TEXTO_NUMERO_SEM_PRECISAO = 40
 
-        elif tipo_arquivo.lower() == 'csv':
-            logging.info("Processando arquivo CSV com pandas.")
-            df_full = pd.read_csv(caminho_arquivo, delimiter=DELIMITADOR_ENTRADA_CSV)
-            df_full.columns = [limpar_nome_coluna(col) for col in df_full.columns]
-            # ... (restante do processamento para CSV - não incluído aqui para brevidade)
+
+def _validador_numero(oracle_type):
+    match = _RE_TIPO_NUMBER.match(oracle_type)
+    if not match.group('precisao'):
+        return lambda valor: type(valor) is int or type(valor) is float
+    escala = int(match.group('escala') or 0)
+    limite = 10 ** (int(match.group('precisao')) - escala)
+
+    def validar(valor):
+        if type(valor) is int:
+            return -limite < valor < limite
+        if type(valor) is float and -limite < valor < limite:
+            if valor.is_integer():
+                return True
+            texto = str(valor)
+            return 'e' not in texto and len(texto.partition('.')[2].rstrip('0')) <= escala
+        return False
+    return validar
+
+
+def _validador_texto(oracle_type):
+    tamanho = int(_RE_TIPO_VARCHAR2.match(oracle_type).group('tamanho'))
+
+    def validar(valor):
+        texto = valor if isinstance(valor, str) else str(valor)
+        return len(texto) <= tamanho and (texto.isascii() or len(texto.encode('utf-8')) <= MAX_BYTES_VARCHAR2)
+    return validar
+
+
+def validador_do_tipo(categoria, oracle_type):
+    # Retorna uma função que diz se um valor não nulo cabe no tipo atual da coluna
+    if categoria == 'vazia':
+        return lambda valor: False  # O primeiro valor preenchido decide o tipo
+    if oracle_type == "CLOB":
+        return lambda valor: True
+    if categoria == 'bool':
+        return lambda valor: type(valor) is bool
+    if categoria == 'data':
+        return lambda valor: isinstance(valor, date)
+    if categoria == 'numero':
+        return _validador_numero(oracle_type)
+    return _validador_texto(oracle_type)
+
+
+def estatisticas_limite_do_tipo(categoria, oracle_type):
+    # Perfil "pior caso" dos valores já aceitos pelo tipo atual, sem contadores: ao ser mesclado antes de
+    # alargar, garante que o tipo novo comporta tudo o que o anterior comportava
+    estatisticas = novas_estatisticas_coluna()
+    if categoria == 'numero':
+        match = _RE_TIPO_NUMBER.match(oracle_type)
+        if match.group('precisao'):
+            precisao, escala = int(match.group('precisao')), int(match.group('escala') or 0)
+            estatisticas['digitos_inteiros'] = precisao - escala
+            estatisticas['escala'] = escala
+            tamanho_texto = precisao + (2 if escala else 1)  # Sinal e vírgula
         else:
-            raise ValueError("Tipo de arquivo não suportado. Use 'excel' ou 'csv'.")
+            estatisticas['numero_sem_precisao'] = True
+            tamanho_texto = _TAMANHO_MAX_TEXTO_NUMERO_SEM_PRECISAO
+    elif categoria == 'data':
+        tamanho_texto = _TAMANHO_MAX_TEXTO_DATA
+    elif categoria == 'bool':
+        tamanho_texto = len(str(False))
+    elif categoria == 'texto' and oracle_type != "CLOB":
+        tamanho_texto = int(_RE_TIPO_VARCHAR2.match(oracle_type).group('tamanho'))
+    else:
+        tamanho_texto = 0
+    estatisticas['max_chars'] = estatisticas['max_bytes'] = tamanho_texto
+    return estatisticas
 
-        logging.debug(f"DataFrame final contem colunas: {df_full.columns.tolist()}")
-        logging.info("Processamento do arquivo concluído.")
-        print("=========================================================================")
 
-        with open(ARQUIVO_NOME_TABELA_TXT, 'w', encoding='utf-8') as f:
-            f.write(nome_tabela_objeto_com_aspas)
-            logging.info(f"Nome da tabela gravado em: {ARQUIVO_NOME_TABELA_TXT}")
+def _e_nulo(valor):
+    return valor is None or valor is pd.NaT or valor is pd.NA or (isinstance(valor, float) and valor != valor)
 
-        # --- Geração do ARQUIVO drop_table_script.sql ---
-        logging.info("Gerando script DROP TABLE...")
-        drop_table_sql_content = f"""
--- Script para dropar a tabela (gerado pelo Python)
--- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-SET ECHO ON
-SET FEEDBACK ON
-SET SERVEROUTPUT ON
-WHENEVER SQLERROR EXIT FAILURE ROLLBACK
-/
+def nova_inferencia_por_amostra(nomes_colunas):
+    return {
+        'nomes': nomes_colunas,
+        'estatisticas': [novas_estatisticas_coluna() for _ in nomes_colunas],  # Amostra + valores que alargaram
+        'categorias': None,
+        'tipos': None,
+        'tipos_amostra': None,
+        'validadores': None,
+        'alargamentos': [],
+        'linhas': 0,
+    }
 
-BEGIN
-    EXECUTE IMMEDIATE 'DROP TABLE {nome_tabela_objeto_com_aspas} CASCADE CONSTRAINTS';
-    DBMS_OUTPUT.PUT_LINE('Tabela {nome_tabela_objeto} dropada com sucesso.');
-EXCEPTION
-    WHEN OTHERS THEN
-      IF SQLCODE = -942 THEN
-        DBMS_OUTPUT.PUT_LINE('Tabela {nome_tabela_objeto} nao existe. Nao ha necessidade de drop.');
-      ELSE
-        DBMS_OUTPUT.PUT_LINE('Erro ao tentar dropar a tabela {nome_tabela_objeto}: ' || SQLERRM);
-        RAISE;
-      END IF;
-END;
-/
 
-EXIT;
-"""
-        with open(ARQUIVO_DROP_TABLE_SQL, 'w', encoding='utf-8') as f:
-            f.write(drop_table_sql_content)
-        logging.info(f"Script DROP TABLE '{ARQUIVO_DROP_TABLE_SQL}' gerado com sucesso.")
+def _decidir_tipo_coluna_amostra(inferencia, indice):
+    nome_coluna = inferencia['nomes'][indice]
+    estatisticas = inferencia['estatisticas'][indice]
+    if nome_coluna.startswith(('CD_', 'DS_', 'NU_', 'FL_', 'NM_')):
+        # Mesmo tratamento de montar_ddl_colunas: o tipo não depende dos valores
+        inferencia['categorias'][indice] = 'texto'
+        inferencia['tipos'][indice] = "VARCHAR2(255)"
+        inferencia['validadores'][indice] = lambda valor: True
+        return
+    categoria = categoria_das_estatisticas(estatisticas)
+    oracle_type = inferir_e_nomear_coluna_por_estatisticas(nome_coluna, estatisticas)[1]
+    inferencia['categorias'][indice] = categoria
+    inferencia['tipos'][indice] = oracle_type
+    inferencia['validadores'][indice] = validador_do_tipo(categoria, oracle_type)
 
-        # --- Geração do ARQUIVO create_table_only_script.sql ---
-        logging.info("Gerando script CREATE TABLE...")
-        formatted_columns_ddl = []
-        for i, col_def in enumerate(columns_ddl_list):  # Usar a lista já populada
-            if i < len(columns_ddl_list) - 1:
-                formatted_columns_ddl.append(f'    {col_def},')
+
+def _concluir_amostra(inferencia):
+    num_colunas = len(inferencia['nomes'])
+    inferencia['categorias'] = [None] * num_colunas
+    inferencia['tipos'] = [None] * num_colunas
+    inferencia['validadores'] = [None] * num_colunas
+    for indice in range(num_colunas):
+        _decidir_tipo_coluna_amostra(inferencia, indice)
+    inferencia['tipos_amostra'] = [tipo if categoria != 'vazia' else None
+                                   for categoria, tipo in zip(inferencia['categorias'], inferencia['tipos'])]
+    logging.info(f"Tipos decididos pela amostra de {inferencia['linhas']} linhas; as demais serão validadas.")
+
+
+def _alargar_coluna_amostra(inferencia, indice, valor, linha):
+    estatisticas = inferencia['estatisticas'][indice]
+    tipo_anterior = inferencia['tipos'][indice] if inferencia['categorias'][indice] != 'vazia' else None
+    mesclar_estatisticas_coluna(estatisticas, estatisticas_limite_do_tipo(inferencia['categorias'][indice],
+                                                                          inferencia['tipos'][indice]))
+    atualizar_estatisticas_coluna(estatisticas, valor)
+    _decidir_tipo_coluna_amostra(inferencia, indice)
+    tipo_novo = inferencia['tipos'][indice]
+    if tipo_novo != tipo_anterior:
+        inferencia['alargamentos'].append({'coluna': inferencia['nomes'][indice], 'linha': linha,
+                                           'de': tipo_anterior, 'para': tipo_novo, 'valor': str(valor)[:50]})
+        logging.info(f"Coluna {inferencia['nomes'][indice]} alargada de {tipo_anterior} para {tipo_novo} "
+                     f"na linha de dados {linha}.")
+
+
+def _vigiar_digito_amostra(inferencia, indice):
+    # O prefixo CD_/NM_ de uma coluna de texto depende de algum valor conter dígito, mesmo que ele caiba no tipo:
+    # enquanto nenhum dos valores vistos tiver dígito, os que passam na validação também precisam ser olhados
+    estatisticas = inferencia['estatisticas'][indice]
+    return (inferencia['categorias'][indice] == 'texto'
+            and not inferencia['nomes'][indice].startswith(('CD_', 'DS_', 'NU_', 'FL_', 'NM_'))
+            and not (estatisticas['tem_digito'] or estatisticas['int'] > 0
+                     or estatisticas['float'] > 0 or estatisticas['data'] > 0))
+
+
+def perfilar_bloco_por_amostra(inferencia, colunas_bloco, tamanho_bloco):
+    # colunas_bloco: valores do bloco coluna a coluna. As linhas da amostra alimentam o perfil completo;
+    # as seguintes só são validadas contra o tipo atual (linha = número da linha de dados, a partir de 1)
+    na_amostra = min(max(AMOSTRA_INFERENCIA_LINHAS - inferencia['linhas'], 0), tamanho_bloco)
+    if na_amostra:
+        for estatisticas, valores in zip(inferencia['estatisticas'], colunas_bloco):
+            for valor in itertools.islice(valores, na_amostra):
+                atualizar_estatisticas_coluna(estatisticas, valor)
+    inferencia['linhas'] += na_amostra
+    if na_amostra == tamanho_bloco:
+        return
+    if inferencia['tipos'] is None:
+        _concluir_amostra(inferencia)
+    primeira_linha = inferencia['linhas'] + 1
+    for indice, valores in enumerate(colunas_bloco):
+        validador = inferencia['validadores'][indice]
+        vigiar_digito = _vigiar_digito_amostra(inferencia, indice)
+        for deslocamento, valor in enumerate(itertools.islice(valores, na_amostra, None)):
+            if valor is None:
+                continue
+            if validador(valor):
+                # Nulos que passam na validação (NaN, NaT) não contêm dígito no texto
+                if vigiar_digito and _RE_DIGITO.search(valor if isinstance(valor, str) else str(valor)):
+                    inferencia['estatisticas'][indice]['tem_digito'] = True
+                    vigiar_digito = False
+                continue
+            if _e_nulo(valor):
+                continue
+            _alargar_coluna_amostra(inferencia, indice, valor, primeira_linha + deslocamento)
+            validador = inferencia['validadores'][indice]
+            vigiar_digito = _vigiar_digito_amostra(inferencia, indice)
+    inferencia['linhas'] += tamanho_bloco - na_amostra
+
+
+def concluir_inferencia_por_amostra(inferencia):
+    # Retorna as estatísticas para montar_ddl_colunas (geram exatamente os tipos já alargados) e grava o relatório
+    if inferencia['tipos'] is None:
+        _concluir_amostra(inferencia)  # Arquivo menor que a amostra
+    relatorio = {
+        'modo': 'amostra',
+        'linhas_amostra': min(inferencia['linhas'], AMOSTRA_INFERENCIA_LINHAS),
+        'linhas_total': inferencia['linhas'],
+        'colunas_alargadas': len({alargamento['coluna'] for alargamento in inferencia['alargamentos']}),
+        # tipo_amostra None = coluna sem valores na amostra
+        'colunas': [{'coluna': nome, 'tipo_amostra': tipo_amostra, 'tipo_final': tipo_final}
+                    for nome, tipo_amostra, tipo_final in zip(inferencia['nomes'], inferencia['tipos_amostra'],
+                                                              inferencia['tipos'])],
+        'alargamentos': inferencia['alargamentos'],
+    }
+    if ARQUIVO_RELATORIO_INFERENCIA:
+        with open(ARQUIVO_RELATORIO_INFERENCIA, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    logging.info(f"Inferência por amostra: {relatorio['colunas_alargadas']} colunas alargadas após a amostra "
+                 f"de {relatorio['linhas_amostra']} de {relatorio['linhas_total']} linhas.")
+    return inferencia['estatisticas']
+
+
+# --- Armazenamento colunar compacto (quando as linhas precisam ficar em memória) ---
+# Cada coluna é montada à medida que as linhas chegam, sem passar por uma lista de linhas:
+# inteiros em array com o menor tipo que comporta os valores, decimais em array de double,
+# textos/datas/booleanos codificados em dicionário e nulos numa máscara de bytes.
+# Colunas mistas ou com textos quase todos distintos caem para uma lista simples de objetos.
+LIMITE_CARDINALIDADE_DICIONARIO = 65536  # Acima disso o dicionário só é mantido se os valores se repetirem
+_TIPOS_ARRAY_INTEIRO = tuple(
+    (tipo, -(1 << (8 * array.array(tipo).itemsize - 1)), (1 << (8 * array.array(tipo).itemsize - 1)) - 1)
+    for tipo in 'bhiq')
+_TIPOS_ARRAY_CODIGO = tuple((tipo, (1 << (8 * array.array(tipo).itemsize)) - 1) for tipo in 'BHI')
+_MAX_INTEIRO_EXATO_FLOAT = 1 << 53
+
+
+def nova_coluna_compacta():
+    return {
+        'modo': 'vazia',  # 'vazia', 'inteiro', 'decimal', 'dicionario' ou 'objetos'
+        'nulos': bytearray(),  # 1 = nulo (a posição em 'dados' guarda um valor qualquer)
+        'dados': None,
+        'codigos': None,  # Só no modo 'dicionario': (tipo, valor) -> código
+        'valores': None,  # Só no modo 'dicionario': código -> valor
+    }
+
+
+def _tipo_array_inteiro(valor, tipo_atual):
+    for tipo, minimo, maximo in _TIPOS_ARRAY_INTEIRO:
+        if minimo <= valor <= maximo and array.array(tipo).itemsize >= array.array(tipo_atual).itemsize:
+            return tipo
+    return None
+
+
+def _converter_coluna_para_objetos(coluna):
+    coluna['dados'] = list(valores_coluna_compacta(coluna))
+    coluna['modo'] = 'objetos'
+    coluna['codigos'] = coluna['valores'] = None
+
+
+def _iniciar_coluna_compacta(coluna, valor):
+    preenchimento = len(coluna['nulos'])
+    if type(valor) is int and _tipo_array_inteiro(valor, 'b'):
+        coluna['modo'] = 'inteiro'
+        coluna['dados'] = array.array(_tipo_array_inteiro(valor, 'b'), bytes(preenchimento))
+    elif type(valor) is float:
+        coluna['modo'] = 'decimal'
+        coluna['dados'] = array.array('d', bytes(8 * preenchimento))
+    else:
+        coluna['modo'] = 'dicionario'
+        coluna['dados'] = array.array('B', bytes(preenchimento))
+        coluna['codigos'] = {}
+        coluna['valores'] = []
+
+
+def _adicionar_ao_dicionario(coluna, valor):
+    # A chave inclui o tipo: True, 1 e 1.0 são iguais para o dict mas formatados de formas diferentes
+    chave = (type(valor), valor)
+    codigo = coluna['codigos'].get(chave)
+    if codigo is None:
+        codigo = len(coluna['valores'])
+        total = len(coluna['nulos'])
+        if codigo >= LIMITE_CARDINALIDADE_DICIONARIO and codigo * 2 > total:
+            return False  # Alta cardinalidade: o dicionário custaria mais que a lista
+        coluna['codigos'][chave] = codigo
+        coluna['valores'].append(valor)
+        dados = coluna['dados']
+        if codigo > dict(_TIPOS_ARRAY_CODIGO)[dados.typecode]:
+            tipo = next(tipo for tipo, maximo in _TIPOS_ARRAY_CODIGO if codigo <= maximo)
+            coluna['dados'] = array.array(tipo, dados)
+    coluna['dados'].append(codigo)
+    return True
+
+
+def adicionar_valor_compacto(coluna, valor):
+    if valor is None or valor is pd.NaT or valor is pd.NA or (isinstance(valor, float) and valor != valor):
+        coluna['nulos'].append(1)
+        if coluna['modo'] == 'objetos':
+            coluna['dados'].append(None)
+        elif coluna['modo'] != 'vazia':
+            coluna['dados'].append(0)
+        return
+    if coluna['modo'] == 'vazia':
+        _iniciar_coluna_compacta(coluna, valor)
+    modo = coluna['modo']
+    if modo == 'inteiro':
+        if type(valor) is int:
+            dados = coluna['dados']
+            tipo = _tipo_array_inteiro(valor, dados.typecode)
+            if tipo is None:
+                _converter_coluna_para_objetos(coluna)
             else:
-                formatted_columns_ddl.append(f'    {col_def}')
+                if tipo != dados.typecode:
+                    coluna['dados'] = array.array(tipo, dados)
+                coluna['nulos'].append(0)
+                coluna['dados'].append(valor)
+                return
+        elif type(valor) is float and max(abs(v) for v in coluna['dados'] or [0]) < _MAX_INTEIRO_EXATO_FLOAT:
+            # Inteiros e decimais na mesma coluna: saem iguais no CSV (3.0 -> '3')
+            coluna['dados'] = array.array('d', coluna['dados'])
+            modo = coluna['modo'] = 'decimal'
+        else:
+            _converter_coluna_para_objetos(coluna)
+    if modo == 'decimal':
+        if type(valor) is float or (type(valor) is int and abs(valor) < _MAX_INTEIRO_EXATO_FLOAT):
+            coluna['nulos'].append(0)
+            coluna['dados'].append(valor)
+            return
+        _converter_coluna_para_objetos(coluna)
+    elif modo == 'dicionario':
+        if _adicionar_ao_dicionario(coluna, valor):
+            coluna['nulos'].append(0)
+            return
+        _converter_coluna_para_objetos(coluna)
+    coluna['nulos'].append(0)
+    coluna['dados'].append(valor)
 
-        create_table_only_sql_content = f"""
--- Script para criar a tabela e conceder permissoes (gerado pelo Python)
--- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-SET DEFINE OFF;
-SET ESCAPE OFF;
-WHENEVER SQLERROR EXIT FAILURE;
+def valores_coluna_compacta(coluna):
+    nulos = coluna['nulos']
+    if coluna['modo'] == 'vazia':
+        return itertools.repeat(None, len(nulos))
+    if coluna['modo'] == 'dicionario':
+        valores = coluna['valores']
+        return (None if nulo else valores[codigo] for nulo, codigo in zip(nulos, coluna['dados']))
+    return (None if nulo else valor for nulo, valor in zip(nulos, coluna['dados']))
 
-CREATE TABLE {nome_tabela_objeto_com_aspas} (
-{chr(10).join(formatted_columns_ddl)}
-);
-/
 
-GRANT ALL ON {nome_tabela_objeto_com_aspas} TO {USUARIO_GRANT};
-/
+def nova_tabela_compacta(num_colunas):
+    return {'colunas': [nova_coluna_compacta() for _ in range(num_colunas)], 'linhas': 0}
 
-PROMPT Tabela criada com sucesso: {nome_tabela_objeto_com_aspas}
-SELECT 'Tabela ' || table_name || ' criada no schema ' || owner || ' e possui ' || num_rows || ' linhas.'
-FROM ALL_TABLES
-WHERE TABLE_NAME = '{nome_tabela_objeto}'
-  AND OWNER = USER;
-/
-EXIT;
-"""
-        with open(ARQUIVO_CREATE_TABLE_SQL, 'w', encoding='utf-8') as f:
-            f.write(create_table_only_sql_content)
-        logging.info(f"Script CREATE TABLE '{ARQUIVO_CREATE_TABLE_SQL}' gerado com sucesso.")
 
+def adicionar_linha_compacta(tabela, row_values):
+    for coluna, valor in zip(tabela['colunas'], row_values):
+        adicionar_valor_compacto(coluna, valor)
+    tabela['linhas'] += 1
 
-    except Exception as e:
-        logging.error(f"OCORREU UM ERRO CRÍTICO na geração de scripts: {e}")
-        print(f"\nOCORREU UM ERRO CRÍTICO na geração de scripts: {e}")
-        print("Por favor, verifique:")
-        print(f"  - O caminho da planilha Excel/CSV: '{CAMINHO_PLANILHA}' está correto e o arquivo existe?")
-        print(f"  - A planilha não está aberta em outro programa?")
-        print(f"  - O parametro TIPO_ARQUIVO ('{TIPO_ARQUIVO}') corresponde ao tipo real do arquivo?")
-        print(f"  - PARA EXCEL: EXCEL_HEADER_ROW_NUM ('{EXCEL_HEADER_ROW_NUM}') está correto (geralmente 1 para linha 1 do Excel)?")
-        print(f"  - PARA EXCEL: EXCEL_DATA_START_ROW_NUM ('{EXCEL_DATA_START_ROW_NUM}') está correto (2 para linha 2 do Excel, etc.)?")
-        print(f"  - NUM_COLUNAS_ESPERADAS_EXCEL ('{NUM_COLUNAS_ESPERADAS_EXCEL}') está correto e corresponde ao número real de colunas que você quer ler?")
-        print(f"  - PARA CSV: DELIMITADOR_ENTRADA_CSV ('{DELIMITADOR_ENTRADA_CSV}') está correto?")
-        print("=========================================================================")
-        exit(1)
+
+def linhas_tabela_compacta(tabela):
+    for row in zip(*(valores_coluna_compacta(coluna) for coluna in tabela['colunas'])):
+        yield list(row)
+
+
+def tamanho_tabela_compacta_bytes(tabela):
+    # Estimativa: arrays pelo tamanho real; dicionários e listas pelos ponteiros e pelos objetos guardados
+    total = 0
+    for coluna in tabela['colunas']:
+        total += len(coluna['nulos'])
+        dados = coluna['dados']
+        if isinstance(dados, array.array):
+            total += dados.itemsize * len(dados)
+        elif dados is not None:
+            total += 8 * len(dados) + sum(sys.getsizeof(valor) for valor in dados if valor is not None)
+        if coluna['valores'] is not None:
+            total += sum(sys.getsizeof(valor) + 100 for valor in coluna['valores'])  # ~100 bytes por entrada do dict
+    return total
+
+
+def resumo_tabela_compacta(tabela):
+    modos = {}
+    for coluna in tabela['colunas']:
+        descricao = coluna['modo'] if not isinstance(coluna['dados'], array.array) \
+            else f"{coluna['modo']}[{coluna['dados'].typecode}]"
+        modos[descricao] = modos.get(descricao, 0) + 1
+    return modos
+
+
+# --- Leitura em streaming (pipeline de geradores) ---
+# --- Motores de leitura de planilhas: cada um entrega as linhas da aba a partir da linha 1 ---
+def _abas_openpyxl(caminho_arquivo):
+    workbook = openpyxl.load_workbook(caminho_arquivo, read_only=True, data_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def _linhas_openpyxl(caminho_arquivo, nome_aba):
+    # read_only=True faz o openpyxl ler o XML em streaming, sem montar todas as células em memória
+    workbook = openpyxl.load_workbook(caminho_arquivo, read_only=True, data_only=True)
+    try:
+        sheet = workbook[nome_aba] if nome_aba else workbook.active
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _valor_calamine(valor):
+    # Converte para os tipos que o openpyxl entregaria, para o CSV e o perfil das colunas saírem iguais
+    if isinstance(valor, str):
+        return valor if valor else None  # Célula vazia chega como ''
+    if isinstance(valor, float):
+        return int(valor) if valor.is_integer() and abs(valor) < 1e15 else valor  # Números inteiros chegam como float
+    if type(valor) is date:
+        return datetime(valor.year, valor.month, valor.day)  # Datas sem hora chegam como date
+    return valor
+
+
+def _abas_calamine(caminho_arquivo):
+    workbook = CalamineWorkbook.from_path(caminho_arquivo)
+    try:
+        return list(workbook.sheet_names)
+    finally:
+        workbook.close()
+
+
+def _linhas_calamine(caminho_arquivo, nome_aba):
+    # Sem nome de aba usa a primeira (o calamine não informa a aba ativa)
+    workbook = CalamineWorkbook.from_path(caminho_arquivo)
+    try:
+        sheet = workbook.get_sheet_by_name(nome_aba) if nome_aba else workbook.get_sheet_by_index(0)
+        # As linhas vêm desde a linha 1, mas as colunas só a partir da primeira coluna usada
+        colunas_vazias = (None,) * sheet.start[1] if sheet.start else ()
+        for row in sheet.iter_rows():
+            yield colunas_vazias + tuple(_valor_calamine(valor) for valor in row)
+    finally:
+        workbook.close()
+
+
+# Em ordem de preferência do modo 'auto' (mais rápido primeiro)
+MOTORES_LEITURA_EXCEL = {
+    'calamine': {
+        'disponivel': lambda: CalamineWorkbook is not None,
+        'extensoes': ('.xlsx', '.xlsm', '.xlsb', '.xls', '.ods'),
+        'abas': _abas_calamine,
+        'linhas': _linhas_calamine,
+    },
+    'openpyxl': {
+        'disponivel': lambda: True,
+        'extensoes': ('.xlsx', '.xlsm'),
+        'abas': _abas_openpyxl,
+        'linhas': _linhas_openpyxl,
+    },
+}
+
+
+def motores_disponiveis(caminho_arquivo):
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    return [nome for nome, motor in MOTORES_LEITURA_EXCEL.items()
+            if motor['disponivel']() and extensao in motor['extensoes']]
+
+
+def escolher_motor_leitura(caminho_arquivo, nome_motor=None):
+    nome_motor = nome_motor or MOTOR_LEITURA_EXCEL
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    if nome_motor != 'auto':
+        motor = MOTORES_LEITURA_EXCEL[nome_motor]
+        if not motor['disponivel']():
+            raise ValueError(f"O motor de leitura '{nome_motor}' não está instalado.")
+        if extensao not in motor['extensoes']:
+            raise ValueError(f"O motor de leitura '{nome_motor}' não lê arquivos '{extensao}'.")
+        return nome_motor
+    disponiveis = motores_disponiveis(caminho_arquivo)
+    if not disponiveis:
+        raise ValueError(f"Nenhum motor de leitura instalado lê arquivos '{extensao}' "
+                         f"(instale o python-calamine para .xlsb/.xls/.ods).")
+    return disponiveis[0]
+
+
+def listar_abas(caminho_arquivo, nome_motor=None):
+    return MOTORES_LEITURA_EXCEL[escolher_motor_leitura(caminho_arquivo, nome_motor)]['abas'](caminho_arquivo)
+
+
+def ler_linhas_excel(caminho_arquivo, nome_aba=None, nome_motor=None):
+    # API comum a todos os motores: primeiro o cabeçalho, depois as linhas de dados
+    linhas = MOTORES_LEITURA_EXCEL[escolher_motor_leitura(caminho_arquivo, nome_motor)]['linhas'](
+        caminho_arquivo, nome_aba)
+    try:
+        header_names_raw = []
+        for numero_linha, row in enumerate(linhas, start=1):
+            if numero_linha == EXCEL_HEADER_ROW_NUM:
+                header_names_raw = list(row)
+                break
+        yield header_names_raw
+        yield from itertools.islice(linhas, max(EXCEL_DATA_START_ROW_NUM - EXCEL_HEADER_ROW_NUM - 1, 0), None)
+    finally:
+        linhas.close()
+
+
+def verificar_paridade_motores(caminho_arquivo, nome_aba=None, max_divergencias=10):
+    # Lê a aba com todos os motores instalados e compara nomes de colunas e linhas já normalizadas
+    # e formatadas como no CSV de saída
+    motores = motores_disponiveis(caminho_arquivo)
+    if not motores:
+        raise ValueError(f"Nenhum motor de leitura instalado lê o arquivo: {caminho_arquivo}")
+    nome_aba = nome_aba or listar_abas(caminho_arquivo, motores[0])[0]  # O padrão de cada motor pode diferir
+    leitores = [ler_linhas_excel(caminho_arquivo, nome_aba, motor) for motor in motores]
+    try:
+        nomes_por_motor = {motor: nomes_colunas_excel(next(linhas)) for motor, linhas in zip(motores, leitores)}
+        num_colunas = len(nomes_por_motor[motores[0]])
+        divergencias = []
+        total_linhas = 0
+        linhas_por_motor = [normalizar_linhas(linhas, num_colunas) for linhas in leitores]
+        for numero_linha, rows in enumerate(itertools.zip_longest(*linhas_por_motor), start=EXCEL_DATA_START_ROW_NUM):
+            total_linhas += 1
+            saidas = [None if row is None else [formatar_valor_saida(valor) for valor in row] for row in rows]
+            if any(saida != saidas[0] for saida in saidas[1:]) and len(divergencias) < max_divergencias:
+                divergencias.append({'linha': numero_linha, 'valores': dict(zip(motores, saidas))})
+    finally:
+        for linhas in leitores:
+            linhas.close()
+
+    colunas_iguais = all(nomes == nomes_por_motor[motores[0]] for nomes in nomes_por_motor.values())
+    resultado = {'motores': motores, 'aba': nome_aba, 'linhas': total_linhas, 'colunas_iguais': colunas_iguais,
+                 'divergencias': divergencias, 'identicos': colunas_iguais and not divergencias}
+    logging.info(f"Paridade dos motores {motores} em '{caminho_arquivo}' (aba '{nome_aba}'): "
+                 f"{'idênticos' if resultado['identicos'] else 'DIVERGENTES'} em {total_linhas} linhas.")
+    return resultado
+
+
+def normalizar_linhas(linhas, num_colunas):
+    normalizar = _normalizar_texto_cache
+    for row in linhas:
+        row_values = [normalizar(cell_value) if isinstance(cell_value, str) else cell_value
+                      for cell_value in row[:num_colunas]]
+        if len(row_values) < num_colunas:
+            # Em modo read_only as linhas podem vir mais curtas que o cabeçalho
+            row_values.extend([None] * (num_colunas - len(row_values)))
+        yield row_values
+
+
+def formatar_valor_saida(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return '1' if valor else '0'  # Colunas booleanas são criadas como NUMBER(1)
+    if isinstance(valor, date):
+        return valor.strftime(FORMATO_DATA_SAIDA)
+    if isinstance(valor, float):
+        if valor != valor:
+            return ''
+        if valor.is_integer() and abs(valor) < 1e15:
+            return str(int(valor))  # 3.0 -> '3' (o pandas promove inteiros a float quando há nulos)
+    return str(valor)
+
+
+def gravar_corpo_e_perfilar(linhas, num_colunas, caminho_corpo, nomes_colunas=None):
+    # Grava as linhas (sem cabeçalho) e acumula as estatísticas de tipo de cada coluna na mesma passada
+    if MODO_INFERENCIA == 'amostra':
+        return gravar_corpo_e_perfilar_por_amostra(linhas, nomes_colunas, caminho_corpo)
+    estatisticas_por_coluna = [novas_estatisticas_coluna() for _ in range(num_colunas)]
+    total_linhas = 0
+    with open(caminho_corpo, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        for row_values in linhas:
+            for estatisticas, valor in zip(estatisticas_por_coluna, row_values):
+                atualizar_estatisticas_coluna(estatisticas, valor)
+            writer.writerow([formatar_valor_saida(valor) for valor in row_values])
+            total_linhas += 1
+    return estatisticas_por_coluna, total_linhas
+
+
+def usar_leitura_paralela_colunas(num_colunas):
+    if not LEITURA_PARALELA_COLUNAS or num_colunas < LEITURA_PARALELA_MIN_COLUNAS:
+        return False
+    if MODO_INFERENCIA == 'amostra':
+        logging.info("Leitura paralela por colunas ignorada: só vale para MODO_INFERENCIA = 'completa'.")
+        return False
+    if multiprocessing.parent_process() is not None:
+        return False  # Já dentro de um processo do modo lote/multiabas: os núcleos já estão ocupados
+    return (LEITURA_PARALELA_PROCESSOS or os.cpu_count() or 1) > 1
+
+
+def grupos_de_colunas(num_colunas, num_grupos):
+    # Índices contíguos e balanceados: [0..k), [k..2k), ...
+    num_grupos = max(1, min(num_grupos, num_colunas))
+    tamanho, resto = divmod(num_colunas, num_grupos)
+    grupos, inicio = [], 0
+    for indice_grupo in range(num_grupos):
+        fim = inicio + tamanho + (1 if indice_grupo < resto else 0)
+        grupos.append(range(inicio, fim))
+        inicio = fim
+    return grupos
+
+
+def _perfilar_grupo_colunas(colunas):
+    # Executado nos processos do pool: recebe só as colunas do grupo e devolve (estatísticas, textos do CSV)
+    resultado = []
+    for valores in colunas:
+        valores = normalizar_coluna(valores)
+        estatisticas = novas_estatisticas_coluna()
+        for valor in valores:
+            atualizar_estatisticas_coluna(estatisticas, valor)
+        resultado.append((estatisticas, [formatar_valor_saida(valor) for valor in valores]))
+    return resultado
+
+
+def blocos_colunas_de_linhas(linhas, num_colunas):
+    # Agrupa as linhas cruas em blocos de CHUNKSIZE e entrega cada bloco coluna a coluna
+    while True:
+        bloco = [list(row[:num_colunas]) + [None] * (num_colunas - len(row))
+                 for row in itertools.islice(linhas, CHUNKSIZE)]
+        if not bloco:
+            return
+        yield list(zip(*bloco))
+
+
+def gravar_corpo_e_perfilar_por_colunas(blocos_colunas, num_colunas, caminho_corpo, max_processos=None):
+    # Mesma saída de gravar_corpo_e_perfilar, com as colunas de cada bloco divididas entre os processos.
+    # Cada grupo recebe só as suas colunas; um bloco fica em processamento enquanto o próximo é lido.
+    grupos = grupos_de_colunas(num_colunas, max_processos or LEITURA_PARALELA_PROCESSOS or os.cpu_count() or 1)
+    estatisticas_por_coluna = [novas_estatisticas_coluna() for _ in range(num_colunas)]
+    total_linhas = 0
+    with ProcessPoolExecutor(max_workers=len(grupos)) as executor, \
+            open(caminho_corpo, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+
+        def gravar_bloco(futuros):
+            textos = [None] * num_colunas
+            for grupo, futuro in zip(grupos, futuros):
+                for indice, (estatisticas, textos_coluna) in zip(grupo, futuro.result()):
+                    mesclar_estatisticas_coluna(estatisticas_por_coluna[indice], estatisticas)
+                    textos[indice] = textos_coluna
+            writer.writerows(zip(*textos))
+
+        pendente = None
+        for colunas_bloco in blocos_colunas:
+            futuros = [executor.submit(_perfilar_grupo_colunas, [colunas_bloco[i] for i in grupo]) for grupo in grupos]
+            total_linhas += len(colunas_bloco[0]) if colunas_bloco else 0
+            if pendente is not None:
+                gravar_bloco(pendente)
+            pendente = futuros
+        if pendente is not None:
+            gravar_bloco(pendente)
+    return estatisticas_por_coluna, total_linhas
+
+
+def gravar_corpo_e_perfilar_por_amostra(linhas, nomes_colunas, caminho_corpo):
+    # Mesma saída de gravar_corpo_e_perfilar; as linhas são agrupadas em blocos para validar coluna a coluna
+    inferencia = nova_inferencia_por_amostra(nomes_colunas)
+    total_linhas = 0
+    with open(caminho_corpo, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        while True:
+            bloco = list(itertools.islice(linhas, CHUNKSIZE))
+            if not bloco:
+                break
+            writer.writerows([formatar_valor_saida(valor) for valor in row_values] for row_values in bloco)
+            perfilar_bloco_por_amostra(inferencia, list(zip(*bloco)), len(bloco))
+            total_linhas += len(bloco)
+    return concluir_inferencia_por_amostra(inferencia), total_linhas
+
+
+def finalizar_arquivo_dados(nomes_colunas_oracle, caminho_corpo, caminho_saida):
+    # O cabeçalho só é conhecido após a inferência; ele é gravado primeiro e o corpo é anexado em blocos
+    with open(caminho_saida, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(nomes_colunas_oracle)
+    with open(caminho_saida, 'ab') as destino, open(caminho_corpo, 'rb') as origem:
+        shutil.copyfileobj(origem, destino, 1024 * 1024)
+    os.remove(caminho_corpo)
+
+
+def nomes_colunas_excel(header_names_raw):
+    logging.debug(f"Nomes brutos das colunas lidos do Excel: {_resumo_lista(header_names_raw)}")
+    header_names_cleaned_temp = [limpar_nome_coluna(name) for name in header_names_raw]
+    header_names_filtered = [name for name in header_names_cleaned_temp if name not in ['COL_VAZIA_PADRAO', 'COL_VAZIA_TEMP']]
+    logging.debug(f"Nomes limpos das colunas do Excel (filtrados): {_resumo_lista(header_names_filtered)}")
+
+    final_column_names_from_excel = deduplicar_nomes_colunas(header_names_filtered)  # Nomes limpos da planilha (temporários)
+    logging.debug(f"Nomes finais das colunas ajustados (para duplicatas): {_resumo_lista(final_column_names_from_excel)}")
+    return final_column_names_from_excel
+
+
+def listar_abas_nao_vazias(caminho_arquivo):
+    # Uma aba conta como não vazia quando a linha de cabeçalho tem ao menos uma célula preenchida
+    abas = []
+    for nome_aba in listar_abas(caminho_arquivo):
+        linhas = ler_linhas_excel(caminho_arquivo, nome_aba)
+        try:
+            header_names_raw = next(linhas)
+        finally:
+            linhas.close()
+        if any(valor is not None and str(valor).strip() for valor in header_names_raw):
+            abas.append(nome_aba)
+    return abas
+
+
+def processar_excel_streaming(caminho_arquivo, nome_aba=None, registro_cache=None):
+    linhas = ler_linhas_excel(caminho_arquivo, nome_aba)
+    final_column_names_from_excel = nomes_colunas_excel(next(linhas))
+    NUM_COLUNAS_REAIS_LIDAS = len(final_column_names_from_excel)
+    paralela = usar_leitura_paralela_colunas(NUM_COLUNAS_REAIS_LIDAS)
+    if paralela:
+        registro_cache = None  # Os valores normalizados ficam nos processos do pool
+    linhas_normalizadas = normalizar_linhas(linhas, NUM_COLUNAS_REAIS_LIDAS)
+    if registro_cache is not None:
+        linhas_normalizadas = linhas_com_registro_cache(registro_cache, linhas_normalizadas)
+
+    caminho_corpo = f"{ARQUIVO_DADOS_PLANO}.corpo.tmp"
+    try:
+        with medir_etapa('leitura_excel', aba=nome_aba, colunas=NUM_COLUNAS_REAIS_LIDAS,
+                         bytes=os.path.getsize(caminho_arquivo), paralela=paralela) as etapa:
+            if paralela:
+                estatisticas_por_coluna, total_linhas = gravar_corpo_e_perfilar_por_colunas(
+                    blocos_colunas_de_linhas(linhas, NUM_COLUNAS_REAIS_LIDAS), NUM_COLUNAS_REAIS_LIDAS, caminho_corpo)
+            else:
+                estatisticas_por_coluna, total_linhas = gravar_corpo_e_perfilar(
+                    linhas_normalizadas, NUM_COLUNAS_REAIS_LIDAS, caminho_corpo, final_column_names_from_excel)
+            etapa['linhas'] = total_linhas
+    finally:
+        linhas.close()
+    logging.debug(f"Número de linhas de dados lidas do Excel: {total_linhas}")
+    if registro_cache is not None:
+        gravar_cache_leitura(registro_cache, final_column_names_from_excel, estatisticas_por_coluna)
+
+    return concluir_arquivo_dados(final_column_names_from_excel, estatisticas_por_coluna, caminho_corpo)
+
+
+def concluir_arquivo_dados(nomes_colunas, estatisticas_por_coluna, caminho_corpo):
+    with medir_etapa('inferencia_tipos', colunas=len(nomes_colunas)):
+        columns_ddl_list, col_mapping = montar_ddl_colunas(nomes_colunas, estatisticas_por_coluna)
+    logging.debug(f"Lista de colunas para DDL: {_resumo_lista(columns_ddl_list)}")
+    logging.debug(f"Mapeamento de colunas Excel para Oracle: {_resumo_lista(col_mapping.items())}")
+
+    # O CSV recebe os nomes exatos do banco no cabeçalho
+    with medir_etapa('gravacao_csv_final', bytes=os.path.getsize(caminho_corpo)):
+        finalizar_arquivo_dados([col_mapping[c] for c in nomes_colunas], caminho_corpo, ARQUIVO_DADOS_PLANO)
+    logging.info(f"Dados convertidos e salvos em CSV para SQL Loader: {ARQUIVO_DADOS_PLANO}")
+    return columns_ddl_list
+
+
+def ler_blocos_csv(caminho_arquivo):
+    with pd.read_csv(caminho_arquivo, delimiter=DELIMITADOR_ENTRADA_CSV, chunksize=CHUNKSIZE) as leitor:
+        for chunk in leitor:
+            yield chunk
+
+
+def nomes_colunas_csv(caminho_arquivo):
+    # nrows=0 lê apenas o cabeçalho, sem custo proporcional ao tamanho do arquivo
+    header_names_raw = pd.read_csv(caminho_arquivo, delimiter=DELIMITADOR_ENTRADA_CSV, nrows=0).columns.tolist()
+    logging.debug(f"Nomes brutos das colunas lidos do CSV: {_resumo_lista(header_names_raw)}")
+
+    final_column_names_from_csv = deduplicar_nomes_colunas([limpar_nome_coluna(col) for col in header_names_raw])
+    logging.debug(f"Nomes finais das colunas do CSV: {_resumo_lista(final_column_names_from_csv)}")
+    return final_column_names_from_csv
+
+
+def ler_colunas_normalizadas_csv(caminho_arquivo):
+    # Cada bloco é entregue coluna a coluna, já normalizado
+    for chunk in ler_blocos_csv(caminho_arquivo):
+        yield [normalizar_coluna(chunk.iloc[:, idx].tolist()) for idx in range(chunk.shape[1])]
+
+
+def processar_csv_em_blocos(caminho_arquivo, registro_cache=None):
+    final_column_names_from_csv = nomes_colunas_csv(caminho_arquivo)
+
+    estatisticas_por_coluna = [novas_estatisticas_coluna() for _ in final_column_names_from_csv]
+    inferencia = nova_inferencia_por_amostra(final_column_names_from_csv) if MODO_INFERENCIA == 'amostra' else None
+    total_linhas = 0
+    total_blocos = 0
+    caminho_corpo = f"{ARQUIVO_DADOS_PLANO}.corpo.tmp"
+    if usar_leitura_paralela_colunas(len(final_column_names_from_csv)):
+        # Os blocos vão crus para o pool; normalização e perfil acontecem lá, grupo de colunas por processo
+        with medir_etapa('leitura_csv', colunas=len(final_column_names_from_csv),
+                         bytes=os.path.getsize(caminho_arquivo), paralela=True) as etapa:
+            blocos_colunas = ([chunk.iloc[:, idx].tolist() for idx in range(chunk.shape[1])]
+                              for chunk in ler_blocos_csv(caminho_arquivo))
+            estatisticas_por_coluna, total_linhas = gravar_corpo_e_perfilar_por_colunas(
+                blocos_colunas, len(final_column_names_from_csv), caminho_corpo)
+            etapa['linhas'] = total_linhas
+        return concluir_arquivo_dados(final_column_names_from_csv, estatisticas_por_coluna, caminho_corpo)
+    with medir_etapa('leitura_csv', colunas=len(final_column_names_from_csv),
+                     bytes=os.path.getsize(caminho_arquivo)) as etapa, \
+            open(caminho_corpo, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        for colunas_bloco in ler_colunas_normalizadas_csv(caminho_arquivo):
+            tamanho_bloco = len(colunas_bloco[0]) if colunas_bloco else 0
+            if inferencia is not None:
+                perfilar_bloco_por_amostra(inferencia, colunas_bloco, tamanho_bloco)
+            else:
+                # Gera as estatísticas do bloco e mescla no total.
+                # Os dtypes podem variar entre blocos; as estatísticas por valor tornam a mescla independente disso.
+                for estatisticas, valores in zip(estatisticas_por_coluna, colunas_bloco):
+                    estatisticas_bloco = novas_estatisticas_coluna()
+                    for valor in valores:
+                        atualizar_estatisticas_coluna(estatisticas_bloco, valor)
+                    mesclar_estatisticas_coluna(estatisticas, estatisticas_bloco)
+            writer.writerows([formatar_valor_saida(valor) for valor in linha] for linha in zip(*colunas_bloco))
+            if registro_cache is not None:
+                for linha in zip(*colunas_bloco):
+                    registrar_linha_cache(registro_cache, linha)
+            total_linhas += tamanho_bloco
+            total_blocos += 1
+        if inferencia is not None:
+            estatisticas_por_coluna = concluir_inferencia_por_amostra(inferencia)
+        etapa['linhas'] = total_linhas
+        etapa['blocos'] = total_blocos
+    logging.debug(f"Número de linhas de dados lidas do CSV: {total_linhas} (em {total_blocos} blocos de até {CHUNKSIZE})")
+    if registro_cache is not None:
+        gravar_cache_leitura(registro_cache, final_column_names_from_csv, estatisticas_por_coluna)
+
+    return concluir_arquivo_dados(final_column_names_from_csv, estatisticas_por_coluna, caminho_corpo)
+
+
+def ler_linhas_normalizadas(caminho_arquivo, tipo_arquivo, nome_aba=None):
+    # Fonte única de linhas normalizadas (Excel ou CSV): retorna os nomes limpos e um gerador de linhas
+    if tipo_arquivo.lower() == 'excel':
+        linhas = ler_linhas_excel(caminho_arquivo, nome_aba)
+        nomes_colunas = nomes_colunas_excel(next(linhas))
+        return nomes_colunas, normalizar_linhas(linhas, len(nomes_colunas))
+    elif tipo_arquivo.lower() == 'csv':
+        nomes_colunas = nomes_colunas_csv(caminho_arquivo)
+        linhas = (list(linha) for colunas_bloco in ler_colunas_normalizadas_csv(caminho_arquivo)
+                  for linha in zip(*colunas_bloco))
+        return nomes_colunas, linhas
+    raise ValueError("Tipo de arquivo não suportado. Use 'excel' ou 'csv'.")
+
+
+# --- Cache da leitura: valores normalizados + estatísticas por hash do conteúdo ---
+# Incremente ao mudar a normalização, a limpeza dos nomes ou as estatísticas de tipo: invalida o cache
+VERSAO_REGRAS_NORMALIZACAO = 2
+
+
+def hash_conteudo_arquivo(caminho_arquivo):
+    sha256 = hashlib.sha256()
+    with open(caminho_arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def chave_cache_leitura(caminho_arquivo, tipo_arquivo, nome_aba=None):
+    # Só entra na chave o que muda os valores lidos ou as estatísticas; a formatação do CSV é refeita a cada uso
+    parametros = {
+        'versao': VERSAO_REGRAS_NORMALIZACAO,
+        'tipo': tipo_arquivo.lower(),
+        # Cada motor converte os valores de um jeito (ex.: o calamine entrega inteiros como float)
+        'motor': escolher_motor_leitura(caminho_arquivo) if tipo_arquivo.lower() == 'excel' else None,
+        'aba': nome_aba,
+        'linha_cabecalho': EXCEL_HEADER_ROW_NUM,
+        'linha_inicio_dados': EXCEL_DATA_START_ROW_NUM,
+        'colunas_esperadas': NUM_COLUNAS_ESPERADAS_EXCEL,
+        'delimitador_entrada': DELIMITADOR_ENTRADA_CSV if tipo_arquivo.lower() == 'csv' else None,
+        'inferencia': MODO_INFERENCIA,
+        'amostra': AMOSTRA_INFERENCIA_LINHAS if MODO_INFERENCIA == 'amostra' else None,
+        'formato_data': FORMATO_DATA_SAIDA,  # O tamanho das datas nas estatísticas segue o formato de saída
+    }
+    with medir_etapa('hash_entrada', bytes=os.path.getsize(caminho_arquivo)):
+        hash_conteudo = hash_conteudo_arquivo(caminho_arquivo)
+    return hashlib.sha256(f"{hash_conteudo}|{json.dumps(parametros, sort_keys=True)}".encode('utf-8')).hexdigest()
+
+
+def caminho_cache_leitura(chave):
+    return os.path.join(PASTA_CACHE_LEITURA, f"{chave}.pkl")
+
+
+def novo_registro_cache_leitura(chave):
+    # A tabela compacta nasce na primeira linha (o número de colunas só é conhecido na leitura)
+    return {'chave': chave, 'tabela': None, 'descartado': False}
+
+
+def registrar_linha_cache(registro, row_values):
+    if registro['descartado']:
+        return
+    tabela = registro['tabela']
+    if tabela is None:
+        tabela = registro['tabela'] = nova_tabela_compacta(len(row_values))
+    elif tabela['linhas'] >= CACHE_LEITURA_MAX_LINHAS:
+        logging.info(f"Arquivo com mais de {CACHE_LEITURA_MAX_LINHAS} linhas: não será guardado no cache de leitura.")
+        registro['descartado'] = True
+        registro['tabela'] = None
+        return
+    adicionar_linha_compacta(tabela, row_values)
+
+
+def linhas_com_registro_cache(registro, linhas):
+    for row_values in linhas:
+        registrar_linha_cache(registro, row_values)
+        yield row_values
+
+
+def gravar_cache_leitura(registro, nomes_colunas, estatisticas_por_coluna):
+    if registro['descartado']:
+        return
+    tabela = registro['tabela'] or nova_tabela_compacta(len(nomes_colunas))
+    for coluna in tabela['colunas']:
+        coluna['codigos'] = None  # Só serve para acrescentar valores; a leitura usa 'valores'
+    entrada = {'versao': VERSAO_REGRAS_NORMALIZACAO, 'nomes_colunas': nomes_colunas,
+               'estatisticas_por_coluna': estatisticas_por_coluna, 'tabela': tabela}
+    os.makedirs(PASTA_CACHE_LEITURA, exist_ok=True)
+    caminho = caminho_cache_leitura(registro['chave'])
+    caminho_tmp = f"{caminho}.{os.getpid()}.tmp"  # Processos do modo lote podem gravar ao mesmo tempo
+    with medir_etapa('gravacao_cache_leitura', linhas=tabela['linhas']):
+        with open(caminho_tmp, 'wb') as f:
+            pickle.dump(entrada, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(caminho_tmp, caminho)
+    logging.info(f"Leitura guardada no cache: {caminho} ({os.path.getsize(caminho) / (1024 * 1024):.1f} MB).")
+    limpar_cache_leitura()
+
+
+def ler_cache_leitura(chave):
+    caminho = caminho_cache_leitura(chave)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, 'rb') as f:
+            entrada = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError) as e:
+        logging.warning(f"Entrada do cache de leitura ilegível ({e}); o arquivo será lido de novo: {caminho}")
+        with contextlib.suppress(OSError):
+            os.remove(caminho)
+        return None
+    if entrada.get('versao') != VERSAO_REGRAS_NORMALIZACAO:
+        return None
+    with contextlib.suppress(OSError):
+        os.utime(caminho)  # A data de modificação marca o último uso (remoção das menos usadas)
+    return entrada
+
+
+def limpar_cache_leitura(tamanho_max_mb=None):
+    # Remove as entradas usadas há mais tempo até o cache caber no limite; retorna quantas foram removidas
+    tamanho_max = (tamanho_max_mb if tamanho_max_mb is not None else CACHE_LEITURA_TAMANHO_MAX_MB) * 1024 * 1024
+    entradas = []
+    for caminho in glob.glob(os.path.join(PASTA_CACHE_LEITURA, '*.pkl')):
+        with contextlib.suppress(OSError):
+            estado = os.stat(caminho)
+            entradas.append((estado.st_mtime, estado.st_size, caminho))
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    removidas = 0
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= tamanho_max:
+            break
+        try:
+            os.remove(caminho)
+        except OSError:
+            continue  # Em uso por outro processo (Windows)
+        total -= tamanho
+        removidas += 1
+    if removidas:
+        logging.info(f"Cache de leitura: {removidas} entradas antigas removidas ({total / (1024 * 1024):.1f} MB restantes).")
+    return removidas
+
+
+def _textos_coluna_cache(coluna):
+    # Formata a coluna inteira de uma vez; no modo dicionário cada valor distinto é formatado uma única vez
+    nulos = coluna['nulos']
+    if coluna['modo'] == 'vazia':
+        return [''] * len(nulos)
+    if coluna['modo'] == 'dicionario':
+        textos = [formatar_valor_saida(valor) for valor in coluna['valores']]
+        return ['' if nulo else textos[codigo] for nulo, codigo in zip(nulos, coluna['dados'])]
+    formatar = str if coluna['modo'] == 'inteiro' else formatar_valor_saida
+    return ['' if nulo else formatar(valor) for nulo, valor in zip(nulos, coluna['dados'])]
+
+
+def processar_do_cache_leitura(entrada):
+    # Refaz o CSV com os parâmetros de saída atuais (delimitador, formato de data) e segue como numa leitura normal
+    tabela = entrada['tabela']
+    caminho_corpo = f"{ARQUIVO_DADOS_PLANO}.corpo.tmp"
+    with medir_etapa('leitura_cache', linhas=tabela['linhas'], colunas=len(entrada['nomes_colunas'])), \
+            open(caminho_corpo, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerows(zip(*(_textos_coluna_cache(coluna) for coluna in tabela['colunas'])))
+    return concluir_arquivo_dados(entrada['nomes_colunas'], entrada['estatisticas_por_coluna'], caminho_corpo)
+
+
+# --- Arquivos do SQL*Loader (.ctl/.par) gerados a partir do DDL ---
+_RE_DEFINICAO_COLUNA = re.compile(r'^"(?P<nome>[^"]+)"\s+(?P<tipo>.+)$')
+_RE_TIPO_NUMBER = re.compile(r'^NUMBER(?:\((?P<precisao>\d+)(?:,(?P<escala>\d+))?\))?$')
+_RE_TIPO_VARCHAR2 = re.compile(r'^VARCHAR2\((?P<tamanho>\d+)(?: CHAR| BYTE)?\)$')
+
+
+def separar_definicao_coluna(col_def):
+    match = _RE_DEFINICAO_COLUNA.match(col_def)
+    if not match:
+        raise ValueError(f"Definição de coluna inválida: {col_def}")
+    return match.group('nome'), match.group('tipo')
+
+
+def especificacao_campo_sqlldr(oracle_type):
+    match_number = _RE_TIPO_NUMBER.match(oracle_type)
+    if match_number:
+        if match_number.group('precisao') and not match_number.group('escala'):
+            return "INTEGER EXTERNAL"
+        return "DECIMAL EXTERNAL"
+    if oracle_type == "DATE":
+        return f'DATE "{SQLLDR_MASCARA_DATA}"'
+    match_varchar2 = _RE_TIPO_VARCHAR2.match(oracle_type)
+    if match_varchar2:
+        return f"CHAR({match_varchar2.group('tamanho')})"
+    if oracle_type == "CLOB":
+        return f"CHAR({SQLLDR_TAMANHO_MAX_CLOB})"
+    return "CHAR"
+
+
+def caminho_na_pasta_vpn(nome_arquivo):
+    return f"{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(nome_arquivo)}"
+
+
+def pasta_staging_vpn():
+    # Subpasta com o nome da pasta de saída: no modo lote/multiabas/monitor cada tabela tem a sua
+    nome_pasta_saida = PASTA_LOCAL_VPN_PARA_EXECUCAO.rstrip('\\').rsplit('\\', 1)[-1]
+    return f"{PASTA_STAGING_VPN}\\{nome_pasta_saida}"
+
+
+def caminho_dados_na_vpn(nome_arquivo):
+    # Com o pacote de transferência o sqlldr lê a cópia local; sem ele, direto da pasta compartilhada
+    if PACOTE_TRANSFERENCIA:
+        return f"{pasta_staging_vpn()}\\{os.path.basename(nome_arquivo)}"
+    return caminho_na_pasta_vpn(nome_arquivo)
+
+
+def gerar_conteudo_ctl_sqlldr(nome_tabela_objeto_com_aspas, columns_ddl_list, arquivo_dados=None):
+    campos = []
+    for col_def in columns_ddl_list:
+        nome_coluna, oracle_type = separar_definicao_coluna(col_def)
+        campos.append(f'  "{nome_coluna}" {especificacao_campo_sqlldr(oracle_type)}')
+    # UNRECOVERABLE só é aceito pelo SQL*Loader em direct path
+    unrecoverable = "UNRECOVERABLE " if SQLLDR_DIRECT and SQLLDR_UNRECOVERABLE else ""
+    campos_formatados = ",\n".join(campos)
+    # Na carga particionada cada .ctl aponta para o seu próprio arquivo de dados
+    infile = f"INFILE '{caminho_dados_na_vpn(arquivo_dados)}'\n" if arquivo_dados else ""
+    return f"""-- Arquivo de controle do SQL*Loader (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+{unrecoverable}LOAD DATA
+CHARACTERSET AL32UTF8
+LENGTH SEMANTICS CHAR
+{infile}APPEND
+INTO TABLE {nome_tabela_objeto_com_aspas}
+FIELDS TERMINATED BY '{CSV_DELIMITADOR_SAIDA}' OPTIONALLY ENCLOSED BY '"'
+TRAILING NULLCOLS
+(
+{campos_formatados}
+)
+"""
+
+
+def gerar_conteudo_par_sqlldr(arquivo_ctl=None, arquivo_dados=None, nome_base_log='sqlldr', paralelo=False,
+                              linhas_por_save=None):
+    # O userid NÃO é gravado aqui: o PowerShell o informa na linha de comando do sqlldr
+    arquivo_ctl = arquivo_ctl or ARQUIVO_SQLLDR_CTL
+    arquivo_dados = arquivo_dados or ARQUIVO_DADOS_PLANO
+    linhas = [f'control="{caminho_na_pasta_vpn(arquivo_ctl)}"']
+    if not paralelo:
+        linhas.append(f'data="{caminho_dados_na_vpn(arquivo_dados)}"')  # Na carga paralela o INFILE está no .ctl
+    linhas += [
+        f'log="{caminho_na_pasta_vpn(nome_base_log + ".log")}"',
+        f'bad="{caminho_na_pasta_vpn(nome_base_log + ".bad")}"',
+        f'discard="{caminho_na_pasta_vpn(nome_base_log + ".dsc")}"',
+        'skip=1',  # Cabeçalho do CSV
+        f'direct={"true" if SQLLDR_DIRECT else "false"}',
+        f'rows={linhas_por_save or SQLLDR_ROWS}',
+        f'readsize={SQLLDR_READSIZE}',
+    ]
+    if SQLLDR_DIRECT:
+        linhas.append(f'multithreading={"true" if SQLLDR_MULTITHREADING else "false"}')
+        if paralelo:
+            linhas.append('parallel=true')  # Várias sessões direct path na mesma tabela
+    else:
+        linhas.append(f'bindsize={SQLLDR_BINDSIZE}')
+    return "\n".join(linhas) + "\n"
+
+
+def gerar_arquivos_sqlldr(nome_tabela_objeto_com_aspas, columns_ddl_list, arquivos_particoes=None):
+    if arquivos_particoes:
+        for indice, arquivo_dados in enumerate(arquivos_particoes, start=1):
+            arquivo_ctl = nome_arquivo_particao(ARQUIVO_SQLLDR_CTL, indice)
+            arquivo_par = nome_arquivo_particao(ARQUIVO_SQLLDR_PAR, indice)
+            with open(arquivo_ctl, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_ctl_sqlldr(nome_tabela_objeto_com_aspas, columns_ddl_list, arquivo_dados))
+            with open(arquivo_par, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_par_sqlldr(arquivo_ctl, arquivo_dados,
+                                                  nome_arquivo_particao('sqlldr', indice), paralelo=True))
+        logging.info(f"{len(arquivos_particoes)} pares .ctl/.par do SQL*Loader gerados para a carga paralela.")
+        return
+    with open(ARQUIVO_SQLLDR_CTL, 'w', encoding='utf-8') as f:
+        f.write(gerar_conteudo_ctl_sqlldr(nome_tabela_objeto_com_aspas, columns_ddl_list))
+    logging.info(f"Arquivo de controle do SQL*Loader '{ARQUIVO_SQLLDR_CTL}' gerado com sucesso.")
+    with open(ARQUIVO_SQLLDR_PAR, 'w', encoding='utf-8') as f:
+        f.write(gerar_conteudo_par_sqlldr())
+    logging.info(f"Arquivo de parâmetros do SQL*Loader '{ARQUIVO_SQLLDR_PAR}' gerado com sucesso.")
+
+
+# --- Carga paralela: divisão do arquivo de dados e orquestração no PowerShell ---
+def nome_arquivo_particao(nome_arquivo, indice):
+    base, extensao = os.path.splitext(nome_arquivo)
+    return f"{base}_p{indice:02d}{extensao}"
+
+
+def particionar_arquivo_dados(caminho_dados, num_particoes):
+    # Usa csv.reader (e não split por linhas) porque textos normalizados podem conter quebras de linha entre aspas
+    with open(caminho_dados, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=CSV_DELIMITADOR_SAIDA)
+        next(reader)
+        total_registros = sum(1 for _ in reader)
+
+    # Blocos contíguos cujos tamanhos diferem em no máximo uma linha
+    tamanho_base, resto = divmod(total_registros, num_particoes)
+    tamanhos = [tamanho_base + (1 if i < resto else 0) for i in range(num_particoes)]
+    arquivos_particoes = [nome_arquivo_particao(caminho_dados, i) for i in range(1, num_particoes + 1)]
+
+    with open(caminho_dados, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=CSV_DELIMITADOR_SAIDA)
+        cabecalho = next(reader)
+        for arquivo_particao, tamanho in zip(arquivos_particoes, tamanhos):
+            with open(arquivo_particao, 'w', encoding='utf-8-sig', newline='') as saida:
+                writer = csv.writer(saida, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+                writer.writerow(cabecalho)  # Cada partição tem cabeçalho (skip=1 no .par)
+                writer.writerows(itertools.islice(reader, tamanho))
+    os.remove(caminho_dados)
+    logging.info(f"{total_registros} linhas divididas em {num_particoes} arquivos: {tamanhos}")
+    return arquivos_particoes
+
+
+def gerar_conteudo_powershell_sqlldr_paralelo(num_particoes):
+    particoes_ps = ",\n".join(
+        f'    @{{ Par = "{caminho_na_pasta_vpn(nome_arquivo_particao(ARQUIVO_SQLLDR_PAR, i))}"; '
+        f'Log = "{caminho_na_pasta_vpn(nome_arquivo_particao("sqlldr.log", i))}" }}'
+        for i in range(1, num_particoes + 1))
+    return f"""
+$ErrorActionPreference = 'Stop'
+
+# Arquivos de cada partição (gerados pelo Python)
+$particoes = @(
+{particoes_ps}
+)
+$logPath = "{caminho_na_pasta_vpn('sqlldr.log')}"
+
+# Dados de conexão (serão passados do Batch via variáveis de ambiente/parâmetros)
+$usuario = $env:DB_USER_SQL
+$senha = $env:DB_PASS_SQL
+$dsn = $env:DB_DSN_SQL
+
+# Configurações de ambiente Oracle (do Python)
+$env:ORACLE_HOME = "{ORACLE_HOME_PATH}"
+$env:PATH = "$env:ORACLE_HOME\\BIN;$env:PATH"
+$env:NLS_LANG = "{NLS_LANG_VALUE}"
+# SQLLDR_EXE permite apontar para outro executável (ex.: um stub para testar a orquestração sem banco)
+$sqlldrExe = if ($env:SQLLDR_EXE) {{ $env:SQLLDR_EXE }} else {{ "sqlldr" }}
+{gerar_bloco_powershell_preparar_pacote() if PACOTE_TRANSFERENCIA else ''}
+foreach ($p in $particoes) {{
+    if (-not (Test-Path $p.Par)) {{
+        Write-Host "❌ Arquivo nao encontrado: $($p.Par)" -ForegroundColor Red
+        exit 1
+    }}
+}}
+
+Write-Host "`n▶️  Iniciando $($particoes.Count) sessoes SQL*Loader em paralelo (direct path, PARALLEL=TRUE)..." -ForegroundColor Cyan
+$processos = foreach ($p in $particoes) {{
+    $proc = Start-Process -FilePath $sqlldrExe -ArgumentList @("userid=$usuario/$senha@$dsn", "parfile=`"$($p.Par)`"") -NoNewWindow -PassThru
+    $null = $proc.Handle # Mantem o handle aberto para que ExitCode fique disponivel apos o termino
+    $proc
+}}
+$processos | Wait-Process
+
+# Consolida codigos de saida (pior caso: 3 fatal > 1 erro > 2 aviso > 0 sucesso) e logs
+$codigoSaida = 0
+for ($i = 0; $i -lt $particoes.Count; $i++) {{
+    $codigo = $processos[$i].ExitCode
+    $linhasCarregadas = ""
+    if (Test-Path $particoes[$i].Log) {{
+        $linhasCarregadas = (Select-String -Path $particoes[$i].Log -Pattern "successfully loaded|carregad" | Select-Object -First 1).Line
+    }}
+    Write-Host "Particao $($i + 1): codigo $codigo $linhasCarregadas"
+    if ($codigo -eq 3 -or ($codigo -eq 1 -and $codigoSaida -ne 3) -or ($codigo -eq 2 -and $codigoSaida -eq 0)) {{
+        $codigoSaida = $codigo
+    }}
+}}
+$particoes | ForEach-Object {{ if (Test-Path $_.Log) {{ Get-Content $_.Log }} }} | Set-Content -Path $logPath
+
+if ($codigoSaida -eq 0) {{
+    Write-Host "`n✅ Carga paralela concluida com sucesso." -ForegroundColor Green
+}} elseif ($codigoSaida -eq 2) {{
+    Write-Host "`n⚠️  Carga paralela concluida com avisos (linhas rejeitadas). Verifique os arquivos .bad." -ForegroundColor Yellow
+}} else {{
+    Write-Host "`n❌ Erro em ao menos uma sessao do SQL*Loader. Verifique o log consolidado: $logPath" -ForegroundColor Red
+}}
+exit $codigoSaida
+"""
+
+
+# --- Carga retomável: segmentos numerados, checkpoint no PowerShell e retomada sem DROP/CREATE ---
+def nome_arquivo_segmento(nome_arquivo, indice):
+    base, extensao = os.path.splitext(nome_arquivo)
+    return f"{base}_s{indice:04d}{extensao}"
+
+
+def segmentar_arquivo_dados(caminho_dados, linhas_por_segmento, nome_tabela_objeto):
+    segmentos = []
+    with open(caminho_dados, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=CSV_DELIMITADOR_SAIDA)
+        cabecalho = next(reader)
+        while True:
+            primeiro_registro = next(reader, None)
+            if primeiro_registro is None and segmentos:
+                break
+            arquivo_segmento = nome_arquivo_segmento(caminho_dados, len(segmentos) + 1)
+            with open(arquivo_segmento, 'w', encoding='utf-8-sig', newline='') as saida:
+                writer = csv.writer(saida, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+                writer.writerow(cabecalho)  # Cada segmento tem cabeçalho (skip=1 no .par)
+                linhas = 0
+                if primeiro_registro is not None:
+                    writer.writerow(primeiro_registro)
+                    linhas = 1 + sum(1 for _ in map(writer.writerow,
+                                                    itertools.islice(reader, linhas_por_segmento - 1)))
+            segmentos.append({'numero': len(segmentos) + 1, 'arquivo': arquivo_segmento, 'linhas': linhas})
+            if primeiro_registro is None:
+                break  # Arquivo sem linhas: um segmento só com o cabeçalho
+    os.remove(caminho_dados)
+
+    data = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    # Identifica esta geração: um checkpoint de outra geração nunca é usado para retomar
+    geracao = hashlib.sha256(json.dumps([nome_tabela_objeto, data, segmentos]).encode('utf-8')).hexdigest()[:16]
+    manifesto = {'geracao': geracao, 'data': data, 'tabela': nome_tabela_objeto, 'segmentos': segmentos}
+    with open(ARQUIVO_MANIFESTO_SEGMENTOS, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    if os.path.exists(ARQUIVO_CHECKPOINT_CARGA):
+        os.remove(ARQUIVO_CHECKPOINT_CARGA)  # Checkpoint da carga anterior: os dados mudaram
+    if not SQLLDR_DIRECT:
+        logging.warning("Carga retomável em conventional path: um segmento interrompido pode ter sido carregado "
+                        "em parte e será recarregado por inteiro na retomada.")
+    logging.info(f"{sum(s['linhas'] for s in segmentos)} linhas divididas em {len(segmentos)} segmentos "
+                 f"de até {linhas_por_segmento} linhas (geração {geracao}).")
+    return manifesto
+
+
+def gerar_arquivos_sqlldr_segmentos(nome_tabela_objeto_com_aspas, columns_ddl_list, segmentos):
+    # Um .ctl sem INFILE para todos; cada .par aponta o seu segmento. rows >= linhas do segmento faz o direct
+    # path gravar o segmento num único data save (ou ele entra inteiro ou não entra)
+    with open(ARQUIVO_SQLLDR_CTL, 'w', encoding='utf-8') as f:
+        f.write(gerar_conteudo_ctl_sqlldr(nome_tabela_objeto_com_aspas, columns_ddl_list))
+    for segmento in segmentos:
+        linhas_por_save = max(SQLLDR_ROWS, segmento['linhas']) if SQLLDR_DIRECT else None
+        with open(nome_arquivo_segmento(ARQUIVO_SQLLDR_PAR, segmento['numero']), 'w', encoding='utf-8') as f:
+            f.write(gerar_conteudo_par_sqlldr(ARQUIVO_SQLLDR_CTL, segmento['arquivo'],
+                                              nome_arquivo_segmento('sqlldr', segmento['numero']),
+                                              linhas_por_save=linhas_por_save))
+    logging.info(f"Arquivo de controle e {len(segmentos)} arquivos .par gerados para a carga retomável.")
+
+
+def gerar_conteudo_powershell_sqlldr_retomavel(manifesto):
+    segmentos_ps = ",\n".join(
+        f'    @{{ Numero = {s["numero"]}; Linhas = {s["linhas"]}; '
+        f'Par = "{caminho_na_pasta_vpn(nome_arquivo_segmento(ARQUIVO_SQLLDR_PAR, s["numero"]))}"; '
+        f'Log = "{caminho_na_pasta_vpn(nome_arquivo_segmento("sqlldr.log", s["numero"]))}" }}'
+        for s in manifesto['segmentos'])
+    return f"""
+$ErrorActionPreference = 'Stop'
+
+# Segmentos da carga (gerados pelo Python) e checkpoint dos segmentos ja confirmados
+$geracao = "{manifesto['geracao']}"
+$segmentos = @(
+{segmentos_ps}
+)
+$checkpointPath = "{caminho_na_pasta_vpn(ARQUIVO_CHECKPOINT_CARGA)}"
+$logPath = "{caminho_na_pasta_vpn('sqlldr.log')}"
+
+# Dados de conexão (serão passados do Batch via variáveis de ambiente/parâmetros)
+$usuario = $env:DB_USER_SQL
+$senha = $env:DB_PASS_SQL
+$dsn = $env:DB_DSN_SQL
+
+# Configurações de ambiente Oracle (do Python)
+$env:ORACLE_HOME = "{ORACLE_HOME_PATH}"
+$env:PATH = "$env:ORACLE_HOME\\BIN;$env:PATH"
+$env:NLS_LANG = "{NLS_LANG_VALUE}"
+# SQLLDR_EXE permite apontar para outro executável (ex.: um stub para testar sem banco)
+$sqlldrExe = if ($env:SQLLDR_EXE) {{ $env:SQLLDR_EXE }} else {{ "sqlldr" }}
+{gerar_bloco_powershell_preparar_pacote() if PACOTE_TRANSFERENCIA else ''}
+# Linhas do checkpoint: "geracao=<id>" e depois "<segmento>;<linhas carregadas>;<data>"
+$concluidos = @{{}}
+if (Test-Path $checkpointPath) {{
+    $conteudoCheckpoint = @(Get-Content $checkpointPath)
+    if ($conteudoCheckpoint[0] -ne "geracao=$geracao") {{
+        Write-Host "❌ O checkpoint $checkpointPath e de outra geracao dos arquivos. Apague-o e rode o .bat de novo (a tabela sera recriada)." -ForegroundColor Red
+        exit 1
+    }}
+    foreach ($linha in ($conteudoCheckpoint | Select-Object -Skip 1)) {{
+        $campos = $linha -split ';'
+        $concluidos[[int]$campos[0]] = [long]$campos[1]
+    }}
+    Write-Host "`n↩️  Retomando a carga: $($concluidos.Count) de $($segmentos.Count) segmentos ja carregados." -ForegroundColor Cyan
+}} else {{
+    Set-Content -Path $checkpointPath -Value "geracao=$geracao"
+}}
+
+$codigoSaida = 0
+foreach ($s in $segmentos) {{
+    if ($concluidos.ContainsKey($s.Numero)) {{
+        continue
+    }}
+    if (-not (Test-Path $s.Par)) {{
+        Write-Host "❌ Arquivo nao encontrado: $($s.Par)" -ForegroundColor Red
+        exit 1
+    }}
+    Write-Host "`n▶️  Segmento $($s.Numero) de $($segmentos.Count) ($($s.Linhas) linhas)..." -ForegroundColor Cyan
+    & $sqlldrExe "userid=$usuario/$senha@$dsn" "parfile=$($s.Par)" | Out-Null
+    $codigo = $LASTEXITCODE
+    $carregadas = $null
+    if (Test-Path $s.Log) {{
+        $resultado = Select-String -Path $s.Log -Pattern '(\\d+) (Rows? successfully loaded|Linhas? carregad)' | Select-Object -First 1
+        if ($resultado) {{
+            $carregadas = [long]$resultado.Matches[0].Groups[1].Value
+        }}
+    }}
+    if (($codigo -ne 0 -and $codigo -ne 2) -or $null -eq $carregadas) {{
+        Write-Host "❌ Segmento $($s.Numero) falhou (codigo $codigo). Verifique $($s.Log) e rode o .bat de novo para retomar deste segmento." -ForegroundColor Red
+        if ($codigo -eq 0 -or $codigo -eq 2) {{
+            $codigo = 1
+        }}
+        exit $codigo
+    }}
+    Add-Content -Path $checkpointPath -Value "$($s.Numero);$carregadas;$(Get-Date -Format s)"
+    Write-Host "Segmento $($s.Numero): $carregadas linhas carregadas (codigo $codigo)."
+    if ($codigo -eq 2) {{
+        $codigoSaida = 2
+    }}
+}}
+
+# Todos os segmentos confirmados: o checkpoint sai de cena e a próxima execução recria a tabela
+$segmentos | ForEach-Object {{ if (Test-Path $_.Log) {{ Get-Content $_.Log }} }} | Set-Content -Path $logPath
+Remove-Item $checkpointPath
+if ($codigoSaida -eq 0) {{
+    Write-Host "`n✅ Carga retomavel concluida com sucesso." -ForegroundColor Green
+}} else {{
+    Write-Host "`n⚠️  Carga retomavel concluida com avisos (linhas rejeitadas). Verifique os arquivos .bad." -ForegroundColor Yellow
+}}
+exit $codigoSaida
+"""
+
+
+def gerar_sql_create_table(nome_tabela_objeto_com_aspas, columns_ddl_list):
+    formatted_columns_ddl = []
+    for i, col_def in enumerate(columns_ddl_list):  # Usar a lista já populada
+        if i < len(columns_ddl_list) - 1:
+            formatted_columns_ddl.append(f'    {col_def},')
+        else:
+            formatted_columns_ddl.append(f'    {col_def}')
+    return f"""CREATE TABLE {nome_tabela_objeto_com_aspas} (
+{chr(10).join(formatted_columns_ddl)}
+)"""
+
+
+# --- Pacote de transferência: blocos gzip + manifesto SHA-256, restaurados no disco local da VPN ---
+def _nome_bloco_pacote(arquivo_dados, indice):
+    return f"{os.path.basename(arquivo_dados)}.bloco{indice:03d}.gz"
+
+
+def _comprimir_bloco(dados, caminho_bloco):
+    with open(caminho_bloco, 'wb') as f:
+        f.write(gzip.compress(dados, compresslevel=PACOTE_NIVEL_COMPRESSAO))  # zlib libera o GIL: threads bastam
+    return os.path.getsize(caminho_bloco)
+
+
+def gerar_pacote_transferencia(arquivos_dados, pasta_pacote='.'):
+    # Substitui cada arquivo de dados por blocos gzip e grava o manifesto com os hashes (do conteúdo descomprimido)
+    tamanho_bloco = int(PACOTE_TAMANHO_BLOCO_MB * 1024 * 1024)
+    manifesto = {'algoritmo_hash': 'sha256', 'tamanho_bloco': tamanho_bloco, 'arquivos': []}
+    with ThreadPoolExecutor(max_workers=PACOTE_MAX_PARALELO) as executor:
+        for arquivo_dados in arquivos_dados:
+            hash_arquivo = hashlib.sha256()
+            blocos = []
+            pendentes = []
+            with open(arquivo_dados, 'rb') as f:
+                for indice, dados in enumerate(iter(lambda: f.read(tamanho_bloco), b''), start=1):
+                    if len(pendentes) >= PACOTE_MAX_PARALELO * 2:
+                        pendentes.pop(0).result()  # Limita os blocos em memória
+                    hash_arquivo.update(dados)
+                    bloco = {'arquivo': _nome_bloco_pacote(arquivo_dados, indice), 'bytes': len(dados),
+                             'sha256': hashlib.sha256(dados).hexdigest()}
+                    futuro = executor.submit(_comprimir_bloco, dados, os.path.join(pasta_pacote, bloco['arquivo']))
+                    futuro.add_done_callback(lambda fut, b=bloco: b.update(bytes_comprimidos=fut.result()))
+                    blocos.append(bloco)
+                    pendentes.append(futuro)
+            for futuro in pendentes:
+                futuro.result()
+            manifesto['arquivos'].append({'arquivo': os.path.basename(arquivo_dados),
+                                          'bytes': sum(b['bytes'] for b in blocos),
+                                          'sha256': hash_arquivo.hexdigest(), 'blocos': blocos})
+            os.remove(arquivo_dados)  # Só os blocos vão para a VPN
+
+    with open(os.path.join(pasta_pacote, ARQUIVO_MANIFESTO_PACOTE), 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2)
+    total = sum(a['bytes'] for a in manifesto['arquivos'])
+    total_comprimido = sum(b['bytes_comprimidos'] for a in manifesto['arquivos'] for b in a['blocos'])
+    logging.info(f"Pacote de transferência: {total} bytes em "
+                 f"{sum(len(a['blocos']) for a in manifesto['arquivos'])} blocos gzip ({total_comprimido} bytes).")
+    return manifesto
+
+
+def _restaurar_bloco(caminho_bloco, caminho_destino, sha256_esperado):
+    hash_bloco = hashlib.sha256()
+    try:
+        with gzip.open(caminho_bloco, 'rb') as origem, open(caminho_destino, 'wb') as destino:
+            for dados in iter(lambda: origem.read(1024 * 1024), b''):
+                hash_bloco.update(dados)
+                destino.write(dados)
+    except (OSError, EOFError, zlib.error) as e:
+        # Bloco truncado/corrompido na cópia: entra na mesma verificação do manifesto
+        logging.warning(f"Bloco ilegível {caminho_bloco}: {e}")
+        return False
+    return hash_bloco.hexdigest() == sha256_esperado
+
+
+def restaurar_pacote_transferencia(pasta_pacote, pasta_destino):
+    # Mesmo procedimento do preparar_pacote.ps1 (útil para testar o pacote localmente)
+    with open(os.path.join(pasta_pacote, ARQUIVO_MANIFESTO_PACOTE), encoding='utf-8') as f:
+        manifesto = json.load(f)
+    os.makedirs(pasta_destino, exist_ok=True)
+    arquivos_restaurados = []
+    with ThreadPoolExecutor(max_workers=PACOTE_MAX_PARALELO) as executor:
+        for arquivo in manifesto['arquivos']:
+            partes = [os.path.join(pasta_destino, bloco['arquivo'][:-len('.gz')]) for bloco in arquivo['blocos']]
+            resultados = executor.map(_restaurar_bloco,
+                                      [os.path.join(pasta_pacote, bloco['arquivo']) for bloco in arquivo['blocos']],
+                                      partes, [bloco['sha256'] for bloco in arquivo['blocos']])
+            invalidos = [parte for parte, valido in zip(partes, resultados) if not valido]
+            if invalidos:
+                raise ValueError(f"Blocos com hash divergente em {arquivo['arquivo']}: {invalidos}")
+            caminho_final = os.path.join(pasta_destino, arquivo['arquivo'])
+            hash_arquivo = hashlib.sha256()
+            with open(caminho_final, 'wb') as destino:
+                for parte in partes:
+                    with open(parte, 'rb') as origem:
+                        for dados in iter(lambda: origem.read(1024 * 1024), b''):
+                            hash_arquivo.update(dados)
+                            destino.write(dados)
+                    os.remove(parte)
+            if hash_arquivo.hexdigest() != arquivo['sha256']:
+                raise ValueError(f"Hash divergente no arquivo restaurado: {caminho_final}")
+            arquivos_restaurados.append(caminho_final)
+    return arquivos_restaurados
+
+
+def gerar_bloco_powershell_preparar_pacote():
+    return f"""
+# Dados chegam em blocos comprimidos: copia, descompacta e confere no disco local antes do sqlldr
+& powershell.exe -ExecutionPolicy Bypass -File "{caminho_na_pasta_vpn(ARQUIVO_POWERSHELL_PACOTE)}"
+if ($LASTEXITCODE -ne 0) {{
+    Write-Host "❌ Falha ao preparar o pacote de dados em {pasta_staging_vpn()}" -ForegroundColor Red
+    exit 3
+}}
+"""
+
+
+def gerar_conteudo_powershell_pacote():
+    return f"""
+# Prepara o pacote de transferência na pasta local da VPN (gerado pelo Python)
+# Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+$ErrorActionPreference = 'Stop'
+
+$origem = "{PASTA_LOCAL_VPN_PARA_EXECUCAO}"
+$staging = "{pasta_staging_vpn()}"
+$maxSimultaneos = {PACOTE_MAX_PARALELO}
+$manifesto = Get-Content -LiteralPath "$origem\\{ARQUIVO_MANIFESTO_PACOTE}" -Raw -Encoding UTF8 | ConvertFrom-Json
+New-Item -ItemType Directory -Force -Path $staging | Out-Null
+
+# Cada job copia um bloco para o disco local, descompacta e confere o SHA-256 do conteúdo
+$restaurar = {{
+    param($blocoOrigem, $parte, $sha256)
+    Add-Type -AssemblyName System.IO.Compression
+    Copy-Item -LiteralPath $blocoOrigem -Destination "$parte.gz" -Force
+    $entrada = [System.IO.File]::OpenRead("$parte.gz")
+    $gzip = New-Object System.IO.Compression.GZipStream($entrada, [System.IO.Compression.CompressionMode]::Decompress)
+    $saida = [System.IO.File]::Create($parte)
+    try {{ $gzip.CopyTo($saida) }} finally {{ $saida.Dispose(); $gzip.Dispose(); $entrada.Dispose() }}
+    Remove-Item -LiteralPath "$parte.gz"
+    $hash = (Get-FileHash -LiteralPath $parte -Algorithm SHA256).Hash.ToLower()
+    [pscustomobject]@{{ Parte = $parte; Ok = ($hash -eq $sha256) }}
+}}
+
+$inicio = Get-Date
+$jobs = New-Object System.Collections.Generic.List[object]
+foreach ($arquivo in $manifesto.arquivos) {{
+    foreach ($bloco in $arquivo.blocos) {{
+        while (@($jobs | Where-Object {{ $_.State -eq 'Running' }}).Count -ge $maxSimultaneos) {{
+            Wait-Job -Job @($jobs | Where-Object {{ $_.State -eq 'Running' }}) -Any | Out-Null
+        }}
+        $parte = Join-Path $staging ($bloco.arquivo -replace '\\.gz$', '')
+        $jobs.Add((Start-Job -ScriptBlock $restaurar -ArgumentList "$origem\\$($bloco.arquivo)", $parte, $bloco.sha256))
+    }}
+}}
+$resultados = $jobs | Wait-Job | Receive-Job
+$jobs | Remove-Job
+$invalidos = @($resultados | Where-Object {{ -not $_.Ok }})
+if ($invalidos.Count -gt 0 -or @($resultados).Count -ne @($jobs).Count) {{
+    $invalidos | ForEach-Object {{ Write-Host "❌ Bloco com hash divergente: $($_.Parte)" -ForegroundColor Red }}
+    exit 1
+}}
+
+# Junta os blocos na ordem do manifesto e confere o arquivo inteiro
+foreach ($arquivo in $manifesto.arquivos) {{
+    $destino = Join-Path $staging $arquivo.arquivo
+    $saida = [System.IO.File]::Create($destino)
+    try {{
+        foreach ($bloco in $arquivo.blocos) {{
+            $parte = Join-Path $staging ($bloco.arquivo -replace '\\.gz$', '')
+            $entrada = [System.IO.File]::OpenRead($parte)
+            try {{ $entrada.CopyTo($saida) }} finally {{ $entrada.Dispose() }}
+            Remove-Item -LiteralPath $parte
+        }}
+    }} finally {{
+        $saida.Dispose()
+    }}
+    $hash = (Get-FileHash -LiteralPath $destino -Algorithm SHA256).Hash.ToLower()
+    if ($hash -ne $arquivo.sha256) {{
+        Write-Host "❌ Hash divergente no arquivo restaurado: $destino" -ForegroundColor Red
+        exit 1
+    }}
+}}
+$segundos = [math]::Round(((Get-Date) - $inicio).TotalSeconds, 1)
+Write-Host "✅ Pacote restaurado e conferido em $staging ($segundos s)." -ForegroundColor Green
+exit 0
+"""
+
+
+# --- Carga por tabela externa (ORACLE_LOADER): leitura e inserção paralelas no servidor ---
+def nome_tabela_externa(nome_tabela_objeto):
+    return f"{nome_tabela_objeto[:26]}_EXT"
+
+
+def especificacao_campo_tabela_externa(oracle_type):
+    # Mesma sintaxe de campos do SQL*Loader, exceto DATE (DATE_FORMAT DATE MASK no ORACLE_LOADER)
+    if oracle_type == "DATE":
+        tamanho = len(datetime(2000, 12, 31, 23, 59, 59).strftime(FORMATO_DATA_SAIDA))
+        return f'CHAR({tamanho}) DATE_FORMAT DATE MASK "{SQLLDR_MASCARA_DATA}"'
+    return especificacao_campo_sqlldr(oracle_type)
+
+
+def gerar_bloco_carga_tabela_externa(nome_tabela_objeto, columns_ddl_list, materializacao=None):
+    # Comandos da carga sem cabeçalho/EXIT: também entram no script mestre da sessão única
+    materializacao = materializacao or TABELA_EXTERNA_MATERIALIZACAO
+    if materializacao not in ('insert', 'ctas'):
+        raise ValueError("TABELA_EXTERNA_MATERIALIZACAO deve ser 'insert' ou 'ctas'.")
+    tabela = f'"{nome_tabela_objeto}"'
+    nome_externa = nome_tabela_externa(nome_tabela_objeto)
+    externa = f'"{nome_externa}"'
+    paralelismo = TABELA_EXTERNA_PARALELISMO
+    diretorio = TABELA_EXTERNA_DIRETORIO
+    campos = ",\n".join(
+        f'            "{nome}" {especificacao_campo_tabela_externa(oracle_type)}'
+        for nome, oracle_type in map(separar_definicao_coluna, columns_ddl_list))
+    # O CSV é gravado com o fim de linha da máquina que gerou os arquivos (CRLF no Windows)
+    delimitador_registro = "X'" + os.linesep.encode('ascii').hex().upper() + "'"
+    lista_colunas = ", ".join(f'"{separar_definicao_coluna(col_def)[0]}"' for col_def in columns_ddl_list)
+
+    if materializacao == 'ctas':
+        # A TT_OPE_* criada vazia pelo create_table_only_script.sql é substituída pela versão já carregada
+        logging_ctas = "NOLOGGING " if DDL_NOLOGGING else ""  # Mesma opção do CREATE TABLE (clausulas_ddl_carga)
+        armazenamento_ctas = "".join(f"{clausula} " for clausula in clausulas_armazenamento_carga())
+        materializar = f"""{gerar_bloco_drop_table(nome_tabela_objeto)}
+CREATE TABLE {tabela} {armazenamento_ctas}{logging_ctas}PARALLEL {paralelismo}
+AS SELECT /*+ PARALLEL(e, {paralelismo}) */ {lista_colunas} FROM {externa} e;
+
+ALTER TABLE {tabela} NOPARALLEL;
+{"ALTER TABLE " + tabela + " LOGGING;" + chr(10) if logging_ctas else ""}
+GRANT ALL ON {tabela} TO {USUARIO_GRANT};
+"""
+    else:
+        materializar = f"""ALTER SESSION ENABLE PARALLEL DML;
+
+INSERT /*+ APPEND PARALLEL(t, {paralelismo}) */ INTO {tabela} t ({lista_colunas})
+SELECT /*+ PARALLEL(e, {paralelismo}) */ {lista_colunas} FROM {externa} e;
+
+COMMIT;
+"""
+    return f"""{gerar_bloco_drop_table(nome_externa)}
+{gerar_sql_create_table(externa, columns_ddl_list)}
+ORGANIZATION EXTERNAL (
+    TYPE ORACLE_LOADER
+    DEFAULT DIRECTORY {diretorio}
+    ACCESS PARAMETERS (
+        RECORDS DELIMITED BY {delimitador_registro}
+        CHARACTERSET AL32UTF8
+        STRING SIZES ARE IN CHARACTERS
+        SKIP 1
+        BADFILE {diretorio}:'{nome_externa}.bad'
+        LOGFILE {diretorio}:'{nome_externa}.log'
+        NODISCARDFILE
+        FIELDS TERMINATED BY '{CSV_DELIMITADOR_SAIDA}' OPTIONALLY ENCLOSED BY '"'
+        MISSING FIELD VALUES ARE NULL
+        (
+{campos}
+        )
+    )
+    LOCATION ('{os.path.basename(ARQUIVO_DADOS_PLANO)}')
+)
+PARALLEL {paralelismo}
+REJECT LIMIT UNLIMITED;
+
+{materializar}
+DROP TABLE {externa};
+
+PROMPT Tabela {tabela} carregada pela tabela externa {externa}.
+"""
+
+
+def gerar_conteudo_tabela_externa(nome_tabela_objeto, columns_ddl_list, materializacao=None):
+    return f"""
+-- Carga via tabela externa ORACLE_LOADER (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+-- O arquivo '{os.path.basename(ARQUIVO_DADOS_PLANO)}' precisa estar na pasta do DIRECTORY {TABELA_EXTERNA_DIRETORIO} no servidor.
+
+SET DEFINE OFF;
+SET ESCAPE OFF;
+SET FEEDBACK ON;
+SET SERVEROUTPUT ON;
+WHENEVER SQLERROR EXIT FAILURE ROLLBACK;
+
+{gerar_bloco_carga_tabela_externa(nome_tabela_objeto, columns_ddl_list, materializacao)}EXIT;
+"""
+
+
+def gerar_bloco_batch_carga_tabela_externa():
+    copia_csv = ""
+    if TABELA_EXTERNA_PASTA_SERVIDOR:
+        copia_csv = f"""echo Copiando o CSV para a pasta do DIRECTORY {TABELA_EXTERNA_DIRETORIO}...
+copy /Y "!LOCAL_EXEC_PATH!\\!DATA_FILE_NAME!" "{TABELA_EXTERNA_PASTA_SERVIDOR}\\!DATA_FILE_NAME!" >NUL
+if !ERRORLEVEL! NEQ 0 (
+    echo ERRO CRITICO: nao foi possivel copiar o CSV para '{TABELA_EXTERNA_PASTA_SERVIDOR}'.
+    set "LOAD_RC=1"
+    goto END_CARGA_TABELA_EXTERNA
+)
+"""
+    return f"""rem ** INÍCIO DA CARGA DE DADOS PELA TABELA EXTERNA (NO SERVIDOR) **
+echo.
+echo =========================================================================
+echo.
+echo Executando a carga de dados via tabela externa ({TABELA_EXTERNA_MATERIALIZACAO.upper()})...
+{copia_csv}sqlplus -L -S !DB_USER!/!DB_PASS!@!DB_DSN! "@!LOCAL_EXEC_PATH!\\{ARQUIVO_TABELA_EXTERNA_SQL}"
+set "LOAD_RC=!ERRORLEVEL!"
+if !LOAD_RC! NEQ 0 (
+    echo.
+    echo ERRO CRITICO: A carga de dados via tabela externa falhou.
+    echo Verifique a saida do SQL*Plus acima e os arquivos .log/.bad da tabela externa no DIRECTORY {TABELA_EXTERNA_DIRETORIO}.
+    echo.
+) else (
+    echo.
+    echo CARGA DE DADOS VIA TABELA EXTERNA EXECUTADA COM SUCESSO.
+    echo.
+)
+:END_CARGA_TABELA_EXTERNA
+"""
+
+
+# --- Carga direta pelo Python (DB-API executemany com array binding) ---
+def ler_credenciais_banco():
+    # Variáveis de ambiente têm prioridade; senão usa o mesmo arquivo de credenciais gravado pelo .bat
+    usuario = os.environ.get('DB_USER_SQL')
+    senha = os.environ.get('DB_PASS_SQL')
+    dsn = os.environ.get('DB_DSN_SQL')
+    if not (usuario and senha and dsn):
+        with open(ARQUIVO_CREDENCIAS, 'r', encoding='utf-8') as f:
+            usuario, senha, dsn = f.read().strip().strip('"').split(',')[:3]
+    return usuario, senha, dsn
+
+
+def _conectar_oracle():
+    if oracledb is None:
+        raise ImportError("O pacote python-oracledb não está instalado (pip install oracledb).")
+    usuario, senha, dsn = ler_credenciais_banco()
+    return oracledb.connect(user=usuario, password=senha, dsn=dsn)
+
+
+def _sql_drop_oracle(nome_tabela_objeto_com_aspas):
+    return f"""BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE {nome_tabela_objeto_com_aspas} CASCADE CONSTRAINTS';
+EXCEPTION
+    WHEN OTHERS THEN
+        IF SQLCODE != -942 THEN
+            RAISE;
+        END IF;
+END;"""
+
+
+def _preparar_cursor_oracle(cursor, columns_ddl_list):
+    # Pré-declara o tamanho máximo dos textos para o driver não realocar os buffers a cada lote
+    tamanhos = []
+    for col_def in columns_ddl_list:
+        match_varchar2 = _RE_TIPO_VARCHAR2.match(separar_definicao_coluna(col_def)[1])
+        tamanhos.append(int(match_varchar2.group('tamanho')) if match_varchar2 else None)
+    cursor.setinputsizes(*tamanhos)
+
+
+def _conectar_sqlite():
+    return sqlite3.connect(CAMINHO_SQLITE_CARGA)
+
+
+def _tipo_coluna_sqlite(oracle_type):
+    match_number = _RE_TIPO_NUMBER.match(oracle_type)
+    if match_number:
+        return "INTEGER" if match_number.group('precisao') and not match_number.group('escala') else "NUMERIC"
+    if oracle_type == "DATE":
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+# Cada backend informa como conectar, o marcador de bind e as diferenças de DDL
+BACKENDS_CARGA_PYTHON = {
+    'oracle': {
+        'conectar': _conectar_oracle,
+        'marcador': lambda posicao: f":{posicao}",
+        'sql_drop': _sql_drop_oracle,
+        'tipo_coluna': lambda oracle_type: oracle_type,
+        'converter_data': lambda valor: valor,
+        'preparar_cursor': _preparar_cursor_oracle,
+        'grant': True,
+    },
+    'sqlite': {
+        'conectar': _conectar_sqlite,
+        'marcador': lambda posicao: "?",
+        'sql_drop': lambda nome_tabela_objeto_com_aspas: f"DROP TABLE IF EXISTS {nome_tabela_objeto_com_aspas}",
+        'tipo_coluna': _tipo_coluna_sqlite,
+        'converter_data': lambda valor: valor.strftime(FORMATO_DATA_SAIDA),
+        'preparar_cursor': lambda cursor, columns_ddl_list: None,
+        'grant': False,
+    },
+}
+
+
+def conversores_de_carga(columns_ddl_list, backend):
+    # Um conversor por coluna, coerente com o tipo do DDL (o driver exige tipos estáveis dentro do lote)
+    def converter_texto(valor):
+        return formatar_valor_saida(valor) or None
+
+    def converter_numero(valor):
+        if valor is None or (isinstance(valor, float) and valor != valor):
+            return None
+        return int(valor) if isinstance(valor, bool) else valor
+
+    def converter_data(valor):
+        return None if valor is None or valor is pd.NaT else backend['converter_data'](valor)
+
+    conversores = []
+    for col_def in columns_ddl_list:
+        oracle_type = separar_definicao_coluna(col_def)[1]
+        if _RE_TIPO_NUMBER.match(oracle_type):
+            conversores.append(converter_numero)
+        elif oracle_type == "DATE":
+            conversores.append(converter_data)
+        else:
+            conversores.append(converter_texto)
+    return conversores
+
+
+def carregar_com_python(caminho_arquivo, tipo_arquivo, nome_backend=None, tamanho_lote=None, conexao=None):
+    backend = BACKENDS_CARGA_PYTHON[nome_backend or CARGA_PYTHON_BACKEND]
+    tamanho_lote = tamanho_lote or CARGA_PYTHON_TAMANHO_LOTE
+    nome_tabela_objeto_com_aspas = f'"{gerar_nome_tabela(caminho_arquivo)}"'
+
+    # Passada 1: perfil das colunas (o DDL precisa de todos os valores antes do CREATE)
+    with medir_etapa('perfil_carga_python', bytes=os.path.getsize(caminho_arquivo)) as etapa:
+        nomes_colunas, linhas = ler_linhas_normalizadas(caminho_arquivo, tipo_arquivo)
+        estatisticas_por_coluna = [novas_estatisticas_coluna() for _ in nomes_colunas]
+        tabela_compacta = nova_tabela_compacta(len(nomes_colunas)) if CARGA_PYTHON_MEMORIA_COMPACTA else None
+        for row_values in linhas:
+            for estatisticas, valor in zip(estatisticas_por_coluna, row_values):
+                atualizar_estatisticas_coluna(estatisticas, valor)
+            if tabela_compacta is not None:
+                adicionar_linha_compacta(tabela_compacta, row_values)
+        columns_ddl_list, col_mapping = montar_ddl_colunas(nomes_colunas, estatisticas_por_coluna)
+        etapa['linhas'] = estatisticas_por_coluna[0]['total'] if estatisticas_por_coluna else 0
+        if tabela_compacta is not None:
+            etapa['memoria_compacta_mb'] = round(tamanho_tabela_compacta_bytes(tabela_compacta) / (1024 * 1024), 2)
+            etapa['colunas_por_modo'] = resumo_tabela_compacta(tabela_compacta)
+
+    definicoes_backend = []
+    for col_def in columns_ddl_list:
+        nome_coluna, oracle_type = separar_definicao_coluna(col_def)
+        definicoes_backend.append(f'"{nome_coluna}" {backend["tipo_coluna"](oracle_type)}')
+
+    fechar_conexao = conexao is None
+    conexao = conexao or backend['conectar']()
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(backend['sql_drop'](nome_tabela_objeto_com_aspas))
+        cursor.execute(gerar_sql_create_table(nome_tabela_objeto_com_aspas, definicoes_backend))
+        if backend['grant']:
+            cursor.execute(f"GRANT ALL ON {nome_tabela_objeto_com_aspas} TO {USUARIO_GRANT}")
+        logging.info(f"Tabela {nome_tabela_objeto_com_aspas} recriada pela carga direta do Python.")
+
+        colunas_sql = ", ".join(f'"{col_mapping[nome]}"' for nome in nomes_colunas)
+        marcadores = ", ".join(backend['marcador'](i) for i in range(1, len(nomes_colunas) + 1))
+        sql_insert = f"INSERT INTO {nome_tabela_objeto_com_aspas} ({colunas_sql}) VALUES ({marcadores})"
+        conversores = conversores_de_carga(columns_ddl_list, backend)
+        backend['preparar_cursor'](cursor, columns_ddl_list)
+
+        # Passada 2: insere em lotes, sem CSV intermediário (da memória compacta ou relendo a origem)
+        inicio = time.perf_counter()
+        total_linhas = 0
+        lote = []
+        if tabela_compacta is not None:
+            linhas = linhas_tabela_compacta(tabela_compacta)
+        else:
+            _, linhas = ler_linhas_normalizadas(caminho_arquivo, tipo_arquivo)
+        for row_values in linhas:
+            lote.append(tuple(converter(valor) for converter, valor in zip(conversores, row_values)))
+            if len(lote) >= tamanho_lote:
+                cursor.executemany(sql_insert, lote)
+                conexao.commit()
+                total_linhas += len(lote)
+                lote = []
+        if lote:
+            cursor.executemany(sql_insert, lote)
+            total_linhas += len(lote)
+        conexao.commit()
+        duracao = time.perf_counter() - inicio
+    finally:
+        if fechar_conexao:
+            conexao.close()
+
+    _metricas_execucao['etapas'].append({
+        'etapa': 'insercao_carga_python', 'linhas': total_linhas, 'tempo_s': round(duracao, 4),
+        'linhas_por_s': round(total_linhas / duracao, 1) if duracao > 0 else None,
+        'pico_memoria_mb': pico_memoria_mb(), 'tamanho_lote': tamanho_lote})
+    linhas_por_segundo = total_linhas / duracao if duracao > 0 else float(total_linhas)
+    mensagem = (f"Carga direta concluída: {total_linhas} linhas em {duracao:.2f}s "
+                f"({linhas_por_segundo:,.0f} linhas/s, lotes de {tamanho_lote}).")
+    logging.info(mensagem)
+    print(mensagem)
+    return total_linhas
+
+
+# --- Validação pré-carga: prevê no Python as rejeições do SQL*Loader ---
+MOTIVOS_REJEICAO_PRE_CARGA = {
+    'tamanho_varchar2': "texto maior que o VARCHAR2 da coluna (caracteres ou bytes)",
+    'tamanho_clob': "texto maior que o CHAR declarado para o CLOB no .ctl (SQLLDR_TAMANHO_MAX_CLOB)",
+    'numero_invalido': "valor não numérico em coluna NUMBER",
+    'precisao_number': "número com mais dígitos inteiros que a precisão do NUMBER",
+    'data_invalida': "data que não segue FORMATO_DATA_SAIDA",
+    'quebra_de_linha': "quebra de linha dentro do campo (o SQL*Loader a lê como fim de registro)",
+    'delimitador_ou_aspas': "delimitador ou aspas num campo que seria gravado sem aspas",
+}
+MAX_EXEMPLOS_VALIDACAO = 20
+
+
+def _data_valida_pre_carga(texto):
+    try:
+        datetime.strptime(texto, FORMATO_DATA_SAIDA)
+        return True
+    except ValueError:
+        return False
+
+
+def validar_serie_pre_carga(serie, oracle_type):
+    # serie: textos exatamente como estão no CSV ('' = nulo). Retorna {motivo: máscara booleana}
+    preenchido = serie != ''
+    falhas = {'quebra_de_linha': serie.str.contains('[\r\n]', regex=True)}
+    if len(CSV_DELIMITADOR_SAIDA) != 1 or CSV_DELIMITADOR_SAIDA == '"':
+        # O csv.writer só protege com aspas delimitadores de um caractere diferentes de '"'
+        falhas['delimitador_ou_aspas'] = serie.str.contains(CSV_DELIMITADOR_SAIDA, regex=False)
+    match_number = _RE_TIPO_NUMBER.match(oracle_type)
+    match_varchar2 = _RE_TIPO_VARCHAR2.match(oracle_type)
+    if match_number:
+        numeros = pd.to_numeric(serie.where(preenchido), errors='coerce')
+        falhas['numero_invalido'] = preenchido & numeros.isna()
+        if match_number.group('precisao'):
+            limite = 10 ** (int(match_number.group('precisao')) - int(match_number.group('escala') or 0))
+            falhas['precisao_number'] = numeros.abs() >= limite
+    elif oracle_type == "DATE":
+        datas = pd.to_datetime(serie.where(preenchido), format=FORMATO_DATA_SAIDA, errors='coerce')
+        suspeitas = preenchido & datas.isna()
+        if suspeitas.any():
+            # Fora do intervalo do pandas (ex.: 9999-12-31) mas válidas no Oracle: confere uma a uma
+            suspeitas[suspeitas] = [not _data_valida_pre_carga(texto) for texto in serie[suspeitas]]
+        falhas['data_invalida'] = suspeitas
+    elif oracle_type == "CLOB":
+        falhas['tamanho_clob'] = serie.str.len() > SQLLDR_TAMANHO_MAX_CLOB
+    elif match_varchar2:
+        tamanho = int(match_varchar2.group('tamanho'))
+        # CHAR: o limite é em caracteres (e 4000 bytes); BYTE/sem semântica: em bytes
+        limite_bytes = MAX_BYTES_VARCHAR2 if oracle_type.endswith(' CHAR)') else tamanho
+        caracteres = serie.str.len()
+        excede = caracteres > tamanho
+        # Só textos que podem passar do limite em UTF-8 (até 4 bytes por caractere) são codificados
+        candidatos = ~excede & (caracteres * 4 > limite_bytes)
+        if candidatos.any():
+            excede[candidatos] = serie[candidatos].str.encode('utf-8').str.len() > limite_bytes
+        falhas['tamanho_varchar2'] = excede
+    return falhas
+
+
+def validar_arquivo_dados_pre_carga(columns_ddl_list, caminho_dados=None, linha_inicial_origem=2):
+    # linha_inicial_origem: linha da planilha/CSV de origem correspondente à 1ª linha de dados
+    caminho_dados = caminho_dados or ARQUIVO_DADOS_PLANO
+    definicoes = [separar_definicao_coluna(col_def) for col_def in columns_ddl_list]
+    por_coluna = {}
+    exemplos = []
+    linhas_rejeitadas = set()
+    total_linhas = 0
+    caminho_rejeitadas_tmp = f"{ARQUIVO_REJEITADAS_PRE_CARGA}.tmp"
+    with pd.read_csv(caminho_dados, delimiter=CSV_DELIMITADOR_SAIDA, dtype=str, keep_default_na=False,
+                     na_filter=False, encoding='utf-8-sig', chunksize=CHUNKSIZE) as leitor, \
+            open(caminho_rejeitadas_tmp, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(['LINHA_DADOS', 'LINHA_ORIGEM', 'MOTIVOS'] + [nome for nome, _ in definicoes])
+        for chunk in leitor:
+            motivos_por_linha = {}
+            for (nome_coluna, oracle_type), serie in zip(definicoes, (chunk.iloc[:, i] for i in range(chunk.shape[1]))):
+                for motivo, mascara in validar_serie_pre_carga(serie, oracle_type).items():
+                    indices = mascara.index[mascara.to_numpy(dtype=bool, na_value=False)]
+                    if not len(indices):
+                        continue
+                    por_coluna.setdefault(nome_coluna, {})
+                    por_coluna[nome_coluna][motivo] = por_coluna[nome_coluna].get(motivo, 0) + len(indices)
+                    for indice in indices:
+                        motivos_por_linha.setdefault(indice, []).append(f"{nome_coluna}:{motivo}")
+                        if len(exemplos) < MAX_EXEMPLOS_VALIDACAO:
+                            exemplos.append({'linha': int(indice) + 1, 'coluna': nome_coluna, 'motivo': motivo,
+                                             'valor': serie[indice][:100]})
+            for indice in sorted(motivos_por_linha):
+                writer.writerow([indice + 1, indice + linha_inicial_origem, ', '.join(motivos_por_linha[indice])]
+                                + chunk.loc[indice].tolist())
+            linhas_rejeitadas.update(indice + 1 for indice in motivos_por_linha)
+            total_linhas += len(chunk)
+
+    if linhas_rejeitadas:
+        os.replace(caminho_rejeitadas_tmp, ARQUIVO_REJEITADAS_PRE_CARGA)
+    else:
+        os.remove(caminho_rejeitadas_tmp)
+        if os.path.exists(ARQUIVO_REJEITADAS_PRE_CARGA):
+            os.remove(ARQUIVO_REJEITADAS_PRE_CARGA)  # Não deixa o arquivo de uma execução anterior
+    removidas = bool(linhas_rejeitadas) and VALIDACAO_REMOVER_REJEITADAS
+    if removidas:
+        _remover_linhas_arquivo_dados(caminho_dados, linhas_rejeitadas)
+
+    por_motivo = {}
+    for motivos in por_coluna.values():
+        for motivo, quantidade in motivos.items():
+            por_motivo[motivo] = por_motivo.get(motivo, 0) + quantidade
+    resumo = {
+        'arquivo': caminho_dados,
+        'linhas': total_linhas,
+        'linhas_rejeitadas': len(linhas_rejeitadas),
+        'removidas_do_arquivo': removidas,
+        'arquivo_rejeitadas': ARQUIVO_REJEITADAS_PRE_CARGA if linhas_rejeitadas else None,
+        'por_motivo': {motivo: {'quantidade': quantidade, 'descricao': MOTIVOS_REJEICAO_PRE_CARGA[motivo]}
+                       for motivo, quantidade in por_motivo.items()},
+        'por_coluna': por_coluna,
+        'exemplos': exemplos,
+    }
+    if ARQUIVO_RESUMO_VALIDACAO:
+        with open(ARQUIVO_RESUMO_VALIDACAO, 'w', encoding='utf-8') as f:
+            json.dump(resumo, f, ensure_ascii=False, indent=2)
+    if linhas_rejeitadas:
+        mensagem = (f"Validação pré-carga: {len(linhas_rejeitadas)} de {total_linhas} linhas seriam rejeitadas "
+                    f"({', '.join(f'{m}={q}' for m, q in por_motivo.items())}); veja '{ARQUIVO_REJEITADAS_PRE_CARGA}'"
+                    + (" (removidas do arquivo de carga)." if removidas else "."))
+        logging.warning(mensagem)
+        print(mensagem)
+    else:
+        logging.info(f"Validação pré-carga: nenhuma das {total_linhas} linhas seria rejeitada.")
+    return resumo
+
+
+def _remover_linhas_arquivo_dados(caminho_dados, linhas_removidas):
+    caminho_tmp = f"{caminho_dados}.validado.tmp"
+    registros = _ler_registros_csv(caminho_dados)
+    with open(caminho_tmp, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(next(registros))
+        writer.writerows(registro for numero_linha, registro in enumerate(registros, start=1)
+                         if numero_linha not in linhas_removidas)
+    os.replace(caminho_tmp, caminho_dados)
+
+
+# --- Detecção de chaves candidatas: sketch de cardinalidade + unicidade exata por hash ---
+_MULTIPLICADOR_HASH_COMPOSTO = np.uint64(0x9E3779B97F4A7C15)
+_PREFERENCIA_PREFIXO_CHAVE = ('CD_', 'NU_')  # Ordem de preferência na escolha da chave primária
+
+
+def novo_sketch_cardinalidade(precisao=None):
+    # HyperLogLog: 2^precisao registradores de 1 byte por coluna
+    precisao = precisao or CHAVES_PRECISAO_SKETCH
+    return {'precisao': precisao, 'registradores': np.zeros(1 << precisao, dtype=np.uint8)}
+
+
+def atualizar_sketch_cardinalidade(sketch, hashes):
+    if not len(hashes):
+        return
+    precisao = sketch['precisao']
+    indices = (hashes >> np.uint64(64 - precisao)).astype(np.intp)
+    restante = hashes & np.uint64((1 << (64 - precisao)) - 1)
+    # Posição do primeiro bit 1 nos bits restantes; o expoente do frexp é o bit_length, sem laço em Python
+    posicoes = (64 - precisao + 1 - np.frexp(restante.astype(np.float64))[1]).astype(np.uint8)
+    np.maximum.at(sketch['registradores'], indices, posicoes)
+
+
+def estimar_cardinalidade(sketch):
+    registradores = sketch['registradores']
+    m = len(registradores)
+    estimativa = (0.7213 / (1 + 1.079 / m)) * m * m / float(np.sum(np.exp2(-registradores.astype(np.float64))))
+    zeros = int(np.count_nonzero(registradores == 0))
+    if estimativa <= 2.5 * m and zeros:
+        estimativa = m * np.log(m / zeros)  # Contagem linear: mais precisa com poucos distintos
+    return int(round(estimativa))
+
+
+def coluna_elegivel_chave(oracle_type, max_chars=None):
+    # Inteiros, textos curtos e datas; decimais, CLOB e textos longos não formam chave
+    numero = _RE_TIPO_NUMBER.match(oracle_type)
+    if numero:
+        return numero.group('precisao') is not None and not int(numero.group('escala') or 0)
+    texto = _RE_TIPO_VARCHAR2.match(oracle_type)
+    if texto:
+        # Vale o maior texto medido nos dados: as colunas que já chegam com prefixo (CD_, NU_...) ficam com o
+        # VARCHAR2(255) padrão, maior que o limite, mesmo quando os códigos são curtos
+        tamanho = max_chars if max_chars is not None else int(texto.group('tamanho'))
+        return tamanho <= CHAVES_TAMANHO_MAX_TEXTO
+    return oracle_type == 'DATE'
+
+
+def _hash_combinacao(hashes_colunas, combinacao):
+    hashes = hashes_colunas[combinacao[0]]
+    for indice in combinacao[1:]:
+        hashes = hashes * _MULTIPLICADOR_HASH_COMPOSTO ^ hashes_colunas[indice]
+    return hashes
+
+
+def _tem_repetidos(hashes_ordenados):
+    return bool(len(hashes_ordenados) > 1 and np.any(hashes_ordenados[1:] == hashes_ordenados[:-1]))
+
+
+def _acumular_hashes_unicos(acumulados, combinacao, hashes):
+    # Guarda os hashes enquanto a combinação não repete; a checagem global é refeita a cada vez que o volume
+    # dobra (custo amortizado) e descarta cedo as que só repetem entre blocos diferentes
+    estado = acumulados[combinacao]
+    if len(np.unique(hashes)) < len(hashes):
+        del acumulados[combinacao]
+        return
+    estado['partes'].append(hashes)
+    estado['linhas'] += len(hashes)
+    if estado['linhas'] >= 2 * estado['linhas_conferidas']:
+        ordenados = np.sort(np.concatenate(estado['partes']))
+        if _tem_repetidos(ordenados):
+            del acumulados[combinacao]
+            return
+        estado['partes'] = [ordenados]
+        estado['linhas_conferidas'] = estado['linhas']
+
+
+def _colunas_elegiveis_chave(definicoes, colunas_texto, max_chars):
+    return [coluna_elegivel_chave(oracle_type, max_chars[indice] if colunas_texto[indice] else None)
+            for indice, (_, oracle_type) in enumerate(definicoes)]
+
+
+def _ordem_preferencia_chave(nome_coluna):
+    prefixos = [i for i, prefixo in enumerate(_PREFERENCIA_PREFIXO_CHAVE) if nome_coluna.startswith(prefixo)]
+    return prefixos[0] if prefixos else len(_PREFERENCIA_PREFIXO_CHAVE)
+
+
+def detectar_chaves_candidatas(columns_ddl_list, caminho_dados=None):
+    # Uma passada sobre o CSV final (o que será carregado): distintos estimados por coluna e unicidade exata
+    # das colunas e das combinações de até CHAVES_TAMANHO_MAX_COMPOSTA colunas elegíveis
+    caminho_dados = caminho_dados or ARQUIVO_DADOS_PLANO
+    definicoes = [separar_definicao_coluna(col_def) for col_def in columns_ddl_list]
+    colunas_texto = [bool(_RE_TIPO_VARCHAR2.match(oracle_type)) for _, oracle_type in definicoes]
+    max_chars = [0] * len(definicoes)  # Maior texto de cada coluna VARCHAR2 (decide a elegibilidade)
+    sketches = [novo_sketch_cardinalidade() for _ in definicoes]
+    nulos = [0] * len(definicoes)
+    acumulados = {}  # combinação (tupla de índices) -> hashes ainda sem repetição
+    base_compostas = []
+    total_linhas = 0
+    with pd.read_csv(caminho_dados, delimiter=CSV_DELIMITADOR_SAIDA, dtype=str, keep_default_na=False,
+                     na_filter=False, encoding='utf-8-sig', chunksize=CHUNKSIZE) as leitor:
+        for chunk in leitor:
+            hashes_colunas, vazios_colunas = [], []
+            for indice in range(len(definicoes)):
+                serie = chunk.iloc[:, indice]
+                vazios = (serie == '').to_numpy()
+                hashes = pd.util.hash_pandas_object(serie, index=False).to_numpy()
+                nulos[indice] += int(vazios.sum())
+                if colunas_texto[indice]:
+                    max_chars[indice] = max(max_chars[indice], int(serie.str.len().max()))
+                atualizar_sketch_cardinalidade(sketches[indice], hashes[~vazios])
+                hashes_colunas.append(hashes)
+                vazios_colunas.append(vazios)
+            if total_linhas == 0:
+                # O primeiro bloco escolhe as candidatas: toda coluna elegível; as que já repetem nele (e não têm
+                # nulos) são combinadas entre si, os códigos (CD_) primeiro e depois as de mais valores distintos
+                elegiveis = _colunas_elegiveis_chave(definicoes, colunas_texto, max_chars)
+                for indice in range(len(definicoes)):
+                    if not elegiveis[indice]:
+                        continue
+                    acumulados[(indice,)] = {'partes': [], 'linhas': 0, 'linhas_conferidas': 0}
+                    if not vazios_colunas[indice].any() and \
+                            len(np.unique(hashes_colunas[indice])) < len(hashes_colunas[indice]):
+                        base_compostas.append(indice)
+                base_compostas.sort(key=lambda i: (not definicoes[i][0].startswith('CD_'),
+                                                   -len(np.unique(hashes_colunas[i]))))
+                base_compostas = sorted(base_compostas[:CHAVES_MAX_COLUNAS_COMPOSTAS])
+                for tamanho in range(2, CHAVES_TAMANHO_MAX_COMPOSTA + 1):
+                    for combinacao in itertools.combinations(base_compostas, tamanho):
+                        acumulados[combinacao] = {'partes': [], 'linhas': 0, 'linhas_conferidas': 0}
+            for combinacao in list(acumulados):
+                if len(combinacao) == 1:
+                    vazios = vazios_colunas[combinacao[0]]
+                    _acumular_hashes_unicos(acumulados, combinacao, hashes_colunas[combinacao[0]][~vazios])
+                elif any(vazios_colunas[indice].any() for indice in combinacao):
+                    del acumulados[combinacao]  # Chave composta não admite nulos
+                else:
+                    _acumular_hashes_unicos(acumulados, combinacao, _hash_combinacao(hashes_colunas, combinacao))
+            total_linhas += len(chunk)
+
+    # Texto que só passa do limite depois do primeiro bloco também tira a coluna (e as combinações com ela)
+    elegiveis = _colunas_elegiveis_chave(definicoes, colunas_texto, max_chars)
+    for combinacao in [c for c in acumulados if not all(elegiveis[i] for i in c)]:
+        del acumulados[combinacao]
+    unicas = [combinacao for combinacao, estado in acumulados.items()
+              if estado['partes'] and not _tem_repetidos(np.sort(np.concatenate(estado['partes'])))]
+    # Só as combinações mínimas: (A, B, C) é redundante se (A, B) já é única
+    compostas = sorted((c for c in unicas if len(c) > 1), key=lambda c: (len(c), c))
+    compostas_minimas = []
+    for combinacao in compostas:
+        if not any(set(menor) <= set(combinacao) for menor in compostas_minimas):
+            compostas_minimas.append(combinacao)
+    colunas_unicas = {c[0] for c in unicas if len(c) == 1}
+
+    colunas = []
+    for indice, (nome_coluna, oracle_type) in enumerate(definicoes):
+        nao_nulos = total_linhas - nulos[indice]
+        distintos = nao_nulos if indice in colunas_unicas else min(estimar_cardinalidade(sketches[indice]), nao_nulos)
+        razao = distintos / nao_nulos if nao_nulos else 0.0
+        if indice in colunas_unicas:
+            classificacao = 'unica'
+        elif elegiveis[indice] and razao >= CHAVES_LIMIAR_QUASE_UNICA:
+            classificacao = 'quase_unica'
+        elif distintos <= 1:
+            classificacao = 'constante'
+        else:
+            classificacao = 'comum'
+        colunas.append({'coluna': nome_coluna, 'tipo': oracle_type, 'nao_nulos': nao_nulos, 'nulos': nulos[indice],
+                        'distintos': distintos, 'distintos_exato': indice in colunas_unicas,
+                        'razao_distintos': round(razao, 4), 'elegivel_chave': elegiveis[indice],
+                        'classificacao': classificacao})
+
+    # Chave primária: coluna única sem nulos (CD_, depois NU_, depois as demais) ou a menor composta única
+    candidatas_pk = sorted((i for i in colunas_unicas if nulos[i] == 0),
+                           key=lambda i: (_ordem_preferencia_chave(definicoes[i][0]), i))
+    if candidatas_pk:
+        chave_primaria = [definicoes[candidatas_pk[0]][0]]
+    elif compostas_minimas:
+        chave_primaria = [definicoes[i][0] for i in compostas_minimas[0]]
+    else:
+        chave_primaria = None
+    indices = [{'colunas': [c['coluna']], 'unico': c['classificacao'] == 'unica'}
+               for c in sorted(colunas, key=lambda c: (c['classificacao'] != 'unica', -c['razao_distintos']))
+               if c['classificacao'] in ('unica', 'quase_unica') and [c['coluna']] != chave_primaria]
+    indices = indices[:CHAVES_MAX_INDICES]
+    criar = total_linhas >= CHAVES_MIN_LINHAS
+    if not criar:
+        logging.info(f"Detecção de chaves: {total_linhas} linhas (< CHAVES_MIN_LINHAS); PK/índices não serão criados.")
+
+    relatorio = {
+        'arquivo': caminho_dados,
+        'linhas': total_linhas,
+        'chave_primaria': chave_primaria if criar else None,
+        'indices': indices if criar else [],
+        'chave_primaria_sugerida': chave_primaria,
+        'chaves_compostas_unicas': [[definicoes[i][0] for i in c] for c in compostas_minimas],
+        'colunas': colunas,
+    }
+    if ARQUIVO_RELATORIO_CHAVES:
+        with open(ARQUIVO_RELATORIO_CHAVES, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    logging.info(f"Detecção de chaves: PK {chave_primaria or 'não encontrada'}; "
+                 f"{sum(c['classificacao'] == 'unica' for c in colunas)} colunas únicas, "
+                 f"{sum(c['classificacao'] == 'quase_unica' for c in colunas)} quase únicas, "
+                 f"{len(compostas_minimas)} chaves compostas.")
+    return relatorio
+
+
+# --- Carga incremental: manifesto local, arquivo delta e script MERGE ---
+def _hash_campos(campos):
+    return hashlib.blake2b('\x1f'.join(campos).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def fingerprint_esquema(columns_ddl_list):
+    return hashlib.sha256('\n'.join(columns_ddl_list + ['CHAVES:' + ','.join(CHAVES_DELTA)]).encode('utf-8')).hexdigest()
+
+
+def nome_tabela_staging_delta(nome_tabela_objeto):
+    return f"{nome_tabela_objeto[:26]}_DLT"
+
+
+def _abrir_manifesto_delta():
+    conexao = sqlite3.connect(ARQUIVO_MANIFESTO_DELTA)
+    conexao.execute("CREATE TABLE IF NOT EXISTS esquemas (tabela TEXT PRIMARY KEY, fingerprint TEXT)")
+    conexao.execute("CREATE TABLE IF NOT EXISTS linhas (tabela TEXT, chave TEXT, hash TEXT, valores_chave TEXT, "
+                    "PRIMARY KEY (tabela, chave))")
+    # Estado gerado e ainda não confirmado pela carga (promovido para esquemas/linhas na próxima geração)
+    conexao.execute("CREATE TABLE IF NOT EXISTS pendentes (tabela TEXT PRIMARY KEY, id TEXT, fingerprint TEXT)")
+    conexao.execute("CREATE TABLE IF NOT EXISTS linhas_pendentes (tabela TEXT, chave TEXT, hash TEXT, "
+                    "valores_chave TEXT, PRIMARY KEY (tabela, chave))")
+    return conexao
+
+
+def _ler_confirmacao_delta():
+    if not os.path.exists(ARQUIVO_CONFIRMACAO_DELTA):
+        return None
+    with open(ARQUIVO_CONFIRMACAO_DELTA, 'r', encoding='utf-8-sig') as f:
+        return f.read().strip()
+
+
+def _promover_manifesto_pendente(conexao, nome_tabela_objeto):
+    # A carga gerada na execução anterior só vira base de comparação se o .bat confirmou o MERGE/recriação
+    pendente = conexao.execute("SELECT id, fingerprint FROM pendentes WHERE tabela = ?",
+                               (nome_tabela_objeto,)).fetchone()
+    confirmacao = _ler_confirmacao_delta()
+    if pendente is not None:
+        id_pendente, fingerprint_pendente = pendente
+        if confirmacao == id_pendente:
+            conexao.execute("DELETE FROM linhas WHERE tabela = ?", (nome_tabela_objeto,))
+            conexao.execute("INSERT INTO linhas SELECT tabela, chave, hash, valores_chave FROM linhas_pendentes "
+                            "WHERE tabela = ?", (nome_tabela_objeto,))
+            conexao.execute("INSERT OR REPLACE INTO esquemas VALUES (?, ?)", (nome_tabela_objeto, fingerprint_pendente))
+            logging.info(f"Manifesto da carga {id_pendente} confirmado: passa a ser a base do delta.")
+        else:
+            mensagem = (f"A carga gerada em {id_pendente} não foi confirmada (carga ou MERGE não concluídos): "
+                        f"o delta é recalculado a partir da última carga confirmada.")
+            logging.warning(mensagem)
+            print(mensagem)
+        conexao.execute("DELETE FROM linhas_pendentes WHERE tabela = ?", (nome_tabela_objeto,))
+        conexao.execute("DELETE FROM pendentes WHERE tabela = ?", (nome_tabela_objeto,))
+        conexao.commit()
+    if confirmacao is not None:
+        os.remove(ARQUIVO_CONFIRMACAO_DELTA)
+
+
+def _ler_registros_csv(caminho_dados):
+    with open(caminho_dados, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=CSV_DELIMITADOR_SAIDA)
+        yield next(reader)
+        yield from reader
+
+
+def preparar_carga_delta(nome_tabela_objeto, columns_ddl_list):
+    # carga_delta = True quando o arquivo de dados foi reescrito só com o delta (False = recriação completa);
+    # id_manifesto é o que o .bat grava em ARQUIVO_CONFIRMACAO_DELTA; chaves_anulaveis são as colunas de
+    # chave com valor vazio no delta (só elas precisam da comparação NULL = NULL no MERGE)
+    nomes_colunas = [separar_definicao_coluna(col_def)[0] for col_def in columns_ddl_list]
+    colunas_invalidas = [c for c in CHAVES_DELTA if c not in nomes_colunas]
+    if colunas_invalidas:
+        raise ValueError(f"CHAVES_DELTA contém colunas inexistentes na tabela: {colunas_invalidas}")
+    indices_chave = [nomes_colunas.index(c) for c in CHAVES_DELTA] or list(range(len(nomes_colunas)))
+    fingerprint = fingerprint_esquema(columns_ddl_list)
+
+    conexao = _abrir_manifesto_delta()
+    try:
+        _promover_manifesto_pendente(conexao, nome_tabela_objeto)
+        linha_esquema = conexao.execute("SELECT fingerprint FROM esquemas WHERE tabela = ?", (nome_tabela_objeto,)).fetchone()
+        conexao.execute("CREATE TEMP TABLE atual (chave TEXT PRIMARY KEY, hash TEXT, valores_chave TEXT)")
+
+        registros = _ler_registros_csv(ARQUIVO_DADOS_PLANO)
+        next(registros)
+        total_linhas = 0
+        chaves_com_vazios = set()
+        lote = []
+        for registro in registros:
+            valores_chave = [registro[i] for i in indices_chave]
+            if CHAVES_DELTA and '' in valores_chave:
+                chaves_com_vazios.update(c for c, valor in zip(CHAVES_DELTA, valores_chave) if not valor)
+            lote.append((_hash_campos(valores_chave), _hash_campos(registro), json.dumps(valores_chave)))
+            total_linhas += 1
+            if len(lote) >= CHUNKSIZE:
+                conexao.executemany("INSERT OR IGNORE INTO atual VALUES (?, ?, ?)", lote)
+                lote = []
+        conexao.executemany("INSERT OR IGNORE INTO atual VALUES (?, ?, ?)", lote)
+        chaves_distintas = conexao.execute("SELECT COUNT(*) FROM atual").fetchone()[0]
+
+        motivo_completa = None
+        if linha_esquema is None:
+            motivo_completa = "não há manifesto de execução anterior"
+        elif linha_esquema[0] != fingerprint:
+            motivo_completa = "o esquema inferido mudou"
+        elif chaves_distintas != total_linhas:
+            motivo_completa = f"há {total_linhas - chaves_distintas} chaves duplicadas (defina CHAVES_DELTA)"
+        elif chaves_com_vazios:
+            # As colunas de CHAVES_DELTA precisam ser NOT NULL: o MERGE as compara com igualdade simples
+            motivo_completa = f"CHAVES_DELTA com valores vazios em {sorted(chaves_com_vazios)}"
+
+        chaves_anulaveis = []
+        if motivo_completa is None:
+            chaves_alteradas = {chave for (chave,) in conexao.execute(
+                "SELECT a.chave FROM atual a LEFT JOIN linhas l ON l.tabela = ? AND l.chave = a.chave "
+                "WHERE l.chave IS NULL OR l.hash <> a.hash", (nome_tabela_objeto,))}
+            chaves_removidas = [json.loads(valores) for (valores,) in conexao.execute(
+                "SELECT l.valores_chave FROM linhas l WHERE l.tabela = ? "
+                "AND NOT EXISTS (SELECT 1 FROM atual a WHERE a.chave = l.chave)", (nome_tabela_objeto,))]
+            indices_anulaveis = _gravar_arquivo_delta(indices_chave, chaves_alteradas, chaves_removidas)
+            chaves_anulaveis = [nomes_colunas[i] for i in sorted(indices_anulaveis)]
+            mensagem = (f"Carga incremental: {len(chaves_alteradas)} linhas novas/alteradas e "
+                        f"{len(chaves_removidas)} removidas de {total_linhas}.")
+        else:
+            mensagem = f"Carga incremental indisponível ({motivo_completa}): a tabela será recriada por completo."
+        logging.info(mensagem)
+        print(mensagem)
+
+        # O arquivo atual fica pendente: só vira base da próxima comparação depois da confirmação da carga
+        id_manifesto = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        conexao.execute("DELETE FROM linhas_pendentes WHERE tabela = ?", (nome_tabela_objeto,))
+        conexao.execute("INSERT INTO linhas_pendentes SELECT ?, chave, hash, valores_chave FROM atual",
+                        (nome_tabela_objeto,))
+        conexao.execute("INSERT OR REPLACE INTO pendentes VALUES (?, ?, ?)",
+                        (nome_tabela_objeto, id_manifesto, fingerprint))
+        conexao.commit()
+    finally:
+        conexao.close()
+    return {'carga_delta': motivo_completa is None, 'id_manifesto': id_manifesto,
+            'chaves_anulaveis': chaves_anulaveis}
+
+
+def _gravar_arquivo_delta(indices_chave, chaves_alteradas, chaves_removidas):
+    # Retorna os índices das colunas de chave que ficaram vazias (NULL na staging) em alguma linha do delta
+    caminho_delta = f"{ARQUIVO_DADOS_PLANO}.delta.tmp"
+    registros = _ler_registros_csv(ARQUIVO_DADOS_PLANO)
+    cabecalho = next(registros)
+    indices_anulaveis = set()
+    with open(caminho_delta, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(cabecalho + [COLUNA_OPERACAO_DELTA])
+        for registro in registros:
+            valores_chave = [registro[i] for i in indices_chave]
+            if _hash_campos(valores_chave) in chaves_alteradas:
+                writer.writerow(registro + ['U'])
+                if '' in valores_chave:
+                    indices_anulaveis.update(i for i, valor in zip(indices_chave, valores_chave) if not valor)
+        for valores_chave in chaves_removidas:
+            registro = [''] * len(cabecalho)
+            for indice, valor in zip(indices_chave, valores_chave):
+                registro[indice] = valor
+                if not valor:
+                    indices_anulaveis.add(indice)
+            writer.writerow(registro + ['D'])
+    os.replace(caminho_delta, ARQUIVO_DADOS_PLANO)
+    return indices_anulaveis
+
+
+def gerar_bloco_batch_merge_delta():
+    # Só aplica o MERGE/DELETE se a carga da staging terminou sem erro (0 = sucesso, 2 = avisos)
+    return f"""
+echo.
+echo =========================================================================
+echo.
+set "DELTA_RC=1"
+if !LOAD_RC! EQU 1 goto SKIP_MERGE_DELTA
+if !LOAD_RC! EQU 3 goto SKIP_MERGE_DELTA
+echo Aplicando o delta (MERGE/DELETE) na tabela existente...
+sqlplus -L -S !DB_USER!/!DB_PASS!@!DB_DSN! "@!LOCAL_EXEC_PATH!\\{ARQUIVO_MERGE_SQL}"
+set "DELTA_RC=!ERRORLEVEL!"
+if !DELTA_RC! NEQ 0 (
+    echo ERRO CRITICO ao aplicar o delta. Verifique as mensagens do SQL*Plus acima.
+) else (
+    echo DELTA APLICADO COM SUCESSO.
+)
+goto END_MERGE_DELTA
+:SKIP_MERGE_DELTA
+echo Delta NAO aplicado: a carga da tabela de staging falhou.
+:END_MERGE_DELTA
+"""
+
+
+def gerar_bloco_batch_confirmar_manifesto_delta(resultado_geracao, condicao=None):
+    # Grava a confirmação lida pela próxima geração; com linhas rejeitadas (2) ela não é gravada, senão essas
+    # linhas ficariam no manifesto sem estarem na tabela e nunca mais seriam reenviadas
+    if not resultado_geracao.get('id_manifesto_delta'):
+        return ""
+    if condicao is None:
+        condicao = "if !LOAD_RC! EQU 0"
+        if resultado_geracao['carga_delta']:
+            condicao += " if !DELTA_RC! EQU 0"
+    return f"""
+set "CONFIRMAR_DELTA=0"
+{condicao} set "CONFIRMAR_DELTA=1"
+if !CONFIRMAR_DELTA! EQU 1 (
+    > "!LOCAL_EXEC_PATH!\\{ARQUIVO_CONFIRMACAO_DELTA}" echo {resultado_geracao['id_manifesto_delta']}
+    echo Manifesto do modo incremental confirmado: a proxima geracao compara com esta carga.
+) else (
+    echo Manifesto do modo incremental NAO confirmado: a proxima geracao recalcula o delta da ultima carga confirmada.
+)
+"""
+
+
+def _condicao_chave_merge(coluna, anulavel):
+    # Igualdade simples permite hash join entre staging e tabela; NULL = NULL só para as chaves que têm vazios
+    if anulavel:
+        return f'(t."{coluna}" = s."{coluna}" OR (t."{coluna}" IS NULL AND s."{coluna}" IS NULL))'
+    return f't."{coluna}" = s."{coluna}"'
+
+
+def gerar_bloco_merge_delta(nome_tabela_objeto, columns_ddl_list, chaves_anulaveis=None):
+    nomes_colunas = [separar_definicao_coluna(col_def)[0] for col_def in columns_ddl_list]
+    colunas_chave = CHAVES_DELTA or nomes_colunas
+    colunas_nao_chave = [c for c in nomes_colunas if c not in colunas_chave]
+    chaves_anulaveis = set(chaves_anulaveis or ())
+    tabela = f'"{nome_tabela_objeto}"'
+    staging = f'"{nome_tabela_staging_delta(nome_tabela_objeto)}"'
+    condicao_chave = "\n      AND ".join(_condicao_chave_merge(c, c in chaves_anulaveis) for c in colunas_chave)
+    clausula_update = ""
+    if colunas_nao_chave:
+        atribuicoes = ",\n        ".join(f't."{c}" = s."{c}"' for c in colunas_nao_chave)
+        clausula_update = f"WHEN MATCHED THEN UPDATE SET\n        {atribuicoes}\n"
+    lista_colunas = ", ".join(f'"{c}"' for c in nomes_colunas)
+    lista_valores = ", ".join(f's."{c}"' for c in nomes_colunas)
+    return f"""DELETE FROM {tabela} t
+WHERE EXISTS (
+    SELECT 1 FROM {staging} s
+    WHERE s."{COLUNA_OPERACAO_DELTA}" = 'D'
+      AND {condicao_chave}
+);
+
+MERGE INTO {tabela} t
+USING (SELECT * FROM {staging} WHERE "{COLUNA_OPERACAO_DELTA}" = 'U') s
+ON ({condicao_chave})
+{clausula_update}WHEN NOT MATCHED THEN INSERT ({lista_colunas})
+    VALUES ({lista_valores});
+
+COMMIT;
+
+DROP TABLE {staging} PURGE;
+
+PROMPT Delta aplicado na tabela {tabela}.
+"""
+
+
+def gerar_conteudo_merge_delta(nome_tabela_objeto, columns_ddl_list, chaves_anulaveis=None):
+    return f"""
+-- Script de aplicação do delta (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+SET DEFINE OFF;
+SET ESCAPE OFF;
+SET FEEDBACK ON;
+WHENEVER SQLERROR EXIT FAILURE ROLLBACK;
+
+{gerar_bloco_merge_delta(nome_tabela_objeto, columns_ddl_list, chaves_anulaveis)}EXIT;
+"""
+
+
+# --- Scripts DDL (DROP/CREATE), para uma ou várias tabelas ---
+def gerar_bloco_drop_table(nome_tabela_objeto):
+    nome_tabela_objeto_com_aspas = f'"{nome_tabela_objeto}"'
+    return f"""BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE {nome_tabela_objeto_com_aspas} CASCADE CONSTRAINTS';
+    DBMS_OUTPUT.PUT_LINE('Tabela {nome_tabela_objeto} dropada com sucesso.');
+EXCEPTION
+    WHEN OTHERS THEN
+      IF SQLCODE = -942 THEN
+        DBMS_OUTPUT.PUT_LINE('Tabela {nome_tabela_objeto} nao existe. Nao ha necessidade de drop.');
+      ELSE
+        DBMS_OUTPUT.PUT_LINE('Erro ao tentar dropar a tabela {nome_tabela_objeto}: ' || SQLERRM);
+        RAISE;
+      END IF;
+END;
+/
+"""
+
+
+def gerar_conteudo_drop_table(nomes_tabelas):
+    blocos = "\n".join(gerar_bloco_drop_table(nome) for nome in nomes_tabelas)
+    return f"""
+-- Script para dropar a tabela (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+SET ECHO ON
+SET FEEDBACK ON
+SET SERVEROUTPUT ON
+WHENEVER SQLERROR EXIT FAILURE ROLLBACK
+/
+
+{blocos}
+EXIT;
+"""
+
+
+def clausulas_armazenamento_carga():
+    clausulas = []
+    if DDL_PCTFREE is not None:
+        clausulas.append(f"PCTFREE {int(DDL_PCTFREE)}")
+    if DDL_COMPRESSAO == 'basic':
+        clausulas.append("ROW STORE COMPRESS BASIC")
+    elif DDL_COMPRESSAO == 'advanced':
+        clausulas.append("ROW STORE COMPRESS ADVANCED")
+    elif DDL_COMPRESSAO is not None:
+        raise ValueError("DDL_COMPRESSAO deve ser None, 'basic' ou 'advanced'.")
+    return clausulas
+
+
+def clausulas_ddl_carga():
+    # Armazenamento + atributos que só valem durante a carga (desfeitos no pos_carga_script.sql)
+    clausulas = clausulas_armazenamento_carga()
+    if DDL_NOLOGGING:
+        clausulas.append("NOLOGGING")
+    if DDL_PARALELISMO:
+        clausulas.append(f"PARALLEL {int(DDL_PARALELISMO)}")
+    return clausulas
+
+
+def gerar_bloco_create_table(nome_tabela_objeto, columns_ddl_list):
+    nome_tabela_objeto_com_aspas = f'"{nome_tabela_objeto}"'
+    clausulas = clausulas_ddl_carga()
+    clausulas_formatadas = f"\n{' '.join(clausulas)}" if clausulas else ""
+    # Comandos SQL terminados em ';' já executam no SQL*Plus; um '/' depois repetiria o comando
+    # (o CREATE repetido falha com ORA-00955 e o WHENEVER SQLERROR encerra o script antes da próxima tabela)
+    # A contagem de linhas (num_rows) só é exibida no pós-carga, depois da coleta de estatísticas
+    return f"""{gerar_sql_create_table(nome_tabela_objeto_com_aspas, columns_ddl_list)}{clausulas_formatadas};
+
+GRANT ALL ON {nome_tabela_objeto_com_aspas} TO {USUARIO_GRANT};
+
+PROMPT Tabela criada com sucesso: {nome_tabela_objeto_com_aspas}
+SELECT 'Tabela ' || table_name || ' criada no schema ' || owner || '.'
+FROM ALL_TABLES
+WHERE TABLE_NAME = '{nome_tabela_objeto}'
+  AND OWNER = USER;
+"""
+
+
+def gerar_conteudo_create_table(tabelas):
+    # tabelas: lista de (nome_tabela_objeto, columns_ddl_list)
+    blocos = "\n".join(gerar_bloco_create_table(nome, ddl) for nome, ddl in tabelas)
+    return f"""
+-- Script para criar a tabela e conceder permissoes (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+SET DEFINE OFF;
+SET ESCAPE OFF;
+WHENEVER SQLERROR EXIT FAILURE;
+
+{blocos}EXIT;
+"""
+
+
+def chaves_detectadas_pos_carga(chaves):
+    # (chave_primaria, índices detectados) que o pós-carga deve criar; nada sem detecção ou com ela desligada
+    if not chaves or not POS_CARGA_CHAVES_DETECTADAS:
+        return None, []
+    return chaves['chave_primaria'], chaves['indices']
+
+
+def indices_pos_carga(nome_tabela_objeto, columns_ddl_list, chaves=None):
+    # Retorna [(nome_indice, colunas, unico)]: os POS_CARGA_INDICES aplicáveis à tabela e depois os detectados
+    nomes_colunas = {separar_definicao_coluna(col_def)[0] for col_def in columns_ddl_list}
+    chave_primaria, indices_detectados = chaves_detectadas_pos_carga(chaves)
+    indices = []
+    for colunas in POS_CARGA_INDICES:
+        if all(coluna in nomes_colunas for coluna in colunas):
+            indices.append((f"{nome_tabela_objeto[:25]}_I{len(indices) + 1:02d}", list(colunas), False))
+        else:
+            logging.info(f"Índice {colunas} ignorado em {nome_tabela_objeto}: a tabela não tem todas as colunas.")
+    for indice in indices_detectados:
+        if indice['colunas'] != chave_primaria and all(indice['colunas'] != colunas for _, colunas, _ in indices):
+            indices.append((f"{nome_tabela_objeto[:25]}_I{len(indices) + 1:02d}", indice['colunas'], indice['unico']))
+    return indices
+
+
+def gerar_bloco_pos_carga(nome_tabela_objeto, columns_ddl_list, chaves=None):
+    tabela = f'"{nome_tabela_objeto}"'
+    atributos_indice = (" NOLOGGING" if DDL_NOLOGGING else "") + \
+                       (f" PARALLEL {int(DDL_PARALELISMO)}" if DDL_PARALELISMO else "")
+    restaurar_indice = []
+    if DDL_NOLOGGING:
+        restaurar_indice.append("LOGGING")
+    if DDL_PARALELISMO:
+        restaurar_indice.append("NOPARALLEL")
+    partes = []
+    chave_primaria, _ = chaves_detectadas_pos_carga(chaves)
+    if chave_primaria:
+        nome_pk = f"{nome_tabela_objeto[:27]}_PK"
+        lista_colunas = ", ".join(f'"{coluna}"' for coluna in chave_primaria)
+        alter_indice = (f"""
+    EXECUTE IMMEDIATE 'ALTER INDEX "{nome_pk}" {' '.join(restaurar_indice)}';""" if restaurar_indice else "")
+        # O índice único é criado antes (NOLOGGING/PARALLEL) e a constraint só o adota, sem nova ordenação.
+        # ORA-00955/ORA-02260: índice ou chave primária já existem (reexecução ou modo incremental)
+        partes.append(f"""BEGIN
+    EXECUTE IMMEDIATE 'CREATE UNIQUE INDEX "{nome_pk}" ON {tabela} ({lista_colunas}){atributos_indice}';
+    EXECUTE IMMEDIATE 'ALTER TABLE {tabela} ADD CONSTRAINT "{nome_pk}" PRIMARY KEY ({lista_colunas}) USING INDEX "{nome_pk}"';{alter_indice}
+    DBMS_OUTPUT.PUT_LINE('Chave primaria {nome_pk} criada em {nome_tabela_objeto} ({", ".join(chave_primaria)}).');
+EXCEPTION
+    WHEN OTHERS THEN
+      IF SQLCODE IN (-955, -2260) THEN
+        DBMS_OUTPUT.PUT_LINE('Chave primaria ja existe em {nome_tabela_objeto}.');
+      ELSE
+        RAISE;
+      END IF;
+END;
+/
+""")
+    for nome_indice, colunas, unico in indices_pos_carga(nome_tabela_objeto, columns_ddl_list, chaves):
+        lista_colunas = ", ".join(f'"{coluna}"' for coluna in colunas)
+        alter_indice = (f"""
+    EXECUTE IMMEDIATE 'ALTER INDEX "{nome_indice}" {' '.join(restaurar_indice)}';""" if restaurar_indice else "")
+        # Em reexecuções (ou no modo incremental) o índice já existe: ORA-00955 apenas avisa
+        partes.append(f"""BEGIN
+    EXECUTE IMMEDIATE 'CREATE {"UNIQUE " if unico else ""}INDEX "{nome_indice}" ON {tabela} ({lista_colunas}){atributos_indice}';{alter_indice}
+    DBMS_OUTPUT.PUT_LINE('Indice {nome_indice} criado em {nome_tabela_objeto} ({", ".join(colunas)}).');
+EXCEPTION
+    WHEN OTHERS THEN
+      IF SQLCODE = -955 THEN
+        DBMS_OUTPUT.PUT_LINE('Indice {nome_indice} ja existe em {nome_tabela_objeto}.');
+      ELSE
+        RAISE;
+      END IF;
+END;
+/
+""")
+    if POS_CARGA_ESTATISTICAS:
+        # Depois dos índices: cascade coleta as estatísticas deles na mesma chamada
+        partes.append(f"""BEGIN
+    DBMS_STATS.GATHER_TABLE_STATS(
+        ownname          => USER,
+        tabname          => '{nome_tabela_objeto}',
+        estimate_percent => DBMS_STATS.AUTO_SAMPLE_SIZE,
+        method_opt       => 'FOR ALL COLUMNS SIZE AUTO',
+        degree           => {int(DDL_PARALELISMO or 1)},
+        cascade          => TRUE);
+    DBMS_OUTPUT.PUT_LINE('Estatisticas coletadas para {nome_tabela_objeto}.');
+END;
+/
+""")
+    restaurar_tabela = ([f"ALTER TABLE {tabela} LOGGING;\n"] if DDL_NOLOGGING else []) + \
+                       ([f"ALTER TABLE {tabela} NOPARALLEL;\n"] if DDL_PARALELISMO else [])
+    if restaurar_tabela:
+        partes.append("".join(restaurar_tabela))
+    partes.append(f"""SELECT 'Tabela ' || table_name || ' possui ' || num_rows || ' linhas (estatisticas de '
+       || TO_CHAR(last_analyzed, 'DD/MM/YYYY HH24:MI:SS') || ').'
+FROM ALL_TABLES
+WHERE TABLE_NAME = '{nome_tabela_objeto}'
+  AND OWNER = USER;
+""")
+    return "\n".join(partes)
+
+
+def gerar_conteudo_pos_carga(tabelas):
+    # tabelas: lista de (nome_tabela_objeto, columns_ddl_list) ou (nome_tabela_objeto, columns_ddl_list, chaves)
+    blocos = "\n".join(gerar_bloco_pos_carga(*tabela) for tabela in tabelas)
+    return f"""
+-- Script pos-carga: indices, estatisticas e restauracao de LOGGING/NOPARALLEL (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+SET DEFINE OFF;
+SET ESCAPE OFF;
+SET SERVEROUTPUT ON;
+WHENEVER SQLERROR EXIT FAILURE;
+
+{blocos}
+EXIT;
+"""
+
+
+def gerar_bloco_batch_pos_carga():
+    # Só roda se a carga terminou sem erro (0 = sucesso, 2 = avisos)
+    return f"""
+echo.
+echo =========================================================================
+echo.
+if !LOAD_RC! EQU 1 goto SKIP_POS_CARGA
+if !LOAD_RC! EQU 3 goto SKIP_POS_CARGA
+echo Executando o script pos-carga (indices, estatisticas e atributos da tabela)...
+sqlplus -L -S !DB_USER!/!DB_PASS!@!DB_DSN! "@!LOCAL_EXEC_PATH!\\{ARQUIVO_POS_CARGA_SQL}"
+if !ERRORLEVEL! NEQ 0 (
+    echo ERRO ao executar o script pos-carga. Os dados foram carregados; verifique as mensagens acima.
+) else (
+    echo SCRIPT POS-CARGA EXECUTADO COM SUCESSO.
+)
+goto END_POS_CARGA
+:SKIP_POS_CARGA
+echo Script pos-carga NAO executado: a carga falhou.
+:END_POS_CARGA
+"""
+
+
+# --- Script mestre: todas as etapas SQL numa única sessão do SQL*Plus ---
+# Fase -> (código de saída do sqlplus quando ela falha, descrição); 0 = sucesso, 2 = carga com linhas rejeitadas
+FASES_SCRIPT_MESTRE = {
+    'conexao': (1, 'conexao com o banco'),
+    'carga': (3, 'carga dos dados'),
+    'drop': (11, 'DROP TABLE'),
+    'create': (12, 'CREATE TABLE/GRANT'),
+    'verificacao_ddl': (13, 'verificacao da tabela criada'),
+    'merge': (14, 'aplicacao do delta MERGE/DELETE'),
+    'pos_carga': (15, 'script pos-carga'),
+    'verificacao_carga': (16, 'verificacao da carga'),
+}
+
+
+def _saida_fase_mestre(fase):
+    return f"WHENEVER SQLERROR EXIT {FASES_SCRIPT_MESTRE[fase][0]} ROLLBACK;\n"
+
+
+def gerar_bloco_verificacao_ddl(nome_tabela_objeto, columns_ddl_list):
+    # Confere no dicionário de dados o que o CREATE/GRANT deveriam ter deixado
+    return f"""DECLARE
+    v_colunas NUMBER;
+    v_grants  NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_colunas FROM USER_TAB_COLUMNS WHERE TABLE_NAME = '{nome_tabela_objeto}';
+    IF v_colunas <> {len(columns_ddl_list)} THEN
+        RAISE_APPLICATION_ERROR(-20013, 'Tabela {nome_tabela_objeto} com ' || v_colunas
+            || ' colunas; esperadas {len(columns_ddl_list)}.');
+    END IF;
+    SELECT COUNT(*) INTO v_grants FROM USER_TAB_PRIVS_MADE
+    WHERE TABLE_NAME = '{nome_tabela_objeto}' AND GRANTEE = '{USUARIO_GRANT}';
+    IF v_grants = 0 THEN
+        RAISE_APPLICATION_ERROR(-20013, 'GRANT para {USUARIO_GRANT} ausente na tabela {nome_tabela_objeto}.');
+    END IF;
+    DBMS_OUTPUT.PUT_LINE('Tabela {nome_tabela_objeto} conferida: ' || v_colunas || ' colunas, GRANT para {USUARIO_GRANT}.');
+END;
+/
+"""
+
+
+def gerar_bloco_carga_mestre(nome_tabela_objeto, columns_ddl_list):
+    if MODO_CARGA == 'tabela_externa':
+        return gerar_bloco_carga_tabela_externa(nome_tabela_objeto, columns_ddl_list)
+    # O PowerShell herda do .bat as credenciais (DB_*_SQL); _RC traz o código de saída do último HOST
+    return f"""PROMPT Executando a carga de dados via SQL Loader (via PowerShell)...
+HOST powershell.exe -ExecutionPolicy Bypass -File "{caminho_na_pasta_vpn(ARQUIVO_POWERSHELL_SQLLDR)}"
+SET DEFINE ON
+DEFINE RC_CARGA = "&_RC"
+BEGIN
+    IF '&RC_CARGA' NOT IN ('0', '2') THEN
+        RAISE_APPLICATION_ERROR(-20003, 'A carga via SQL Loader terminou com codigo &RC_CARGA.');
+    END IF;
+END;
+/
+SET DEFINE OFF
+"""
+
+
+def gerar_bloco_verificacao_carga(nome_tabela_objeto):
+    return f"""DECLARE
+    v_linhas NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_linhas FROM "{nome_tabela_objeto}";
+    IF v_linhas = 0 THEN
+        RAISE_APPLICATION_ERROR(-20016, 'Nenhuma linha na tabela {nome_tabela_objeto} apos a carga.');
+    END IF;
+    DBMS_OUTPUT.PUT_LINE('Tabela {nome_tabela_objeto} com ' || v_linhas || ' linhas apos a carga.');
+END;
+/
+"""
+
+
+def gerar_conteudo_script_mestre(nome_tabela_objeto, columns_ddl_list, nome_tabela_destino, columns_ddl_destino,
+                                 carga_delta=False, chaves=None, chaves_delta_anulaveis=None):
+    # nome_tabela_objeto/columns_ddl_list: tabela criada e carregada (a staging, no modo incremental)
+    # nome_tabela_destino/columns_ddl_destino: tabela final, alvo do MERGE e do pós-carga
+    partes = [
+        _saida_fase_mestre('conexao'),
+        "SELECT 'Conectado como ' || USER || ' em ' || SYS_CONTEXT('USERENV', 'DB_NAME') AS conexao FROM DUAL;\n",
+        _saida_fase_mestre('drop'),
+        gerar_bloco_drop_table(nome_tabela_objeto),
+        _saida_fase_mestre('create'),
+        gerar_bloco_create_table(nome_tabela_objeto, columns_ddl_list),
+        _saida_fase_mestre('verificacao_ddl'),
+        gerar_bloco_verificacao_ddl(nome_tabela_objeto, columns_ddl_list),
+        _saida_fase_mestre('carga'),
+        gerar_bloco_carga_mestre(nome_tabela_objeto, columns_ddl_list),
+    ]
+    if carga_delta:
+        partes += [_saida_fase_mestre('merge'),
+                   gerar_bloco_merge_delta(nome_tabela_destino, columns_ddl_destino, chaves_delta_anulaveis)]
+    if POS_CARGA:
+        partes += [_saida_fase_mestre('pos_carga'),
+                   gerar_bloco_pos_carga(nome_tabela_destino, columns_ddl_destino, chaves)]
+    partes += [_saida_fase_mestre('verificacao_carga'),
+               gerar_bloco_verificacao_carga(nome_tabela_destino)]
+    # Com SQL Loader o código final repete o da carga: 2 = concluída com linhas rejeitadas
+    saida = "SET DEFINE ON\nEXIT &RC_CARGA" if MODO_CARGA != 'tabela_externa' else "EXIT 0"
+    blocos = "\n".join(partes)
+    return f"""
+-- Script mestre: todas as etapas SQL numa unica sessao do SQL*Plus (gerado pelo Python)
+-- Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+-- Codigos de saida: 0 = sucesso, 2 = carga com linhas rejeitadas, {', '.join(f'{c} = {d}' for c, d in FASES_SCRIPT_MESTRE.values())}
+
+SET DEFINE OFF;
+SET ESCAPE OFF;
+SET VERIFY OFF;
+SET FEEDBACK ON;
+SET SERVEROUTPUT ON;
+
+{blocos}
+{saida}
+"""
+
+
+# (Fim das funções auxiliares)
+
+
+def gerar_scripts_oracle(caminho_arquivo, tipo_arquivo, nome_tabela_objeto=None, nome_aba=None):
+    logging.info(f"Iniciando a geração de scripts para o arquivo: {caminho_arquivo} do tipo: {tipo_arquivo}"
+                 + (f" (aba '{nome_aba}')" if nome_aba else ""))
+
+    nome_tabela_objeto = nome_tabela_objeto or gerar_nome_tabela(caminho_arquivo)
+    nome_tabela_destino = nome_tabela_objeto  # No modo incremental nome_tabela_objeto passa a ser a staging
+    nome_tabela_objeto_com_aspas = f'"{nome_tabela_objeto}"'
+
+    logging.info(f"Nome do objeto da tabela gerado: {nome_tabela_objeto}")
+
+    try:
+        chave_cache = chave_cache_leitura(caminho_arquivo, tipo_arquivo, nome_aba) if CACHE_LEITURA else None
+        entrada_cache = ler_cache_leitura(chave_cache) if chave_cache else None
+        if entrada_cache is not None:
+            logging.info(f"Arquivo sem alterações desde a última leitura: usando o cache ({chave_cache[:12]}).")
+            columns_ddl_list = processar_do_cache_leitura(entrada_cache)
+
+        elif tipo_arquivo.lower() == 'excel':
+            logging.info(f"Processando planilha com o motor '{escolher_motor_leitura(caminho_arquivo)}' (streaming).")
+            registro_cache = novo_registro_cache_leitura(chave_cache) if chave_cache else None
+            columns_ddl_list = processar_excel_streaming(caminho_arquivo, nome_aba, registro_cache)
+
+        elif tipo_arquivo.lower() == 'csv':
+            logging.info(f"Processando arquivo CSV com pandas em blocos de {CHUNKSIZE} linhas.")
+            registro_cache = novo_registro_cache_leitura(chave_cache) if chave_cache else None
+            columns_ddl_list = processar_csv_em_blocos(caminho_arquivo, registro_cache)
+        else:
+            raise ValueError("Tipo de arquivo não suportado. Use 'excel' ou 'csv'.")
+
+        logging.info("Processamento do arquivo concluído.")
+        print("=========================================================================")
+
+        with open(ARQUIVO_NOME_TABELA_TXT, 'w', encoding='utf-8') as f:
+            f.write(nome_tabela_objeto_com_aspas)
+            logging.info(f"Nome da tabela gravado em: {ARQUIVO_NOME_TABELA_TXT}")
+
+        # --- Validação pré-carga: separa as linhas que o banco rejeitaria antes de qualquer ida à VPN ---
+        linhas_rejeitadas = None
+        linhas_removidas = 0
+        if VALIDACAO_PRE_CARGA:
+            with medir_etapa('validacao_pre_carga', bytes=os.path.getsize(ARQUIVO_DADOS_PLANO)) as etapa:
+                resumo_validacao = validar_arquivo_dados_pre_carga(
+                    columns_ddl_list,
+                    linha_inicial_origem=EXCEL_DATA_START_ROW_NUM if tipo_arquivo.lower() == 'excel' else 2)
+                linhas_rejeitadas = resumo_validacao['linhas_rejeitadas']
+                if resumo_validacao['removidas_do_arquivo']:
+                    linhas_removidas = linhas_rejeitadas
+                etapa['linhas'] = resumo_validacao['linhas']
+                etapa['rejeitadas'] = linhas_rejeitadas
+
+        columns_ddl_destino = columns_ddl_list  # Colunas da tabela final (sem a coluna de operação do delta)
+
+        # --- Chaves candidatas: sobre o arquivo completo, antes de o modo incremental reduzi-lo ao delta ---
+        chaves = None
+        if DETECCAO_CHAVES:
+            with medir_etapa('deteccao_chaves', bytes=os.path.getsize(ARQUIVO_DADOS_PLANO)) as etapa:
+                chaves = detectar_chaves_candidatas(columns_ddl_list)
+                etapa['chave_primaria'] = chaves['chave_primaria']
+                etapa['indices'] = len(chaves['indices'])
+            if not POS_CARGA:
+                logging.info(f"POS_CARGA desligado: as chaves detectadas ficam só em '{ARQUIVO_RELATORIO_CHAVES}'.")
+
+        # --- Carga incremental: com delta disponível, DROP/CREATE/sqlldr passam a atuar na tabela de staging ---
+        carga_delta = False
+        id_manifesto_delta = None
+        chaves_delta_anulaveis = None
+        if MODO_INCREMENTAL:
+            with medir_etapa('preparacao_delta'):
+                delta = preparar_carga_delta(nome_tabela_objeto, columns_ddl_list)
+            carga_delta, id_manifesto_delta = delta['carga_delta'], delta['id_manifesto']
+            chaves_delta_anulaveis = delta['chaves_anulaveis']
+        if carga_delta:
+            with open(ARQUIVO_MERGE_SQL, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_merge_delta(nome_tabela_objeto, columns_ddl_list, chaves_delta_anulaveis))
+            logging.info(f"Script MERGE do delta '{ARQUIVO_MERGE_SQL}' gerado com sucesso.")
+            nome_tabela_objeto = nome_tabela_staging_delta(nome_tabela_objeto)
+            nome_tabela_objeto_com_aspas = f'"{nome_tabela_objeto}"'
+            columns_ddl_list = columns_ddl_list + [f'"{COLUNA_OPERACAO_DELTA}" VARCHAR2(1 CHAR)']
+
+        # --- Geração do ARQUIVO drop_table_script.sql ---
+        logging.info("Gerando script DROP TABLE...")
+        drop_table_sql_content = gerar_conteudo_drop_table([nome_tabela_objeto])
+        with open(ARQUIVO_DROP_TABLE_SQL, 'w', encoding='utf-8') as f:
+            f.write(drop_table_sql_content)
+        logging.info(f"Script DROP TABLE '{ARQUIVO_DROP_TABLE_SQL}' gerado com sucesso.")
+
+        # --- Geração do ARQUIVO create_table_only_script.sql ---
+        logging.info("Gerando script CREATE TABLE...")
+        create_table_only_sql_content = gerar_conteudo_create_table([(nome_tabela_objeto, columns_ddl_list)])
+        with open(ARQUIVO_CREATE_TABLE_SQL, 'w', encoding='utf-8') as f:
+            f.write(create_table_only_sql_content)
+        logging.info(f"Script CREATE TABLE '{ARQUIVO_CREATE_TABLE_SQL}' gerado com sucesso.")
+
+        # --- Pós-carga: roda sobre a tabela final (após o MERGE, no modo incremental) ---
+        if POS_CARGA:
+            with open(ARQUIVO_POS_CARGA_SQL, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_pos_carga([(nome_tabela_destino, columns_ddl_destino, chaves)]))
+            logging.info(f"Script pós-carga '{ARQUIVO_POS_CARGA_SQL}' gerado com sucesso.")
+
+        # --- Script mestre: as mesmas etapas numa única sessão do SQL*Plus ---
+        if SESSAO_UNICA:
+            with open(ARQUIVO_SCRIPT_MESTRE_SQL, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_script_mestre(nome_tabela_objeto, columns_ddl_list, nome_tabela_destino,
+                                                     columns_ddl_destino, carga_delta, chaves,
+                                                     chaves_delta_anulaveis))
+            logging.info(f"Script mestre '{ARQUIVO_SCRIPT_MESTRE_SQL}' gerado com sucesso.")
+
+        if MODO_CARGA == 'tabela_externa':
+            # O ORACLE_LOADER paraleliza a leitura no servidor: não há partições nem .ctl/.par
+            with open(ARQUIVO_TABELA_EXTERNA_SQL, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_tabela_externa(nome_tabela_objeto, columns_ddl_list))
+            logging.info(f"Script da tabela externa '{ARQUIVO_TABELA_EXTERNA_SQL}' gerado com sucesso.")
+            return {'nome_tabela': nome_tabela_destino, 'carga_delta': carga_delta,
+                    'id_manifesto_delta': id_manifesto_delta,
+                    'tabela_ddl': nome_tabela_objeto, 'columns_ddl_list': columns_ddl_list,
+                    'linhas_rejeitadas': linhas_rejeitadas, 'linhas_removidas': linhas_removidas,
+                    'chaves': chaves}
+
+        # --- Geração dos arquivos .ctl e .par do SQL*Loader (tipos já conhecidos pelo Python) ---
+        arquivos_particoes = None
+        manifesto_segmentos = None
+        if CARGA_RETOMAVEL:
+            with medir_etapa('segmentacao', bytes=os.path.getsize(ARQUIVO_DADOS_PLANO)) as etapa:
+                manifesto_segmentos = segmentar_arquivo_dados(ARQUIVO_DADOS_PLANO, SEGMENTO_LINHAS, nome_tabela_objeto)
+                etapa['segmentos'] = len(manifesto_segmentos['segmentos'])
+                arquivos_particoes = [s['arquivo'] for s in manifesto_segmentos['segmentos']]
+        elif SQLLDR_PARTICOES > 1:
+            with medir_etapa('particionamento', particoes=SQLLDR_PARTICOES,
+                             bytes=os.path.getsize(ARQUIVO_DADOS_PLANO)):
+                arquivos_particoes = particionar_arquivo_dados(ARQUIVO_DADOS_PLANO, SQLLDR_PARTICOES)
+        if PACOTE_TRANSFERENCIA:
+            with medir_etapa('pacote_transferencia') as etapa:
+                manifesto = gerar_pacote_transferencia(arquivos_particoes or [ARQUIVO_DADOS_PLANO])
+                etapa['bytes'] = sum(a['bytes'] for a in manifesto['arquivos'])
+        with medir_etapa('arquivos_sqlldr'):
+            if manifesto_segmentos:
+                gerar_arquivos_sqlldr_segmentos(nome_tabela_objeto_com_aspas, columns_ddl_list,
+                                                manifesto_segmentos['segmentos'])
+            else:
+                gerar_arquivos_sqlldr(nome_tabela_objeto_com_aspas, columns_ddl_list, arquivos_particoes)
+
+        # tabela_ddl/columns_ddl_list: tabela efetivamente criada e carregada (a staging, no modo incremental)
+        return {'nome_tabela': nome_tabela_destino, 'carga_delta': carga_delta,
+                'id_manifesto_delta': id_manifesto_delta,
+                'tabela_ddl': nome_tabela_objeto, 'columns_ddl_list': columns_ddl_list,
+                'linhas_rejeitadas': linhas_rejeitadas, 'linhas_removidas': linhas_removidas,
+                'manifesto_segmentos': manifesto_segmentos,
+                'chaves': chaves}
+
+    except Exception as e:
+        logging.error(f"OCORREU UM ERRO CRÍTICO na geração de scripts: {e}")
+        print(f"\nOCORREU UM ERRO CRÍTICO na geração de scripts: {e}")
+        print("Por favor, verifique:")
+        print(f"  - O caminho da planilha Excel/CSV: '{CAMINHO_PLANILHA}' está correto e o arquivo existe?")
+        print(f"  - A planilha não está aberta em outro programa?")
+        print(f"  - O parametro TIPO_ARQUIVO ('{TIPO_ARQUIVO}') corresponde ao tipo real do arquivo?")
+        print(f"  - PARA EXCEL: EXCEL_HEADER_ROW_NUM ('{EXCEL_HEADER_ROW_NUM}') está correto (geralmente 1 para linha 1 do Excel)?")
+        print(f"  - PARA EXCEL: EXCEL_DATA_START_ROW_NUM ('{EXCEL_DATA_START_ROW_NUM}') está correto (2 para linha 2 do Excel, etc.)?")
+        print(f"  - NUM_COLUNAS_ESPERADAS_EXCEL ('{NUM_COLUNAS_ESPERADAS_EXCEL}') está correto e corresponde ao número real de colunas que você quer ler?")
+        print(f"  - PARA CSV: DELIMITADOR_ENTRADA_CSV ('{DELIMITADOR_ENTRADA_CSV}') está correto?")
+        print("=========================================================================")
+        exit(1)
+
+
+# --- Modo lote: vários arquivos em paralelo ---
+def tipo_arquivo_por_extensao(caminho_arquivo):
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    if extensao not in EXTENSOES_POR_TIPO:
+        raise ValueError(f"Extensão não suportada no modo lote: {caminho_arquivo}")
+    return EXTENSOES_POR_TIPO[extensao]
+
+
+def listar_arquivos_lote(origem):
+    if os.path.isdir(origem):
+        caminhos = [os.path.join(origem, nome) for nome in os.listdir(origem)]
+    else:
+        caminhos = glob.glob(origem)
+    # Ignora arquivos temporários do Excel (~$arquivo.xlsx) e extensões não suportadas
+    return sorted(c for c in caminhos
+                  if os.path.isfile(c) and not os.path.basename(c).startswith('~$')
+                  and os.path.splitext(c)[1].lower() in EXTENSOES_POR_TIPO)
+
+
+def nomes_tabelas_unicos(nomes_tabelas):
+    # Arquivos/abas diferentes podem gerar o mesmo nome (normalização + corte em 30 caracteres)
+    nomes = []
+    usados = set()
+    for nome in nomes_tabelas:
+        i = 1
+        candidato = nome
+        while candidato in usados:
+            i += 1
+            sufixo = f"_{i}"
+            candidato = f"{nome[:30 - len(sufixo)]}{sufixo}"
+        usados.add(candidato)
+        nomes.append(candidato)
+    return nomes
+
+
+def _processar_arquivo_lote(caminho_arquivo, tipo_arquivo, nome_tabela_objeto, pasta_saida, pasta_vpn, nome_aba=None):
+    # Executa num processo filho: a pasta de trabalho e a pasta da VPN são ajustadas só neste processo
+    global PASTA_LOCAL_VPN_PARA_EXECUCAO
+    os.makedirs(pasta_saida, exist_ok=True)
+    diretorio_original = os.getcwd()
+    pasta_vpn_original = PASTA_LOCAL_VPN_PARA_EXECUCAO
+    PASTA_LOCAL_VPN_PARA_EXECUCAO = pasta_vpn
+    os.chdir(pasta_saida)
+    reiniciar_metricas_execucao()
+    try:
+        resultado_geracao = gerar_scripts_oracle(caminho_arquivo, tipo_arquivo, nome_tabela_objeto, nome_aba)
+        gerar_scripts_execucao(resultado_geracao)
+        if ARQUIVO_METRICAS:
+            gravar_metricas_execucao()  # Um arquivo de métricas por tabela, na pasta dela
+    finally:
+        os.chdir(diretorio_original)
+        PASTA_LOCAL_VPN_PARA_EXECUCAO = pasta_vpn_original
+    resultado_geracao['pasta_vpn'] = pasta_vpn
+    return resultado_geracao
+
+
+def processar_lote(origem, pasta_saida=None, max_processos=None):
+    pasta_saida = os.path.abspath(pasta_saida or PASTA_SAIDA_LOTE)
+    caminhos_arquivos = [os.path.abspath(c) for c in listar_arquivos_lote(origem)]
+    if not caminhos_arquivos:
+        raise ValueError(f"Nenhum arquivo {'/'.join(EXTENSOES_POR_TIPO)} encontrado em: {origem}")
+    nomes_tabelas = nomes_tabelas_unicos([gerar_nome_tabela(c) for c in caminhos_arquivos])
+    pasta_vpn_lote = f"{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(pasta_saida)}"
+    logging.info(f"Modo lote: {len(caminhos_arquivos)} arquivos de '{origem}' em '{pasta_saida}'.")
+
+    resultados = []
+    falhas = []
+    with medir_etapa('modo_lote', arquivos=len(caminhos_arquivos)), \
+            ProcessPoolExecutor(max_workers=max_processos or LOTE_MAX_PROCESSOS) as executor:
+        futuros = {
+            executor.submit(_processar_arquivo_lote, caminho_arquivo, tipo_arquivo_por_extensao(caminho_arquivo),
+                            nome_tabela, os.path.join(pasta_saida, nome_tabela), f"{pasta_vpn_lote}\\{nome_tabela}"):
+                caminho_arquivo
+            for caminho_arquivo, nome_tabela in zip(caminhos_arquivos, nomes_tabelas)
+        }
+        for futuro in as_completed(futuros):
+            caminho_arquivo = futuros[futuro]
+            try:
+                resultados.append(futuro.result())
+                logging.info(f"Modo lote: '{caminho_arquivo}' processado.")
+            except (Exception, SystemExit) as e:  # gerar_scripts_oracle encerra com exit(1) em caso de erro
+                falhas.append(caminho_arquivo)
+                logging.error(f"Modo lote: falha ao processar '{caminho_arquivo}': {e!r}")
+
+    resultados.sort(key=lambda r: r['nome_tabela'])
+    if resultados:
+        with open(os.path.join(pasta_saida, ARQUIVO_ORQUESTRADOR_LOTE), 'w', encoding='utf-8') as f:
+            f.write(gerar_conteudo_orquestrador_lote(resultados))
+    print(f"Modo lote: {len(resultados)} arquivos processados, {len(falhas)} com falha.")
+    for caminho_arquivo in falhas:
+        print(f"  - FALHA: {caminho_arquivo}")
+    return resultados, falhas
+
+
+def processar_abas(caminho_arquivo, pasta_saida=None, max_processos=None):
+    # Cada aba não vazia vira uma tabela, processada num processo próprio (leitura, perfil e CSV)
+    pasta_saida = os.path.abspath(pasta_saida or PASTA_SAIDA_ABAS)
+    caminho_arquivo = os.path.abspath(caminho_arquivo)
+    abas = listar_abas_nao_vazias(caminho_arquivo)
+    if not abas:
+        raise ValueError(f"Nenhuma aba com cabeçalho na linha {EXCEL_HEADER_ROW_NUM} em: {caminho_arquivo}")
+    nomes_tabelas = nomes_tabelas_unicos([gerar_nome_tabela_aba(caminho_arquivo, aba) for aba in abas])
+    pasta_vpn_abas = f"{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(pasta_saida)}"
+    logging.info(f"Modo multiabas: {len(abas)} abas de '{caminho_arquivo}' em '{pasta_saida}': {abas}")
+
+    resultados = []
+    falhas = []
+    with medir_etapa('modo_multiabas', abas=len(abas)), \
+            ProcessPoolExecutor(max_workers=max_processos or LOTE_MAX_PROCESSOS) as executor:
+        futuros = {
+            executor.submit(_processar_arquivo_lote, caminho_arquivo, 'excel', nome_tabela,
+                            os.path.join(pasta_saida, nome_tabela), f"{pasta_vpn_abas}\\{nome_tabela}", aba):
+                aba
+            for aba, nome_tabela in zip(abas, nomes_tabelas)
+        }
+        for futuro in as_completed(futuros):
+            aba = futuros[futuro]
+            try:
+                resultados.append(futuro.result())
+                logging.info(f"Modo multiabas: aba '{aba}' processada.")
+            except (Exception, SystemExit) as e:  # gerar_scripts_oracle encerra com exit(1) em caso de erro
+                falhas.append(aba)
+                logging.error(f"Modo multiabas: falha ao processar a aba '{aba}': {e!r}")
+
+    resultados.sort(key=lambda r: r['nome_tabela'])
+    if resultados:
+        # DDL de todas as abas em um único script, executado uma vez antes das cargas paralelas
+        with open(os.path.join(pasta_saida, ARQUIVO_DROP_TABLE_SQL), 'w', encoding='utf-8') as f:
+            f.write(gerar_conteudo_drop_table([r['tabela_ddl'] for r in resultados]))
+        with open(os.path.join(pasta_saida, ARQUIVO_CREATE_TABLE_SQL), 'w', encoding='utf-8') as f:
+            f.write(gerar_conteudo_create_table([(r['tabela_ddl'], r['columns_ddl_list']) for r in resultados]))
+        with open(os.path.join(pasta_saida, ARQUIVO_ORQUESTRADOR_LOTE), 'w', encoding='utf-8') as f:
+            f.write(gerar_conteudo_orquestrador_lote(resultados, ddl_combinado=True))
+    print(f"Modo multiabas: {len(resultados)} abas processadas, {len(falhas)} com falha.")
+    for aba in falhas:
+        print(f"  - FALHA: aba '{aba}'")
+    return resultados, falhas
+
+
+def gerar_conteudo_orquestrador_lote(resultados, max_cargas_simultaneas=None, ddl_combinado=False):
+    # ddl_combinado: DROP/CREATE de todas as tabelas ficam na pasta do orquestrador e rodam uma vez, numa sessão
+    max_cargas_simultaneas = max_cargas_simultaneas or LOTE_MAX_CARGAS_SIMULTANEAS
+    tabelas_ps = ",\n".join(
+        f'    @{{ Tabela = "{r["nome_tabela"]}"; Pasta = "{r["pasta_vpn"]}"; '
+        f'Merge = ${"true" if r["carga_delta"] else "false"}; '
+        f'Manifesto = {json.dumps(r.get("id_manifesto_delta") or "")} }}'
+        for r in resultados)
+    if MODO_CARGA == 'tabela_externa':
+        comando_carga_job = f'& sqlplus -L -S $conexao "@$($item.Pasta)\\{ARQUIVO_TABELA_EXTERNA_SQL}" | Out-Null'
+    else:
+        comando_carga_job = (f'& powershell.exe -ExecutionPolicy Bypass -File '
+                             f'"$($item.Pasta)\\{ARQUIVO_POWERSHELL_SQLLDR}" | Out-Null')
+    if POS_CARGA:
+        bloco_pos_carga_job = f"""
+    if ($codigo -eq 0 -or $codigo -eq 2) {{
+        & sqlplus -L -S $conexao "@$($item.Pasta)\\{ARQUIVO_POS_CARGA_SQL}" | Out-Null
+        if ($LASTEXITCODE -ne 0) {{
+            return [pscustomobject]@{{ Tabela = $item.Tabela; Codigo = $LASTEXITCODE; Etapa = "POS-CARGA" }}
+        }}
+    }}"""
+    else:
+        bloco_pos_carga_job = ""
+    if CARGA_RETOMAVEL:
+        # Tabela com checkpoint retoma a carga: sem DROP/CREATE, o execute_sqlldr.ps1 pula os segmentos confirmados
+        retomar_job = f"""
+    if (Test-Path "$($item.Pasta)\\{ARQUIVO_CHECKPOINT_CARGA}") {{ $etapas = @() }}"""
+        condicao_ddl_combinado = (f'if (-not @($tabelas | Where-Object {{ Test-Path "$($_.Pasta)\\'
+                                  f'{ARQUIVO_CHECKPOINT_CARGA}" }})) {{\n')
+        fim_ddl_combinado = "}\n"
+    else:
+        retomar_job = ""
+        condicao_ddl_combinado = fim_ddl_combinado = ""
+    if ddl_combinado:
+        etapas_por_tabela = '@()'
+        bloco_ddl_combinado = f"""
+{condicao_ddl_combinado}foreach ($etapa in @("{ARQUIVO_DROP_TABLE_SQL}", "{ARQUIVO_CREATE_TABLE_SQL}")) {{
+    & sqlplus -L -S "$usuario/$senha@$dsn" "@$PSScriptRoot\\$etapa" | Out-Null
+    if ($LASTEXITCODE -ne 0) {{
+        Write-Host "ERRO: $etapa terminou com codigo $LASTEXITCODE. Cargas canceladas." -ForegroundColor Red
+        exit 1
+    }}
+}}
+{fim_ddl_combinado}"""
+    else:
+        etapas_por_tabela = f'@("{ARQUIVO_DROP_TABLE_SQL}", "{ARQUIVO_CREATE_TABLE_SQL}")'
+        bloco_ddl_combinado = ""
+    return f"""
+# Orquestrador do modo lote (gerado pelo Python)
+# Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+# Carrega {len(resultados)} tabelas com no maximo {max_cargas_simultaneas} cargas simultaneas.
+$ErrorActionPreference = 'Stop'
+
+$maxSimultaneas = {max_cargas_simultaneas}
+$tabelas = @(
+{tabelas_ps}
+)
+
+$usuario = if ($env:DB_USER_SQL) {{ $env:DB_USER_SQL }} else {{ Read-Host "Usuario" }}
+$senha = if ($env:DB_PASS_SQL) {{ $env:DB_PASS_SQL }} else {{ Read-Host "Senha" }}
+$dsn = if ($env:DB_DSN_SQL) {{ $env:DB_DSN_SQL }} else {{ Read-Host "DSN (Ex: hapvdese)" }}
+# Herdados pelos jobs e pelo execute_sqlldr.ps1 de cada tabela
+$env:DB_USER_SQL = $usuario
+$env:DB_PASS_SQL = $senha
+$env:DB_DSN_SQL = $dsn
+$env:ORACLE_HOME = "{ORACLE_HOME_PATH}"
+$env:PATH = "$env:ORACLE_HOME\\BIN;$env:PATH"
+$env:NLS_LANG = "{NLS_LANG_VALUE}"
+{bloco_ddl_combinado}
+$carga = {{
+    param($item)
+    $conexao = "$env:DB_USER_SQL/$env:DB_PASS_SQL@$env:DB_DSN_SQL"
+    $etapas = {etapas_por_tabela}{retomar_job}
+    foreach ($etapa in $etapas) {{
+        & sqlplus -L -S $conexao "@$($item.Pasta)\\$etapa" | Out-Null
+        if ($LASTEXITCODE -ne 0) {{
+            return [pscustomobject]@{{ Tabela = $item.Tabela; Codigo = $LASTEXITCODE; Etapa = $etapa }}
+        }}
+    }}
+    {comando_carga_job}
+    $codigo = $LASTEXITCODE
+    if ($item.Merge -and ($codigo -eq 0 -or $codigo -eq 2)) {{
+        & sqlplus -L -S $conexao "@$($item.Pasta)\\{ARQUIVO_MERGE_SQL}" | Out-Null
+        if ($LASTEXITCODE -ne 0) {{
+            return [pscustomobject]@{{ Tabela = $item.Tabela; Codigo = $LASTEXITCODE; Etapa = "MERGE" }}
+        }}
+    }}
+    if ($item.Manifesto -and $codigo -eq 0) {{
+        Set-Content -Path "$($item.Pasta)\\{ARQUIVO_CONFIRMACAO_DELTA}" -Value $item.Manifesto
+    }}{bloco_pos_carga_job}
+    [pscustomobject]@{{ Tabela = $item.Tabela; Codigo = $codigo; Etapa = "SQLLDR" }}
+}}
+
+$jobs = New-Object System.Collections.Generic.List[object]
+foreach ($item in $tabelas) {{
+    while (@($jobs | Where-Object {{ $_.State -eq 'Running' }}).Count -ge $maxSimultaneas) {{
+        Wait-Job -Job @($jobs | Where-Object {{ $_.State -eq 'Running' }}) -Any | Out-Null
+    }}
+    Write-Host "▶️  Iniciando carga: $($item.Tabela)" -ForegroundColor Cyan
+    $jobs.Add((Start-Job -Name $item.Tabela -ScriptBlock $carga -ArgumentList $item))
+}}
+$jobs | Wait-Job | Out-Null
+
+$codigoSaida = 0
+foreach ($job in $jobs) {{
+    $resultado = Receive-Job -Job $job | Where-Object {{ $_.Tabela }} | Select-Object -Last 1
+    if (-not $resultado) {{
+        $resultado = [pscustomobject]@{{ Tabela = $job.Name; Codigo = 1; Etapa = "JOB" }}
+    }}
+    $cor = if ($resultado.Codigo -eq 0) {{ "Green" }} elseif ($resultado.Codigo -eq 2) {{ "Yellow" }} else {{ "Red" }}
+    Write-Host "$($resultado.Tabela): codigo $($resultado.Codigo) (etapa $($resultado.Etapa))" -ForegroundColor $cor
+    if ($resultado.Codigo -ne 0 -and $resultado.Codigo -ne 2) {{
+        $codigoSaida = 1
+    }}
+}}
+$jobs | Remove-Job
+exit $codigoSaida
+"""
+
+
+# --- Modo monitor: pasta de entrada vigiada por um processo contínuo ---
+def _pasta_saida_monitor(pasta_saida, nome_tabela):
+    # Uma pasta por chegada: o mesmo arquivo pode chegar de novo em outro dia
+    nome_pasta = f"{nome_tabela}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    candidato = nome_pasta
+    i = 1
+    while os.path.exists(os.path.join(pasta_saida, candidato)):
+        i += 1
+        candidato = f"{nome_pasta}_{i}"
+    return candidato
+
+
+def _mover_arquivo_monitor(caminho_arquivo, subpasta):
+    pasta_destino = os.path.join(os.path.dirname(caminho_arquivo), subpasta)
+    os.makedirs(pasta_destino, exist_ok=True)
+    base, extensao = os.path.splitext(os.path.basename(caminho_arquivo))
+    destino = os.path.join(pasta_destino, f"{base}{extensao}")
+    if os.path.exists(destino):
+        destino = os.path.join(pasta_destino, f"{base}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extensao}")
+    try:
+        shutil.move(caminho_arquivo, destino)
+    except OSError as e:
+        logging.error(f"Modo monitor: não foi possível mover '{caminho_arquivo}' para '{pasta_destino}': {e}")
+
+
+def _concluir_arquivo_monitor(futuro, caminho_arquivo, pasta_tabela):
+    try:
+        resultado_geracao = futuro.result()
+    except (Exception, SystemExit) as e:  # gerar_scripts_oracle encerra com exit(1) em caso de erro
+        logging.error(f"Modo monitor: falha ao processar '{caminho_arquivo}': {e!r}")
+        print(f"Modo monitor: FALHA em '{os.path.basename(caminho_arquivo)}' (movido para '{SUBPASTA_COM_ERRO}').")
+        _mover_arquivo_monitor(caminho_arquivo, SUBPASTA_COM_ERRO)
+        return False
+    logging.info(f"Modo monitor: '{caminho_arquivo}' processado em '{pasta_tabela}' "
+                 f"(tabela {resultado_geracao['nome_tabela']}).")
+    print(f"Modo monitor: '{os.path.basename(caminho_arquivo)}' -> {pasta_tabela}")
+    _mover_arquivo_monitor(caminho_arquivo, SUBPASTA_PROCESSADOS)
+    return True
 
 
-# --- Execução Principal do Script Python ---
-if __name__ == "__main__":
-    gerar_scripts_oracle(CAMINHO_PLANILHA, TIPO_ARQUIVO)
+def monitorar_pasta(pasta_entrada, pasta_saida=None, intervalo_s=None, tamanho_fila=None, max_varreduras=None):
+    # Um arquivo só é enviado ao pool quando tamanho e data de modificação não mudam entre duas varreduras
+    # (evita ler planilhas ainda sendo copiadas). max_varreduras=None vigia até Ctrl+C.
+    pasta_entrada = os.path.abspath(pasta_entrada)
+    pasta_saida = os.path.abspath(pasta_saida or PASTA_SAIDA_MONITORADA)
+    intervalo_s = MONITOR_INTERVALO_S if intervalo_s is None else intervalo_s
+    tamanho_fila = tamanho_fila or MONITOR_TAMANHO_FILA
+    pasta_vpn_monitor = f"{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(pasta_saida)}"
+    os.makedirs(pasta_saida, exist_ok=True)
+    logging.info(f"Modo monitor: vigiando '{pasta_entrada}' a cada {intervalo_s}s, saída em '{pasta_saida}'.")
+    print(f"Modo monitor: vigiando '{pasta_entrada}' (Ctrl+C para encerrar).")
+
+    assinaturas = {}
+    em_andamento = {}  # futuro -> (caminho do arquivo, pasta de saída da tabela)
+    totais = {'processados': 0, 'falhas': 0}
+    varreduras = 0
+    with ProcessPoolExecutor(max_workers=LOTE_MAX_PROCESSOS) as executor:
+        try:
+            while max_varreduras is None or varreduras < max_varreduras:
+                varreduras += 1
+                for futuro in [f for f in em_andamento if f.done()]:
+                    caminho_arquivo, pasta_tabela = em_andamento.pop(futuro)
+                    totais['processados' if _concluir_arquivo_monitor(futuro, caminho_arquivo, pasta_tabela)
+                           else 'falhas'] += 1
 
-    # Caminho da pasta local na VPN onde os arquivos residem.
-    PASTA_LOCAL_VPN_PARA_EXECUCAO = r'\\tsclient\C\Users\jeffe\OneDrive\Arquivos e Pastas antigas\Documentos\Hapvida - SublimeText\PROJETOS PYTHON'
+                caminhos_em_andamento = {caminho for caminho, _ in em_andamento.values()}
+                caminhos_atuais = listar_arquivos_lote(pasta_entrada)
+                for caminho_arquivo in caminhos_atuais:
+                    if caminho_arquivo in caminhos_em_andamento:
+                        continue
+                    try:
+                        info = os.stat(caminho_arquivo)
+                    except OSError:
+                        continue  # Removido/renomeado entre a listagem e o stat
+                    assinatura = (info.st_size, info.st_mtime)
+                    if assinaturas.get(caminho_arquivo) != assinatura:
+                        assinaturas[caminho_arquivo] = assinatura  # Novo ou ainda sendo copiado
+                        continue
+                    if len(em_andamento) >= tamanho_fila:
+                        break  # Fila cheia: o arquivo fica na pasta até a próxima varredura
+                    nome_tabela = gerar_nome_tabela(caminho_arquivo)
+                    nome_pasta = _pasta_saida_monitor(pasta_saida, nome_tabela)
+                    pasta_tabela = os.path.join(pasta_saida, nome_pasta)
+                    os.makedirs(pasta_tabela)
+                    futuro = executor.submit(_processar_arquivo_lote, caminho_arquivo,
+                                             tipo_arquivo_por_extensao(caminho_arquivo), nome_tabela,
+                                             pasta_tabela, f"{pasta_vpn_monitor}\\{nome_pasta}")
+                    em_andamento[futuro] = (caminho_arquivo, pasta_tabela)
+                    assinaturas.pop(caminho_arquivo, None)
+                    logging.info(f"Modo monitor: '{caminho_arquivo}' enviado para processamento ({nome_tabela}).")
+                # Esquece arquivos que saíram da pasta sem serem processados
+                for caminho_arquivo in set(assinaturas) - set(caminhos_atuais):
+                    del assinaturas[caminho_arquivo]
+                if max_varreduras is None or varreduras < max_varreduras:
+                    time.sleep(intervalo_s)
+        except KeyboardInterrupt:
+            print(f"Modo monitor: encerrando; aguardando {len(em_andamento)} arquivo(s) em processamento...")
+        finally:
+            for futuro, (caminho_arquivo, pasta_tabela) in em_andamento.items():
+                totais['processados' if _concluir_arquivo_monitor(futuro, caminho_arquivo, pasta_tabela)
+                       else 'falhas'] += 1
 
+    logging.info(f"Modo monitor encerrado: {totais['processados']} arquivos processados, {totais['falhas']} com falha.")
+    print(f"Modo monitor encerrado: {totais['processados']} arquivos processados, {totais['falhas']} com falha.")
+    return totais
+
+
+# --- Scripts de execução na VPN (PowerShell + Batch) ---
+def gerar_conteudo_powershell_sqlldr(nome_tabela_objeto):
     # CONTEÚDO DO POWERSHELL SCRIPT (PARA CARGA DE DADOS COM SQL LOADER)
     # Este script será chamado pelo Batch
-    powershell_script_content = f"""
+    return f"""
 $ErrorActionPreference = 'Stop'
 
 # Caminhos dos arquivos (usando variáveis passadas do Batch)
-$csvPath = "{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(ARQUIVO_DADOS_PLANO)}"
+$csvPath = "{caminho_dados_na_vpn(ARQUIVO_DADOS_PLANO)}"
 $ctlPath = "{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(ARQUIVO_SQLLDR_CTL)}"
 $parPath = "{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\{os.path.basename(ARQUIVO_SQLLDR_PAR)}"
 $logPath = "{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\sqlldr.log"
@@ -361,213 +4012,110 @@ $dscPath = "{PASTA_LOCAL_VPN_PARA_EXECUCAO}\\sqlldr.dsc"
 $usuario = $env:DB_USER_SQL
 $senha = $env:DB_PASS_SQL
 $dsn = $env:DB_DSN_SQL
-$tabela = "{gerar_nome_tabela(CAMINHO_PLANILHA)}" # Obtem o nome da tabela do Python
+$tabela = "{nome_tabela_objeto}" # Obtem o nome da tabela do Python
 
 # Configurações de ambiente Oracle (do Python)
 $oracleHome = "{ORACLE_HOME_PATH}"
 $nlsLang = "{NLS_LANG_VALUE}"
-
-Write-Host "📥 Lendo o cabeçalho do CSV: $csvPath" -ForegroundColor Cyan
-try {{
-    $headers = Get-Content -Path $csvPath -Encoding UTF8 | Select-Object -First 1
-    if (-not $headers) {{
-        Write-Host "❌ Nao foi possivel ler o cabecalho do CSV." -ForegroundColor Red
+{gerar_bloco_powershell_preparar_pacote() if PACOTE_TRANSFERENCIA else ''}
+foreach ($arquivo in @($csvPath, $ctlPath, $parPath)) {{
+    if (-not (Test-Path $arquivo)) {{
+        Write-Host "❌ Arquivo nao encontrado: $arquivo" -ForegroundColor Red
         exit 1
     }}
-    # As colunas do CSV já devem ter os nomes do Oracle devido ao rename no Python
-    $colunas = $headers -split "{CSV_DELIMITADOR_SAIDA}"
-    # Remove aspas se existirem em nomes de coluna no CSV
-    $colunasCsv = $colunas | ForEach-Object {{ $_.Trim([char]34) }}
-
-}} catch {{
-    Write-Host "❌ Erro ao acessar o CSV: $_" -ForegroundColor Red
-    exit 1
 }}
 
-Write-Host "🔌 Conectando ao banco para obter as colunas da tabela: $tabela..." -ForegroundColor Cyan
-$tempSql = "$($env:LOCAL_EXEC_PATH)\\temp_describe.sql"
-$tempResult = "$($env:LOCAL_EXEC_PATH)\\temp_columns.txt"
-$query = @"
-SET HEADING OFF
-SET FEEDBACK OFF
-SET PAGESIZE 0
-SET TRIMSPOOL ON
-SET LINESIZE 1000
-SELECT column_name FROM all_tab_columns
-WHERE table_name = UPPER('{0}') AND owner = UPPER('{1}');
-EXIT
-"@ -f $tabela, $usuario
-
-$query | Set-Content -Encoding ASCII $tempSql
+# O .ctl e o .par ja vem prontos do Python (colunas e tipos conhecidos), sem consulta previa ao banco
 $env:ORACLE_HOME = $oracleHome
 $env:PATH = "$oracleHome\\BIN;$env:PATH" # Correção na variável PATH
 $env:NLS_LANG = $nlsLang
-& sqlplus -S "$usuario/$senha@$dsn" "@$tempSql" > $tempResult 2>&1
-
-
-# Lê colunas reais da tabela
-$colunasBanco = (Get-Content "$tempResult") | Where-Object {{ $_.trim() -ne '' }} | ForEach-Object {{ $_.Trim() }}
-
-if ($colunasBanco.Count -eq 0) {{
-    Write-Host "`n❌ Falha ao obter colunas da tabela no banco. Verifique usuario, senha, DSN e nome da tabela." -ForegroundColor Red
-    exit 1
-}}
-
-Write-Host "`n✅ Colunas encontradas na tabela Oracle:" -ForegroundColor Green
-$colunasBanco | ForEach-Object {{ Write-Host " - $_" }}
-
-# Filtra colunas do CSV que realmente existem no banco
-$colunasValidas = @()
-foreach ($coluna in $colunasCsv) {{ # $colunasCsv já é a lista de nomes do CSV
-    $colName = $coluna.Trim()
-    if ($colunasBanco -contains $colName) {{
-        $colunasValidas += $colName
-    }} else {{
-        Write-Host "⚠️  Ignorando coluna do CSV '$colName' nao encontrada na tabela '$tabela'." -ForegroundColor Yellow
-    }}
-}}
-
-if ($colunasValidas.Count -eq 0) {{
-    Write-Host "`n❌ Nenhuma coluna valida encontrada para importar.`" -ForegroundColor Red
-    exit 1
-}}
-
-# Gera o arquivo CTL
-Write-Host "`n📝 Gerando arquivo .ctl..." -ForegroundColor Cyan
-$ctlContent = @"
-LOAD DATA
-INFILE '$csvPath'
-BADFILE '$badPath'
-DISCARDFILE '$dscPath'
-APPEND
-INTO TABLE $tabela
-FIELDS TERMINATED BY '{CSV_DELIMITADOR_SAIDA}' OPTIONALLY ENCLOSED BY '"'
-TRAILING NULLCOLS
-(
-"@
-foreach ($col in $colunasValidas) {{
-    # Os nomes de coluna no CTL devem ser os NOMES DA TABELA ORACLE (que já estão em $col)
-    $ctlContent += "  `"$col`" CHAR," + "`n" # Usa aspas para nomes de coluna
-}}
-$ctlContent = $ctlContent.TrimEnd("`,", "`n") + "`n)"
-$ctlContent | Set-Content -Path $ctlPath -Encoding ASCII
-
-# Gera o PAR file
-Write-Host "📝 Gerando arquivo .par..." -ForegroundColor Cyan
-$parContent = @"
-userid=$usuario/$senha@$dsn
-control=$ctlPath
-log=$logPath
-bad=$badPath
-data=$csvPath
-"@
-$parContent | Set-Content -Path $parPath -Encoding ASCII
+# SQLLDR_EXE permite apontar para outro executável (ex.: um stub para testar sem banco)
+$sqlldrExe = if ($env:SQLLDR_EXE) {{ $env:SQLLDR_EXE }} else {{ "sqlldr" }}
 
 # Executa o SQL*Loader
-Write-Host "`n▶️  Executando SQL*Loader..." -ForegroundColor Cyan
+Write-Host "`n▶️  Executando SQL*Loader ({'direct path' if SQLLDR_DIRECT else 'conventional path'})..." -ForegroundColor Cyan
+$codigoSaida = 1
 try {{
-    $sqlldrResult = & sqlldr PARFILE="$parPath" 2>&1 | Out-String
+    $sqlldrResult = & $sqlldrExe "userid=$usuario/$senha@$dsn" "parfile=$parPath" 2>&1 | Out-String
+    $codigoSaida = $LASTEXITCODE
     Write-Host "`n===== RESULTADO DO SQLLDR =====" -ForegroundColor Yellow
     Write-Output $sqlldrResult
 
-    if ($LASTEXITCODE -eq 0) {{
+    if ($codigoSaida -eq 0) {{
         Write-Host "`n✅ Carga concluida com sucesso." -ForegroundColor Green
+    }} elseif ($codigoSaida -eq 2) {{
+        Write-Host "`n⚠️  Carga concluida com avisos (linhas rejeitadas). Verifique: $badPath" -ForegroundColor Yellow
     }} else {{
         Write-Host "`n❌ Erro ao executar SQL*Loader. Verifique o log: $logPath" -ForegroundColor Red
     }}
 }} catch {{
     Write-Host "`n❌ Erro inesperado durante a execucao do SQL*Loader: $($_.Exception.Message)" -ForegroundColor Red
 }}
+exit $codigoSaida
 """
-    with open(ARQUIVO_POWERSHELL_SQLLDR, 'w', encoding='utf-8') as f:
-        f.write(powershell_script_content)
-    print(f"Script PowerShell '{ARQUIVO_POWERSHELL_SQLLDR}' gerado com sucesso.")
-
-
-    # CONTEÚDO DO BATCH SCRIPT
-    batch_script_content = f"""@echo off
-rem Script gerado pelo Python para executar DDL e DML no Oracle via SQL*Plus e SQL Loader
-rem Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-SETLOCAL ENABLEDELAYEDEXPANSION
-
-rem ** Este Batch Script espera que os arquivos estejam na pasta: '{PASTA_LOCAL_VPN_PARA_EXECUCAO}' **
-rem ** O usuario deve navegar ate esta pasta e executar o .bat de la. **
-set "LOCAL_EXEC_PATH={PASTA_LOCAL_VPN_PARA_EXECUCAO}"
 
-set "CREDENTIALS_FILE={ARQUIVO_CREDENCIAS}"
-set "DROP_SCRIPT_NAME={ARQUIVO_DROP_TABLE_SQL}"
-set "CREATE_SCRIPT_NAME={ARQUIVO_CREATE_TABLE_SQL}"
-set "POWERSHELL_SQL_LOADER_SCRIPT_NAME={ARQUIVO_POWERSHELL_SQLLDR}"
-set "DATA_FILE_NAME={ARQUIVO_DADOS_PLANO}"
 
+def gerar_bloco_batch_carga_sqlldr():
+    return f"""rem ** INÍCIO DA CARGA DE DADOS COM SQL LOADER (VIA POWERSHELL) **
 echo.
 echo =========================================================================
 echo.
-echo Verificando arquivos necessarios na pasta: !LOCAL_EXEC_PATH!
-if not exist "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!" (
-    echo ERRO: Arquivo de credenciais '!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!' nao encontrado.
-    pause >NUL
-    exit /b 1
-)
-if not exist "!LOCAL_EXEC_PATH!\\!DROP_SCRIPT_NAME!" (
-    echo ERRO: Arquivo do script DROP '!LOCAL_EXEC_PATH!\\!DROP_SCRIPT_NAME!' nao encontrado.
-    pause >NUL
-    exit /b 1
-)
-if not exist "!LOCAL_EXEC_PATH!\\!CREATE_SCRIPT_NAME!" (
-    echo ERRO: Arquivo do script CREATE '!LOCAL_EXEC_PATH!\\!CREATE_SCRIPT_NAME!' nao encontrado.
-    pause >NUL
-    exit /b 1
-)
-if not exist "!LOCAL_EXEC_PATH!\\!DATA_FILE_NAME!" (
-    echo ERRO: Arquivo de dados CSV '!LOCAL_EXEC_PATH!\\!DATA_FILE_NAME!' nao encontrado.
-    pause >NUL
-    exit /b 1
-)
-if not exist "!LOCAL_EXEC_PATH!\\!POWERSHELL_SQL_LOADER_SCRIPT_NAME!" (
-    echo ERRO: Script PowerShell do SQL Loader '!LOCAL_EXEC_PATH!\\!POWERSHELL_SQL_LOADER_SCRIPT_NAME!' nao encontrado.
-    pause >NUL
-    exit /b 1
-)
-echo Arquivos necessarios para esta fase encontrados.
-echo.
+echo Executando a carga de dados via SQL Loader (via PowerShell)...
 
-rem Nao usar pushd/popd. A referencia sera sempre pelo caminho completo.
+rem Definir variaveis de ambiente para o PowerShell
+set "DB_USER_SQL=!DB_USER!"
+set "DB_PASS_SQL=!DB_PASS!"
+set "DB_DSN_SQL=!DB_DSN!"
+rem Executar o script PowerShell para SQL Loader
+powershell.exe -ExecutionPolicy Bypass -File "!LOCAL_EXEC_PATH!\\!POWERSHELL_SQL_LOADER_SCRIPT_NAME!" ^
+    -DB_USER_SQL "!DB_USER!" -DB_PASS_SQL "!DB_PASS!" -DB_DSN_SQL "!DB_DSN!"
+set "LOAD_RC=!ERRORLEVEL!"
 
-:GET_CREDENTIALS
-if exist "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!" (
-    for /f "tokens=1-3 delims=," %%a in ('type "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!"') do (
-        set "LAST_USER=%%a"
-        set "LAST_PASS=%%b"
-        set "LAST_DSN=%%c"
-    )
-    echo Ultimo ambiente utilizado: !LAST_USER!@!LAST_DSN!
-    set /p USE_LAST_ENV="Deseja continuar no mesmo ambiente? (S/N): "
-    if /i "!USE_LAST_ENV!"=="S" (
-        set DB_USER=!LAST_USER!
-        set DB_PASS=!LAST_PASS!
-        set DB_DSN=!LAST_DSN!
-    ) else (
-        goto PROMPT_NEW_CREDENTIALS
-    )
+rem O SQL Loader eh executado DENTRO do PowerShell, entao o ERRORLEVEL do PowerShell eh o que importa.
+rem O script PowerShell já faz o tratamento de erro e sai com um exit code.
+if !ERRORLEVEL! NEQ 0 (
+    echo.
+    echo ERRO CRITICO: A carga de dados via SQL Loader falhou.
+    echo Verifique a saida do PowerShell acima e o log do SQL Loader.
+    echo.
 ) else (
-    :PROMPT_NEW_CREDENTIALS
     echo.
-    echo Por favor, insira os dados de conexao com o banco de dados:
-    set /p DB_USER="Usuario: "
-    set /p DB_PASS="Senha: "
-    set /p DB_DSN="DSN (Ex: hapvdese): "
-    rem Grava credenciais, usando aspas para proteger contra caracteres especiais na senha.
-    echo "!DB_USER!,!DB_PASS!,!DB_DSN!" > "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!"
-    echo Credenciais salvas em !CREDENTIALS_FILE!.
+    echo CARGA DE DADOS VIA SQL LOADER EXECUTADA COM SUCESSO (via PowerShell).
+    echo.
 )
+"""
 
-echo.
-echo Conectando como !DB_USER!@!DB_DSN!
-echo.
 
-rem ** PASSO 1.0: Tentativa de Conexao para Teste **
+def gerar_bloco_batch_retomar_carga():
+    # Checkpoint presente = carga anterior interrompida depois do CREATE: a tabela fica e a carga continua
+    return f"""if exist "!LOCAL_EXEC_PATH!\\{ARQUIVO_CHECKPOINT_CARGA}" (
+    echo =========================================================================
+    echo.
+    echo Carga anterior interrompida encontrada: {ARQUIVO_CHECKPOINT_CARGA}
+    echo DROP/CREATE ignorados; a carga recomeca do primeiro segmento nao carregado.
+    echo.
+    goto INICIO_CARGA
+)
+
+"""
+
+
+def arquivo_dados_verificado_batch():
+    # Arquivo de dados cuja presença o .bat confere antes de conectar
+    if MODO_CARGA == 'tabela_externa':
+        return ARQUIVO_DADOS_PLANO
+    if PACOTE_TRANSFERENCIA:
+        return ARQUIVO_MANIFESTO_PACOTE
+    if CARGA_RETOMAVEL:
+        return nome_arquivo_segmento(ARQUIVO_DADOS_PLANO, 1)
+    if SQLLDR_PARTICOES > 1:
+        return nome_arquivo_particao(ARQUIVO_DADOS_PLANO, 1)
+    return ARQUIVO_DADOS_PLANO
+
+
+def gerar_bloco_batch_fases_separadas(resultado_geracao):
+    # Um sqlplus por etapa: teste de conexão, DROP, CREATE, carga, MERGE e pós-carga
+    return f"""rem ** PASSO 1.0: Tentativa de Conexao para Teste **
 echo Tentando conectar ao banco de dados...
 sqlplus -L -S !DB_USER!/!DB_PASS!@!DB_DSN! "select user from dual; exit;"
 
@@ -585,7 +4133,7 @@ if !ERRORLEVEL! NEQ 0 (
     echo.
 )
 
-echo =========================================================================
+{gerar_bloco_batch_retomar_carga() if resultado_geracao.get('manifesto_segmentos') else ''}echo =========================================================================
 echo.
 echo Executando o script DROP TABLE: !LOCAL_EXEC_PATH!\!DROP_SCRIPT_NAME!
 sqlplus -L -S !DB_USER!/!DB_PASS!@!DB_DSN! "@!LOCAL_EXEC_PATH!\\!DROP_SCRIPT_NAME!"
@@ -644,33 +4192,175 @@ echo.
 echo FASE DE TESTE: CREATE TABLE CONCLUIDA.
 echo.
 
-rem ** INÍCIO DA CARGA DE DADOS COM SQL LOADER (VIA POWERSHELL) **
-echo.
+{':INICIO_CARGA' + chr(10) if resultado_geracao.get('manifesto_segmentos') else ''}{gerar_bloco_batch_carga_tabela_externa() if MODO_CARGA == 'tabela_externa' else gerar_bloco_batch_carga_sqlldr()}{gerar_bloco_batch_merge_delta() if resultado_geracao['carga_delta'] else ''}{gerar_bloco_batch_confirmar_manifesto_delta(resultado_geracao)}{gerar_bloco_batch_pos_carga() if POS_CARGA else ''}"""
+
+
+def gerar_bloco_batch_aviso_validacao(resultado_geracao):
+    # Mostra o resultado da validação pré-carga antes de conectar (as linhas removidas não chegam ao banco)
+    linhas_removidas = resultado_geracao.get('linhas_removidas') or 0
+    linhas_rejeitadas = resultado_geracao.get('linhas_rejeitadas') or 0
+    if linhas_removidas:
+        return f"""echo.
 echo =========================================================================
-echo.
-echo Executando a carga de dados via SQL Loader (via PowerShell)...
+echo AVISO: a validacao pre-carga REMOVEU {linhas_removidas} linhas do arquivo de carga.
+echo Essas linhas NAO serao carregadas. Veja: !LOCAL_EXEC_PATH!\\{ARQUIVO_REJEITADAS_PRE_CARGA}
+echo =========================================================================
+set /p CONFIRMA_REMOVIDAS="Continuar a carga sem essas {linhas_removidas} linhas? (S/N): "
+if /i not "!CONFIRMA_REMOVIDAS!"=="S" (
+    echo Carga cancelada.
+    pause >NUL
+    exit /b 1
+)
+"""
+    if linhas_rejeitadas:
+        return f"""echo.
+echo AVISO: a validacao pre-carga preve {linhas_rejeitadas} linhas rejeitadas pelo banco (irao para o arquivo .bad).
+echo Veja: !LOCAL_EXEC_PATH!\\{ARQUIVO_REJEITADAS_PRE_CARGA}
+"""
+    return ""
 
-rem Definir variaveis de ambiente para o PowerShell
+
+def gerar_bloco_batch_verificar_script_mestre():
+    return f"""if not exist "!LOCAL_EXEC_PATH!\\{ARQUIVO_SCRIPT_MESTRE_SQL}" (
+    echo ERRO: Script mestre '!LOCAL_EXEC_PATH!\\{ARQUIVO_SCRIPT_MESTRE_SQL}' nao encontrado.
+    pause >NUL
+    exit /b 1
+)
+"""
+
+
+def gerar_bloco_batch_script_mestre(resultado_geracao):
+    # Uma única sessão do SQL*Plus (um login pela VPN) executa todas as etapas do script mestre
+    retomavel = bool(resultado_geracao.get('manifesto_segmentos'))
+    copia_csv = ""
+    if MODO_CARGA == 'tabela_externa' and TABELA_EXTERNA_PASTA_SERVIDOR:
+        copia_csv = f"""echo Copiando o CSV para a pasta do DIRECTORY {TABELA_EXTERNA_DIRETORIO}...
+copy /Y "!LOCAL_EXEC_PATH!\\!DATA_FILE_NAME!" "{TABELA_EXTERNA_PASTA_SERVIDOR}\\!DATA_FILE_NAME!" >NUL
+if !ERRORLEVEL! NEQ 0 (
+    echo ERRO CRITICO: nao foi possivel copiar o CSV para '{TABELA_EXTERNA_PASTA_SERVIDOR}'.
+    pause >NUL
+    exit /b 1
+)
+"""
+    mensagens_erro = "\n".join(f"    if !MESTRE_RC! EQU {codigo} echo ERRO CRITICO na fase: {descricao}."
+                                for codigo, descricao in FASES_SCRIPT_MESTRE.values())
+    # Carga retomada: a tabela já existe, então só a carga e o pós-carga rodam (fora do script mestre)
+    retomada = ""
+    if retomavel:
+        retomada = f"""goto FIM_SESSAO_UNICA
+
+:INICIO_CARGA
+{gerar_bloco_batch_carga_sqlldr()}{gerar_bloco_batch_merge_delta() if resultado_geracao['carga_delta'] else ''}{gerar_bloco_batch_confirmar_manifesto_delta(resultado_geracao)}{gerar_bloco_batch_pos_carga() if POS_CARGA else ''}
+:FIM_SESSAO_UNICA
+"""
+    return f"""{gerar_bloco_batch_retomar_carga() if retomavel else ''}rem ** SESSAO UNICA: conexao, DROP, CREATE, GRANT, carga e pos-carga num unico SQL*Plus **
+echo =========================================================================
+echo.
+echo Executando o script mestre: !LOCAL_EXEC_PATH!\\{ARQUIVO_SCRIPT_MESTRE_SQL}
+rem O SQL Loader roda por HOST dentro da sessao e le as credenciais destas variaveis
 set "DB_USER_SQL=!DB_USER!"
 set "DB_PASS_SQL=!DB_PASS!"
 set "DB_DSN_SQL=!DB_DSN!"
-rem Executar o script PowerShell para SQL Loader
-powershell.exe -ExecutionPolicy Bypass -File "!LOCAL_EXEC_PATH!\\!POWERSHELL_SQL_LOADER_SCRIPT_NAME!" `
-    -DB_USER_SQL "!DB_USER!" -DB_PASS_SQL "!DB_PASS!" -DB_DSN_SQL "!DB_DSN!"
+{copia_csv}sqlplus -L -S !DB_USER!/!DB_PASS!@!DB_DSN! "@!LOCAL_EXEC_PATH!\\{ARQUIVO_SCRIPT_MESTRE_SQL}"
+set "MESTRE_RC=!ERRORLEVEL!"
+echo.
+if !MESTRE_RC! EQU 0 (
+    echo SCRIPT MESTRE EXECUTADO COM SUCESSO: tabela criada, dados carregados e conferidos.
+) else if !MESTRE_RC! EQU 2 (
+    echo SCRIPT MESTRE CONCLUIDO COM AVISOS: o SQL Loader rejeitou linhas. Verifique o arquivo .bad.
+) else (
+{mensagens_erro}
+    echo Codigo de saida do SQL*Plus: !MESTRE_RC!. Verifique as mensagens acima.
+)
+{gerar_bloco_batch_confirmar_manifesto_delta(resultado_geracao, "if !MESTRE_RC! EQU 0")}{retomada}"""
 
-rem O SQL Loader eh executado DENTRO do PowerShell, entao o ERRORLEVEL do PowerShell eh o que importa.
-rem O script PowerShell já faz o tratamento de erro e sai com um exit code.
-if !ERRORLEVEL! NEQ 0 (
-    echo.
-    echo ERRO CRITICO: A carga de dados via SQL Loader falhou.
-    echo Verifique a saida do PowerShell acima e o log do SQL Loader.
-    echo.
+
+def gerar_conteudo_batch_execucao(resultado_geracao):
+    # CONTEÚDO DO BATCH SCRIPT
+    return f"""@echo off
+rem Script gerado pelo Python para executar DDL e DML no Oracle via SQL*Plus e SQL Loader
+rem Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+SETLOCAL ENABLEDELAYEDEXPANSION
+
+rem ** Este Batch Script espera que os arquivos estejam na pasta: '{PASTA_LOCAL_VPN_PARA_EXECUCAO}' **
+rem ** O usuario deve navegar ate esta pasta e executar o .bat de la. **
+set "LOCAL_EXEC_PATH={PASTA_LOCAL_VPN_PARA_EXECUCAO}"
+
+set "CREDENTIALS_FILE={ARQUIVO_CREDENCIAS}"
+set "DROP_SCRIPT_NAME={ARQUIVO_DROP_TABLE_SQL}"
+set "CREATE_SCRIPT_NAME={ARQUIVO_CREATE_TABLE_SQL}"
+set "POWERSHELL_SQL_LOADER_SCRIPT_NAME={ARQUIVO_POWERSHELL_SQLLDR}"
+set "LOAD_SCRIPT_NAME={ARQUIVO_TABELA_EXTERNA_SQL if MODO_CARGA == 'tabela_externa' else ARQUIVO_POWERSHELL_SQLLDR}"
+set "DATA_FILE_NAME={arquivo_dados_verificado_batch()}"
+
+echo.
+echo =========================================================================
+echo.
+echo Verificando arquivos necessarios na pasta: !LOCAL_EXEC_PATH!
+if not exist "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!" (
+    echo ERRO: Arquivo de credenciais '!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!' nao encontrado.
+    pause >NUL
+    exit /b 1
+)
+if not exist "!LOCAL_EXEC_PATH!\\!DROP_SCRIPT_NAME!" (
+    echo ERRO: Arquivo do script DROP '!LOCAL_EXEC_PATH!\\!DROP_SCRIPT_NAME!' nao encontrado.
+    pause >NUL
+    exit /b 1
+)
+if not exist "!LOCAL_EXEC_PATH!\\!CREATE_SCRIPT_NAME!" (
+    echo ERRO: Arquivo do script CREATE '!LOCAL_EXEC_PATH!\\!CREATE_SCRIPT_NAME!' nao encontrado.
+    pause >NUL
+    exit /b 1
+)
+if not exist "!LOCAL_EXEC_PATH!\\!DATA_FILE_NAME!" (
+    echo ERRO: Arquivo de dados CSV '!LOCAL_EXEC_PATH!\\!DATA_FILE_NAME!' nao encontrado.
+    pause >NUL
+    exit /b 1
+)
+if not exist "!LOCAL_EXEC_PATH!\\!LOAD_SCRIPT_NAME!" (
+    echo ERRO: Script de carga '!LOCAL_EXEC_PATH!\\!LOAD_SCRIPT_NAME!' nao encontrado.
+    pause >NUL
+    exit /b 1
+)
+{gerar_bloco_batch_verificar_script_mestre() if SESSAO_UNICA else ''}echo Arquivos necessarios para esta fase encontrados.
+echo.
+{gerar_bloco_batch_aviso_validacao(resultado_geracao)}
+rem Nao usar pushd/popd. A referencia sera sempre pelo caminho completo.
+
+:GET_CREDENTIALS
+if exist "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!" (
+    for /f "tokens=1-3 delims=," %%a in ('type "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!"') do (
+        set "LAST_USER=%%a"
+        set "LAST_PASS=%%b"
+        set "LAST_DSN=%%c"
+    )
+    echo Ultimo ambiente utilizado: !LAST_USER!@!LAST_DSN!
+    set /p USE_LAST_ENV="Deseja continuar no mesmo ambiente? (S/N): "
+    if /i "!USE_LAST_ENV!"=="S" (
+        set DB_USER=!LAST_USER!
+        set DB_PASS=!LAST_PASS!
+        set DB_DSN=!LAST_DSN!
+    ) else (
+        goto PROMPT_NEW_CREDENTIALS
+    )
 ) else (
+    :PROMPT_NEW_CREDENTIALS
     echo.
-    echo CARGA DE DADOS VIA SQL LOADER EXECUTADA COM SUCESSO (via PowerShell).
-    echo.
+    echo Por favor, insira os dados de conexao com o banco de dados:
+    set /p DB_USER="Usuario: "
+    set /p DB_PASS="Senha: "
+    set /p DB_DSN="DSN (Ex: hapvdese): "
+    rem Grava credenciais, usando aspas para proteger contra caracteres especiais na senha.
+    echo "!DB_USER!,!DB_PASS!,!DB_DSN!" > "!LOCAL_EXEC_PATH!\\!CREDENTIALS_FILE!"
+    echo Credenciais salvas em !CREDENTIALS_FILE!.
 )
 
+echo.
+echo Conectando como !DB_USER!@!DB_DSN!
+echo.
+
+{gerar_bloco_batch_script_mestre(resultado_geracao) if SESSAO_UNICA else gerar_bloco_batch_fases_separadas(resultado_geracao)}
 echo.
 echo =========================================================================
 echo.
@@ -679,8 +4369,57 @@ echo.
 pause
 exit
 """
+
+
+def gerar_scripts_execucao(resultado_geracao):
+    with medir_etapa('scripts_execucao'):
+        _gravar_scripts_execucao(resultado_geracao)
+
+
+def _gravar_scripts_execucao(resultado_geracao):
+    if MODO_CARGA != 'tabela_externa':  # Na tabela externa o .bat chama o SQL*Plus direto
+        if resultado_geracao.get('manifesto_segmentos'):
+            powershell_script_content = gerar_conteudo_powershell_sqlldr_retomavel(
+                resultado_geracao['manifesto_segmentos'])
+        elif SQLLDR_PARTICOES > 1:
+            powershell_script_content = gerar_conteudo_powershell_sqlldr_paralelo(SQLLDR_PARTICOES)
+        else:
+            powershell_script_content = gerar_conteudo_powershell_sqlldr(resultado_geracao['nome_tabela'])
+        with open(ARQUIVO_POWERSHELL_SQLLDR, 'w', encoding='utf-8') as f:
+            f.write(powershell_script_content)
+        print(f"Script PowerShell '{ARQUIVO_POWERSHELL_SQLLDR}' gerado com sucesso.")
+        if PACOTE_TRANSFERENCIA:
+            with open(ARQUIVO_POWERSHELL_PACOTE, 'w', encoding='utf-8') as f:
+                f.write(gerar_conteudo_powershell_pacote())
+
     with open(ARQUIVO_BATCH_EXEC, 'w', encoding='utf-8') as f:
-        f.write(batch_script_content)
+        f.write(gerar_conteudo_batch_execucao(resultado_geracao))
+
+
+# --- Execução Principal do Script Python ---
+def executar_principal():
+    if PASTA_ENTRADA_MONITORADA:
+        # Modo monitor: processo contínuo, cada arquivo que chega vira uma pasta de saída própria
+        monitorar_pasta(PASTA_ENTRADA_MONITORADA)
+        return
+
+    if ORIGEM_LOTE:
+        # Modo lote: cada arquivo em um processo, com pasta de saída e tabela próprias
+        processar_lote(ORIGEM_LOTE)
+        return
+
+    if PROCESSAR_TODAS_ABAS and TIPO_ARQUIVO.lower() == 'excel':
+        # Modo multiabas: uma tabela por aba, DDL combinado e cargas paralelas pelo orquestrador
+        processar_abas(CAMINHO_PLANILHA)
+        return
+
+    if MODO_CARGA == 'python':
+        # Carga direta pelo Python: dispensa .bat/.ps1/sqlldr e o CSV intermediário
+        carregar_com_python(CAMINHO_PLANILHA, TIPO_ARQUIVO)
+        return
+
+    resultado_geracao = gerar_scripts_oracle(CAMINHO_PLANILHA, TIPO_ARQUIVO)
+    gerar_scripts_execucao(resultado_geracao)
 
     print("\n" + "=" * 80)
     print("Script Batch gerado para execução na VPN:")
@@ -689,3 +4428,12 @@ exit
     print(rf"3. No ambiente da VPN, abra o Prompt de Comando (ou PowerShell), **NAVEGUE ATÉ A PASTA '{PASTA_LOCAL_VPN_PARA_EXECUCAO}'** e execute:")
     print(rf"  ** \"{ARQUIVO_BATCH_EXEC}\" **")
     print("\n" + "=" * 80)
+
+
+if __name__ == "__main__":
+    with perfilar_execucao():
+        try:
+            executar_principal()
+        finally:
+            if ARQUIVO_METRICAS:
+                gravar_metricas_execucao()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gerar_scripts_oracle as gso  # noqa: E402
+
+
+@pytest.fixture
+def pasta_trabalho(tmp_path, monkeypatch):
+    # O script grava tudo na pasta atual e lê a configuração de variáveis globais: cada teste usa uma pasta
+    # temporária e as alterações de configuração são desfeitas ao final
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gso, 'PASTA_LOCAL_VPN_PARA_EXECUCAO', r'\\tsclient\C\carga')
+    monkeypatch.setattr(gso, 'CACHE_LEITURA', False)
+    monkeypatch.setattr(gso, 'PACOTE_TRANSFERENCIA', False)
+    return tmp_path
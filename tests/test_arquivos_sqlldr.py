@@ -0,0 +1,109 @@
+import pytest
+
+import gerar_scripts_oracle as gso
+
+COLUNAS_DDL = [
+    '"NM_BENEFICIARIO" VARCHAR2(60 CHAR)',
+    '"CD_PLANO" VARCHAR2(255)',
+    '"NU_CODIGO" NUMBER(9)',
+    '"FL_TITULAR" NUMBER(1)',
+    '"NU_VALOR" NUMBER(12,2)',
+    '"NU_FATOR" NUMBER',
+    '"DT_NASCIMENTO" DATE',
+    '"DS_OBSERVACAO" CLOB',
+]
+CAMPOS_ESPERADOS = """(
+  "NM_BENEFICIARIO" CHAR(60),
+  "CD_PLANO" CHAR(255),
+  "NU_CODIGO" INTEGER EXTERNAL,
+  "FL_TITULAR" INTEGER EXTERNAL,
+  "NU_VALOR" DECIMAL EXTERNAL,
+  "NU_FATOR" DECIMAL EXTERNAL,
+  "DT_NASCIMENTO" DATE "YYYY-MM-DD HH24:MI:SS",
+  "DS_OBSERVACAO" CHAR(1000000)
+)
+"""
+
+
+@pytest.fixture
+def sqlldr(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'SQLLDR_MASCARA_DATA', 'YYYY-MM-DD HH24:MI:SS')
+    monkeypatch.setattr(gso, 'SQLLDR_TAMANHO_MAX_CLOB', 1000000)
+    monkeypatch.setattr(gso, 'SQLLDR_ROWS', 100000)
+    monkeypatch.setattr(gso, 'SQLLDR_READSIZE', 20971520)
+    monkeypatch.setattr(gso, 'SQLLDR_BINDSIZE', 20971520)
+    monkeypatch.setattr(gso, 'SQLLDR_MULTITHREADING', True)
+
+
+def _corpo_ctl(ctl):
+    # Sem as linhas de comentário (a data de geração muda a cada execução)
+    return "\n".join(linha for linha in ctl.splitlines() if not linha.startswith('--')) + "\n"
+
+
+def test_ctl_direct_unrecoverable(sqlldr, monkeypatch):
+    monkeypatch.setattr(gso, 'SQLLDR_DIRECT', True)
+    monkeypatch.setattr(gso, 'SQLLDR_UNRECOVERABLE', True)
+
+    ctl = gso.gerar_conteudo_ctl_sqlldr('"TT_OPE_PLANOS"', COLUNAS_DDL)
+
+    assert _corpo_ctl(ctl) == f"""UNRECOVERABLE LOAD DATA
+CHARACTERSET AL32UTF8
+LENGTH SEMANTICS CHAR
+APPEND
+INTO TABLE "TT_OPE_PLANOS"
+FIELDS TERMINATED BY '{gso.CSV_DELIMITADOR_SAIDA}' OPTIONALLY ENCLOSED BY '"'
+TRAILING NULLCOLS
+{CAMPOS_ESPERADOS}"""
+
+
+@pytest.mark.parametrize('direct, unrecoverable', [(False, True), (True, False)])
+def test_ctl_sem_unrecoverable(sqlldr, monkeypatch, direct, unrecoverable):
+    # UNRECOVERABLE só é aceito em direct path
+    monkeypatch.setattr(gso, 'SQLLDR_DIRECT', direct)
+    monkeypatch.setattr(gso, 'SQLLDR_UNRECOVERABLE', unrecoverable)
+
+    ctl = _corpo_ctl(gso.gerar_conteudo_ctl_sqlldr('"TT_OPE_PLANOS"', COLUNAS_DDL))
+
+    assert ctl.startswith("LOAD DATA\n")
+    assert 'UNRECOVERABLE' not in ctl
+    assert ctl.endswith(CAMPOS_ESPERADOS)
+
+
+def test_par_direct(sqlldr, monkeypatch):
+    monkeypatch.setattr(gso, 'SQLLDR_DIRECT', True)
+
+    par = gso.gerar_conteudo_par_sqlldr()
+
+    pasta = gso.PASTA_LOCAL_VPN_PARA_EXECUCAO
+    assert par.splitlines() == [
+        f'control="{pasta}\\{gso.ARQUIVO_SQLLDR_CTL}"',
+        f'data="{pasta}\\{gso.ARQUIVO_DADOS_PLANO}"',
+        f'log="{pasta}\\sqlldr.log"',
+        f'bad="{pasta}\\sqlldr.bad"',
+        f'discard="{pasta}\\sqlldr.dsc"',
+        'skip=1',
+        'direct=true',
+        'rows=100000',
+        'readsize=20971520',
+        'multithreading=true',
+    ]
+    assert 'userid' not in par  # As credenciais vão na linha de comando, não no arquivo
+
+
+def test_par_conventional(sqlldr, monkeypatch):
+    monkeypatch.setattr(gso, 'SQLLDR_DIRECT', False)
+
+    linhas = gso.gerar_conteudo_par_sqlldr().splitlines()
+
+    assert 'direct=false' in linhas
+    assert 'bindsize=20971520' in linhas
+    assert not any(linha.startswith(('multithreading=', 'parallel=')) for linha in linhas)
+
+
+def test_gerar_arquivos_sqlldr_grava_ctl_e_par(sqlldr):
+    gso.gerar_arquivos_sqlldr('"TT_OPE_PLANOS"', COLUNAS_DDL)
+
+    with open(gso.ARQUIVO_SQLLDR_CTL, encoding='utf-8') as f:
+        assert _corpo_ctl(f.read()).endswith(CAMPOS_ESPERADOS)
+    with open(gso.ARQUIVO_SQLLDR_PAR, encoding='utf-8') as f:
+        assert f.read() == gso.gerar_conteudo_par_sqlldr()
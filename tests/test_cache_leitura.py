@@ -0,0 +1,26 @@
+import openpyxl
+import pytest
+
+import gerar_scripts_oracle as gso
+
+
+@pytest.fixture
+def planilha(pasta_trabalho):
+    wb = openpyxl.Workbook()
+    wb.active.append(['Código', 'Nome'])
+    wb.active.append([1, 'José'])
+    wb.save('planos.xlsx')
+    return 'planos.xlsx'
+
+
+@pytest.mark.skipif(gso.CalamineWorkbook is None, reason="python-calamine não instalado")
+def test_chave_do_cache_muda_com_o_motor_de_leitura(planilha, monkeypatch):
+    monkeypatch.setattr(gso, 'MOTOR_LEITURA_EXCEL', 'openpyxl')
+    chave_openpyxl = gso.chave_cache_leitura(planilha, 'excel')
+    monkeypatch.setattr(gso, 'MOTOR_LEITURA_EXCEL', 'calamine')
+    chave_calamine = gso.chave_cache_leitura(planilha, 'excel')
+    monkeypatch.setattr(gso, 'MOTOR_LEITURA_EXCEL', 'auto')  # 'auto' escolhe o calamine quando instalado
+    chave_auto = gso.chave_cache_leitura(planilha, 'excel')
+
+    assert chave_openpyxl != chave_calamine
+    assert chave_auto == chave_calamine
@@ -0,0 +1,122 @@
+import csv
+import os
+
+import gerar_scripts_oracle as gso
+
+COLUNAS_DDL = ['"CD_PLANO" NUMBER(6)', '"NM_PLANO" VARCHAR2(40 CHAR)']
+
+
+def _gravar_arquivo_dados(linhas):
+    with open(gso.ARQUIVO_DADOS_PLANO, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=gso.CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(['CD_PLANO', 'NM_PLANO'])
+        writer.writerows(linhas)
+
+
+def _ler_arquivo_delta():
+    with open(gso.ARQUIVO_DADOS_PLANO, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=gso.CSV_DELIMITADOR_SAIDA)
+        next(reader)
+        return sorted(reader)
+
+
+def _confirmar_carga(id_manifesto):
+    # Papel do .bat/orquestrador depois da carga e do MERGE sem erro
+    with open(gso.ARQUIVO_CONFIRMACAO_DELTA, 'w', encoding='utf-8') as f:
+        f.write(f"{id_manifesto} \n")
+
+
+def _preparar(linhas, monkeypatch):
+    monkeypatch.setattr(gso, 'CHAVES_DELTA', ['CD_PLANO'])
+    _gravar_arquivo_dados(linhas)
+    delta = gso.preparar_carga_delta('TT_OPE_PLANOS', COLUNAS_DDL)
+    return delta['carga_delta'], delta['id_manifesto']
+
+
+def test_sem_confirmacao_o_manifesto_anterior_e_mantido(pasta_trabalho, monkeypatch):
+    originais = [['1', 'BASICO'], ['2', 'MASTER'], ['3', 'PREMIUM']]
+    carga_delta, id_manifesto = _preparar(originais, monkeypatch)
+    assert carga_delta is False  # Primeira execução: recriação completa
+    # Recriação não confirmada: a próxima geração continua sem base e recria de novo
+    carga_delta, id_manifesto = _preparar(originais, monkeypatch)
+    assert carga_delta is False
+    _confirmar_carga(id_manifesto)
+
+    alteradas = [['1', 'BASICO'], ['2', 'MASTER PLUS'], ['4', 'NOVO']]
+    carga_delta, _ = _preparar(alteradas, monkeypatch)
+    esperado = [['3', '', 'D'], ['2', 'MASTER PLUS', 'U'], ['4', 'NOVO', 'U']]
+    assert carga_delta is True
+    assert _ler_arquivo_delta() == sorted(esperado)
+
+    # O .bat falhou (ou a geração foi refeita, ex.: para trocar o USUARIO_GRANT): o delta não se perde
+    carga_delta, id_manifesto = _preparar(alteradas, monkeypatch)
+    assert carga_delta is True
+    assert _ler_arquivo_delta() == sorted(esperado)
+
+    _confirmar_carga(id_manifesto)
+    carga_delta, _ = _preparar(alteradas, monkeypatch)
+    assert carga_delta is True
+    assert _ler_arquivo_delta() == []
+    assert not os.path.exists(gso.ARQUIVO_CONFIRMACAO_DELTA)
+
+
+def test_confirmacao_de_outra_geracao_e_ignorada(pasta_trabalho, monkeypatch):
+    _, id_manifesto = _preparar([['1', 'BASICO']], monkeypatch)
+    _confirmar_carga(id_manifesto)
+    _preparar([['1', 'BASICO']], monkeypatch)
+    _confirmar_carga('20000101000000000000')  # Confirmação antiga, de uma carga que não é a pendente
+
+    carga_delta, _ = _preparar([['1', 'BASICO'], ['2', 'MASTER']], monkeypatch)
+
+    assert carga_delta is True
+    assert _ler_arquivo_delta() == [['2', 'MASTER', 'U']]
+
+
+def test_bat_confirma_o_manifesto_so_apos_carga_e_merge(pasta_trabalho):
+    resultado = {'carga_delta': True, 'id_manifesto_delta': '20240601120000000000'}
+
+    bloco = gso.gerar_bloco_batch_confirmar_manifesto_delta(resultado)
+
+    assert 'if !LOAD_RC! EQU 0 if !DELTA_RC! EQU 0 set "CONFIRMAR_DELTA=1"' in bloco
+    assert f'{gso.ARQUIVO_CONFIRMACAO_DELTA}" echo 20240601120000000000' in bloco
+    assert gso.gerar_bloco_batch_confirmar_manifesto_delta({'carga_delta': False, 'id_manifesto_delta': None}) == ""
+
+
+def _gerar_delta(linhas_anteriores, linhas_atuais, monkeypatch, chaves_delta):
+    monkeypatch.setattr(gso, 'CHAVES_DELTA', chaves_delta)
+    _gravar_arquivo_dados(linhas_anteriores)
+    _confirmar_carga(gso.preparar_carga_delta('TT_OPE_PLANOS', COLUNAS_DDL)['id_manifesto'])
+    _gravar_arquivo_dados(linhas_atuais)
+    return gso.preparar_carga_delta('TT_OPE_PLANOS', COLUNAS_DDL)
+
+
+def test_merge_usa_igualdade_simples_nas_chaves(pasta_trabalho, monkeypatch):
+    delta = _gerar_delta([['1', 'BASICO']], [['1', 'MASTER'], ['2', 'NOVO']], monkeypatch, ['CD_PLANO'])
+
+    merge = gso.gerar_conteudo_merge_delta('TT_OPE_PLANOS', COLUNAS_DDL, delta['chaves_anulaveis'])
+
+    assert delta['chaves_anulaveis'] == []
+    assert 'DECODE' not in merge and 'IS NULL' not in merge
+    assert 'ON (t."CD_PLANO" = s."CD_PLANO")' in merge
+    assert """WHERE s."FL_OPERACAO_DELTA" = 'D'
+      AND t."CD_PLANO" = s."CD_PLANO"
+);""" in merge
+    assert 'WHEN MATCHED THEN UPDATE SET\n        t."NM_PLANO" = s."NM_PLANO"' in merge
+
+
+def test_merge_compara_null_so_nas_chaves_com_vazios(pasta_trabalho, monkeypatch):
+    # Sem CHAVES_DELTA a linha inteira é a chave; só NM_PLANO tem vazio no delta
+    delta = _gerar_delta([['1', 'BASICO']], [['1', 'BASICO'], ['2', '']], monkeypatch, [])
+
+    merge = gso.gerar_conteudo_merge_delta('TT_OPE_PLANOS', COLUNAS_DDL, delta['chaves_anulaveis'])
+
+    assert delta['chaves_anulaveis'] == ['NM_PLANO']
+    assert ('ON (t."CD_PLANO" = s."CD_PLANO"\n      AND '
+            '(t."NM_PLANO" = s."NM_PLANO" OR (t."NM_PLANO" IS NULL AND s."NM_PLANO" IS NULL)))') in merge
+    assert 'WHEN MATCHED' not in merge  # Nenhuma coluna fora da chave para atualizar
+
+
+def test_chave_delta_com_vazio_recria_a_tabela(pasta_trabalho, monkeypatch):
+    delta = _gerar_delta([['1', 'BASICO']], [['1', 'BASICO'], ['', 'SEM CODIGO']], monkeypatch, ['CD_PLANO'])
+
+    assert delta['carga_delta'] is False
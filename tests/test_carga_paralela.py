@@ -0,0 +1,81 @@
+import csv
+import os
+
+import pytest
+
+import gerar_scripts_oracle as gso
+
+CABECALHO = ['NM_BENEFICIARIO', 'CD_PLANO', 'DS_OBSERVACAO']
+COLUNAS_DDL = ['"NM_BENEFICIARIO" VARCHAR2(40 CHAR)', '"CD_PLANO" NUMBER(6)', '"DS_OBSERVACAO" VARCHAR2(60 CHAR)']
+
+
+def _gravar_arquivo_dados(caminho, total_linhas):
+    # Acentos e uma quebra de linha entre aspas: o particionamento não pode separar linhas pelo '\n'
+    linhas = [[f'JOSÉ CONCEIÇÃO {i}', str(i), 'LINHA 1\nLINHA 2' if i % 7 == 0 else ''] for i in range(total_linhas)]
+    with open(caminho, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=gso.CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(CABECALHO)
+        writer.writerows(linhas)
+    return linhas
+
+
+def _ler_arquivo_dados(caminho):
+    with open(caminho, 'rb') as f:
+        assert f.read(3) == b'\xef\xbb\xbf'  # BOM UTF-8 preservado em cada partição
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=gso.CSV_DELIMITADOR_SAIDA)
+        return next(reader), list(reader)
+
+
+@pytest.mark.parametrize('total_linhas, num_particoes', [(103, 4), (8, 4), (3, 4), (0, 2)])
+def test_particionar_arquivo_dados_equilibrado_e_sem_perdas(pasta_trabalho, total_linhas, num_particoes):
+    linhas = _gravar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, total_linhas)
+
+    arquivos_particoes = gso.particionar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, num_particoes)
+
+    assert arquivos_particoes == [gso.nome_arquivo_particao(gso.ARQUIVO_DADOS_PLANO, i)
+                                  for i in range(1, num_particoes + 1)]
+    assert not os.path.exists(gso.ARQUIVO_DADOS_PLANO)
+    linhas_particoes = []
+    for arquivo in arquivos_particoes:
+        cabecalho, linhas_arquivo = _ler_arquivo_dados(arquivo)
+        assert cabecalho == CABECALHO
+        linhas_particoes.append(linhas_arquivo)
+    tamanhos = [len(linhas_arquivo) for linhas_arquivo in linhas_particoes]
+    assert max(tamanhos) - min(tamanhos) <= 1
+    # Blocos contíguos: a concatenação das partições reproduz o arquivo original, cada linha uma única vez
+    assert [linha for linhas_arquivo in linhas_particoes for linha in linhas_arquivo] == linhas
+
+
+def test_ctl_e_par_apontam_para_a_propria_particao(pasta_trabalho):
+    _gravar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, 10)
+    arquivos_particoes = gso.particionar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, 3)
+
+    gso.gerar_arquivos_sqlldr('"TB_TESTE"', COLUNAS_DDL, arquivos_particoes)
+
+    for indice, arquivo_dados in enumerate(arquivos_particoes, start=1):
+        with open(gso.nome_arquivo_particao(gso.ARQUIVO_SQLLDR_CTL, indice), encoding='utf-8') as f:
+            ctl = f.read()
+        with open(gso.nome_arquivo_particao(gso.ARQUIVO_SQLLDR_PAR, indice), encoding='utf-8') as f:
+            par = f.read().splitlines()
+        assert f"INFILE '{gso.caminho_na_pasta_vpn(arquivo_dados)}'" in ctl
+        assert ctl.count('INFILE') == 1
+        assert 'INTO TABLE "TB_TESTE"' in ctl
+        controle = gso.caminho_na_pasta_vpn(gso.nome_arquivo_particao(gso.ARQUIVO_SQLLDR_CTL, indice))
+        assert f'control="{controle}"' in par
+        assert not any(linha.startswith('data=') for linha in par)  # Na carga paralela o INFILE está no .ctl
+        assert f'log="{gso.caminho_na_pasta_vpn(gso.nome_arquivo_particao("sqlldr", indice) + ".log")}"' in par
+        assert 'skip=1' in par
+        if gso.SQLLDR_DIRECT:
+            assert 'parallel=true' in par
+
+
+def test_powershell_paralelo_executa_um_sqlldr_por_particao(pasta_trabalho):
+    conteudo = gso.gerar_conteudo_powershell_sqlldr_paralelo(3)
+
+    for indice in range(1, 4):
+        par = gso.caminho_na_pasta_vpn(gso.nome_arquivo_particao(gso.ARQUIVO_SQLLDR_PAR, indice))
+        assert conteudo.count(f'Par = "{par}"') == 1
+    assert gso.nome_arquivo_particao(gso.ARQUIVO_SQLLDR_PAR, 4) not in conteudo
+    # Hook do stub: o executável do sqlldr pode ser trocado sem banco
+    assert '$env:SQLLDR_EXE' in conteudo
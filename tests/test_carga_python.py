@@ -0,0 +1,76 @@
+import sqlite3
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+import gerar_scripts_oracle as gso
+
+CABECALHO = ['Nome do Beneficiário', 'Código do Plano', 'Valor da Mensalidade', 'Data de Nascimento', 'Observação']
+
+
+@pytest.fixture
+def conexao_sqlite():
+    conexao = sqlite3.connect(':memory:')
+    yield conexao
+    conexao.close()
+
+
+def _linhas_tabela(conexao, caminho_arquivo):
+    nome_tabela = gso.gerar_nome_tabela(caminho_arquivo)
+    cursor = conexao.execute(f'SELECT * FROM "{nome_tabela}" ORDER BY rowid')
+    return [descricao[0] for descricao in cursor.description], cursor.fetchall()
+
+
+@pytest.mark.parametrize('memoria_compacta', [True, False])
+def test_carga_sqlite_excel_tipos_e_nulos(pasta_trabalho, conexao_sqlite, monkeypatch, memoria_compacta):
+    monkeypatch.setattr(gso, 'CARGA_PYTHON_MEMORIA_COMPACTA', memoria_compacta)
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(CABECALHO)
+    ws.append(['José Araújo', 101, 150.75, datetime(1980, 5, 17), 'Pendência'])
+    ws.append(['Maria', 102, None, datetime(1990, 1, 2, 8, 30), None])
+    ws.append(['Ângela', None, 99.5, None, 'ok'])
+    wb.save('beneficiarios.xlsx')
+
+    # Lote menor que o arquivo: exercita o executemany/commit intermediário
+    total_linhas = gso.carregar_com_python('beneficiarios.xlsx', 'excel', 'sqlite', tamanho_lote=2,
+                                           conexao=conexao_sqlite)
+
+    assert total_linhas == 3
+    colunas, linhas = _linhas_tabela(conexao_sqlite, 'beneficiarios.xlsx')
+    assert colunas == ['NM_NOME_DO_BENEFICIARIO', 'NU_CODIGO_DO_PLANO', 'NU_VALOR_DA_MENSALIDADE',
+                       'DT_DATA_DE_NASCIMENTO', 'NM_OBSERVACAO']
+    assert linhas == [
+        ('JOSE ARAUJO', 101, 150.75, '1980-05-17 00:00:00', 'PENDENCIA'),
+        ('MARIA', 102, None, '1990-01-02 08:30:00', None),
+        ('ANGELA', None, 99.5, None, 'OK'),
+    ]
+    tipos = conexao_sqlite.execute(
+        f'SELECT typeof("NU_CODIGO_DO_PLANO"), typeof("NU_VALOR_DA_MENSALIDADE") '
+        f'FROM "{gso.gerar_nome_tabela("beneficiarios.xlsx")}" ORDER BY rowid').fetchall()
+    assert tipos == [('integer', 'real'), ('integer', 'null'), ('null', 'real')]
+
+
+def test_carga_sqlite_csv_vazios_viram_null(pasta_trabalho, conexao_sqlite):
+    with open('beneficiarios.csv', 'w', encoding='utf-8') as f:
+        f.write(';'.join(CABECALHO) + '\n')
+        f.write('José Araújo;101;;;Pendência\n')
+        f.write('Maria;;;;\n')
+
+    total_linhas = gso.carregar_com_python('beneficiarios.csv', 'csv', 'sqlite', conexao=conexao_sqlite)
+
+    assert total_linhas == 2
+    colunas, linhas = _linhas_tabela(conexao_sqlite, 'beneficiarios.csv')
+    assert colunas[:2] == ['NM_NOME_DO_BENEFICIARIO', 'NU_CODIGO_DO_PLANO']
+    assert linhas == [('JOSE ARAUJO', 101, None, None, 'PENDENCIA'), ('MARIA', None, None, None, None)]
+
+
+def test_carga_sqlite_recria_a_tabela(pasta_trabalho, conexao_sqlite):
+    with open('beneficiarios.csv', 'w', encoding='utf-8') as f:
+        f.write('Nome;Código\nJosé;1\n')
+
+    gso.carregar_com_python('beneficiarios.csv', 'csv', 'sqlite', conexao=conexao_sqlite)
+    gso.carregar_com_python('beneficiarios.csv', 'csv', 'sqlite', conexao=conexao_sqlite)
+
+    assert _linhas_tabela(conexao_sqlite, 'beneficiarios.csv')[1] == [('JOSE', 1)]
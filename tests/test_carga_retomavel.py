@@ -0,0 +1,146 @@
+import csv
+import json
+import os
+import re
+
+import pytest
+
+import gerar_scripts_oracle as gso
+
+CABECALHO = ['NM_NOME', 'NU_VALOR']
+COLUNAS_DDL = ['"NM_NOME" VARCHAR2(40 CHAR)', '"NU_VALOR" NUMBER(6)']
+
+
+def _gravar_arquivo_dados(total_linhas):
+    # Uma quebra de linha entre aspas: os segmentos não podem separar linhas pelo '\n'
+    linhas = [[f'JOSÉ {i}' if i % 5 else f'LINHA 1\nLINHA {i}', str(i)] for i in range(total_linhas)]
+    with open(gso.ARQUIVO_DADOS_PLANO, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=gso.CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(CABECALHO)
+        writer.writerows(linhas)
+    return linhas
+
+
+def _ler_arquivo_dados(caminho):
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f, delimiter=gso.CSV_DELIMITADOR_SAIDA)
+        return next(reader), list(reader)
+
+
+@pytest.mark.parametrize('total_linhas, linhas_por_segmento, tamanhos', [
+    (25, 10, [10, 10, 5]), (20, 10, [10, 10]), (3, 10, [3]), (0, 10, [0])])
+def test_segmentos_e_manifesto(pasta_trabalho, total_linhas, linhas_por_segmento, tamanhos):
+    linhas = _gravar_arquivo_dados(total_linhas)
+    with open(gso.ARQUIVO_CHECKPOINT_CARGA, 'w', encoding='utf-8') as f:
+        f.write('geracao=anterior\n1;10;2024-01-01T00:00:00\n')
+
+    manifesto = gso.segmentar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, linhas_por_segmento, 'TB_TESTE')
+
+    assert not os.path.exists(gso.ARQUIVO_DADOS_PLANO)
+    assert not os.path.exists(gso.ARQUIVO_CHECKPOINT_CARGA)  # Checkpoint de outros dados não serve mais
+    assert manifesto['tabela'] == 'TB_TESTE'
+    assert re.fullmatch('[0-9a-f]{16}', manifesto['geracao'])
+    assert manifesto['segmentos'] == [
+        {'numero': numero, 'arquivo': gso.nome_arquivo_segmento(gso.ARQUIVO_DADOS_PLANO, numero), 'linhas': linhas}
+        for numero, linhas in enumerate(tamanhos, start=1)]
+    with open(gso.ARQUIVO_MANIFESTO_SEGMENTOS, encoding='utf-8') as f:
+        assert json.load(f) == manifesto
+    linhas_segmentos = []
+    for segmento in manifesto['segmentos']:
+        cabecalho, linhas_arquivo = _ler_arquivo_dados(segmento['arquivo'])
+        assert cabecalho == CABECALHO
+        assert len(linhas_arquivo) == segmento['linhas']
+        linhas_segmentos += linhas_arquivo
+    assert linhas_segmentos == linhas
+
+
+def test_par_de_cada_segmento_grava_o_segmento_de_uma_vez(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'SQLLDR_DIRECT', True)
+    monkeypatch.setattr(gso, 'SQLLDR_ROWS', 10)
+    _gravar_arquivo_dados(25)
+    manifesto = gso.segmentar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, 20, 'TB_TESTE')
+
+    gso.gerar_arquivos_sqlldr_segmentos('"TB_TESTE"', COLUNAS_DDL, manifesto['segmentos'])
+
+    with open(gso.ARQUIVO_SQLLDR_CTL, encoding='utf-8') as f:
+        assert 'INFILE' not in f.read()
+    for segmento, rows in zip(manifesto['segmentos'], ['rows=20', 'rows=10']):
+        with open(gso.nome_arquivo_segmento(gso.ARQUIVO_SQLLDR_PAR, segmento['numero']), encoding='utf-8') as f:
+            par = f.read().splitlines()
+        assert f'data="{gso.caminho_dados_na_vpn(segmento["arquivo"])}"' in par
+        assert rows in par
+        # O log do .par é o mesmo que o PowerShell lê para anotar o checkpoint
+        log = gso.caminho_na_pasta_vpn(gso.nome_arquivo_segmento('sqlldr.log', segmento['numero']))
+        assert f'log="{log}"' in par
+
+
+def _powershell(linhas_por_segmento=10, total_linhas=25):
+    _gravar_arquivo_dados(total_linhas)
+    manifesto = gso.segmentar_arquivo_dados(gso.ARQUIVO_DADOS_PLANO, linhas_por_segmento, 'TB_TESTE')
+    return manifesto, gso.gerar_conteudo_powershell_sqlldr_retomavel(manifesto)
+
+
+def test_powershell_lista_os_segmentos_da_geracao(pasta_trabalho):
+    manifesto, conteudo = _powershell()
+
+    assert f'$geracao = "{manifesto["geracao"]}"' in conteudo
+    for segmento in manifesto['segmentos']:
+        par = gso.caminho_na_pasta_vpn(gso.nome_arquivo_segmento(gso.ARQUIVO_SQLLDR_PAR, segmento['numero']))
+        assert conteudo.count(f'@{{ Numero = {segmento["numero"]}; Linhas = {segmento["linhas"]}; '
+                              f'Par = "{par}"; ') == 1
+    assert 'Numero = 4;' not in conteudo
+    assert f'$checkpointPath = "{gso.caminho_na_pasta_vpn(gso.ARQUIVO_CHECKPOINT_CARGA)}"' in conteudo
+    # Hook do stub: o executável do sqlldr pode ser trocado sem banco
+    assert '& $sqlldrExe "userid=$usuario/$senha@$dsn" "parfile=$($s.Par)"' in conteudo
+    assert '$env:SQLLDR_EXE' in conteudo
+
+
+def test_powershell_pula_os_segmentos_do_checkpoint_e_anota_so_os_confirmados(pasta_trabalho):
+    _, conteudo = _powershell()
+
+    # Checkpoint de outra geração encerra sem carregar; sem checkpoint, ele nasce com a geração atual
+    assert 'if ($conteudoCheckpoint[0] -ne "geracao=$geracao") {' in conteudo
+    assert 'Set-Content -Path $checkpointPath -Value "geracao=$geracao"' in conteudo
+    assert '$concluidos[[int]$campos[0]] = [long]$campos[1]' in conteudo
+    laco = conteudo[conteudo.index('foreach ($s in $segmentos) {'):]
+    pular = laco.index('if ($concluidos.ContainsKey($s.Numero)) {\n        continue\n    }')
+    chamada = laco.index('& $sqlldrExe')
+    falha = laco.index('exit $codigo')
+    anotar = laco.index('Add-Content -Path $checkpointPath -Value "$($s.Numero);$carregadas;$(Get-Date -Format s)"')
+    # Pula antes de chamar o sqlldr; um segmento com falha sai antes de ser anotado
+    assert pular < chamada < falha < anotar
+    assert '(($codigo -ne 0 -and $codigo -ne 2) -or $null -eq $carregadas)' in laco
+    # Carga completa: o checkpoint é apagado e a próxima execução recria a tabela
+    fim = laco[anotar:]
+    assert fim.index('Remove-Item $checkpointPath') < fim.index('exit $codigoSaida')
+
+
+def test_powershell_le_as_linhas_carregadas_do_log_do_sqlldr(pasta_trabalho):
+    _, conteudo = _powershell()
+    padrao = re.search(r"Select-String -Path \$s\.Log -Pattern '([^']+)'", conteudo).group(1)
+
+    # O mesmo padrão em Python (a sintaxe usada vale também no .NET) contra linhas reais do log
+    assert re.search(padrao, '  25 Rows successfully loaded.').group(1) == '25'
+    assert re.search(padrao, '  1 Row successfully loaded.').group(1) == '1'
+    assert re.search(padrao, '  25 Linhas carregadas com sucesso.').group(1) == '25'
+    assert re.search(padrao, '  0 Rows not loaded due to data errors.') is None
+
+
+def test_gerar_scripts_retomavel_completo(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'CARGA_RETOMAVEL', True)
+    monkeypatch.setattr(gso, 'SEGMENTO_LINHAS', 40)
+    with open('dados.csv', 'w', encoding='utf-8') as f:
+        f.write('nome;valor\n')
+        f.writelines(f'nome {i};{i}\n' for i in range(100))
+
+    resultado = gso.gerar_scripts_oracle('dados.csv', 'csv')
+    gso.gerar_scripts_execucao(resultado)
+
+    assert [s['linhas'] for s in resultado['manifesto_segmentos']['segmentos']] == [40, 40, 20]
+    with open(gso.ARQUIVO_POWERSHELL_SQLLDR, encoding='utf-8') as f:
+        assert f'$geracao = "{resultado["manifesto_segmentos"]["geracao"]}"' in f.read()
+    with open(gso.ARQUIVO_BATCH_EXEC, encoding='utf-8') as f:
+        batch = f.read()
+    # Checkpoint presente: o .bat pula DROP/CREATE e vai direto para a carga
+    assert f'if exist "!LOCAL_EXEC_PATH!\\{gso.ARQUIVO_CHECKPOINT_CARGA}" (' in batch
+    assert batch.index(gso.ARQUIVO_CHECKPOINT_CARGA) < batch.index(':INICIO_CARGA')
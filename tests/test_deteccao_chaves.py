@@ -0,0 +1,62 @@
+import csv
+import os
+
+import pytest
+
+import gerar_scripts_oracle as gso
+
+
+def _gravar_arquivo_dados(cabecalho, linhas):
+    with open(gso.ARQUIVO_DADOS_PLANO, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=gso.CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(cabecalho)
+        writer.writerows(linhas)
+
+
+@pytest.fixture
+def deteccao(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'CHAVES_MIN_LINHAS', 100)
+    monkeypatch.setattr(gso, 'CHUNKSIZE', 500)  # Vários blocos: repetições e textos longos entre blocos
+
+
+def test_coluna_prefixada_com_varchar2_padrao_e_chave(deteccao):
+    # Colunas que já chegam como CD_/NU_ mantêm o VARCHAR2(255) do montar_ddl_colunas
+    columns_ddl_list, _ = gso.montar_ddl_colunas(['CD_PLANO', 'NM_PLANO'], [gso.novas_estatisticas_coluna()] * 2)
+    assert columns_ddl_list == ['"CD_PLANO" VARCHAR2(255)', '"NM_PLANO" VARCHAR2(255)']
+    _gravar_arquivo_dados(['CD_PLANO', 'NM_PLANO'], [[f'P{i:05d}', f'PLANO {i % 10}'] for i in range(2000)])
+
+    relatorio = gso.detectar_chaves_candidatas(columns_ddl_list)
+
+    assert relatorio['chave_primaria'] == ['CD_PLANO']
+    assert relatorio['colunas'][0]['elegivel_chave'] is True
+
+
+def test_texto_longo_nao_forma_chave_mesmo_depois_do_primeiro_bloco(deteccao):
+    limite = gso.CHAVES_TAMANHO_MAX_TEXTO
+    linhas = []
+    for i in range(2000):
+        # DS_CURTA só passa do limite no último bloco; DS_LONGA desde o primeiro
+        curta = f'{i:06d}' + ('X' * limite if i == 1999 else '')
+        linhas.append([str(i // 2), f'{i:06d}' + 'Y' * limite, curta])
+    _gravar_arquivo_dados(['NU_GRUPO', 'DS_LONGA', 'DS_CURTA'], linhas)
+    columns_ddl_list = ['"NU_GRUPO" NUMBER(4)', '"DS_LONGA" VARCHAR2(255)', '"DS_CURTA" VARCHAR2(255)']
+
+    relatorio = gso.detectar_chaves_candidatas(columns_ddl_list)
+
+    assert [c['elegivel_chave'] for c in relatorio['colunas']] == [True, False, False]
+    assert relatorio['chave_primaria'] is None
+    assert relatorio['chaves_compostas_unicas'] == []
+
+
+def test_pos_carga_cria_pk_da_coluna_prefixada(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'DETECCAO_CHAVES', True)
+    monkeypatch.setattr(gso, 'CHAVES_MIN_LINHAS', 100)
+    with open('planos.csv', 'w', encoding='utf-8') as f:
+        f.write('CD_PLANO;Nome do Plano\n')
+        f.writelines(f'P{i:05d};Plano {i % 10}\n' for i in range(1000))
+
+    resultado = gso.gerar_scripts_oracle('planos.csv', 'csv')
+
+    assert resultado['chaves']['chave_primaria'] == ['CD_PLANO']
+    with open(gso.ARQUIVO_POS_CARGA_SQL, encoding='utf-8') as f:
+        assert 'PRIMARY KEY ("CD_PLANO")' in f.read()
@@ -0,0 +1,53 @@
+import pytest
+
+import gerar_scripts_oracle as gso
+
+
+@pytest.fixture
+def amostra(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'AMOSTRA_INFERENCIA_LINHAS', 100)
+    monkeypatch.setattr(gso, 'CHUNKSIZE', 1000)  # A violação cai num bloco posterior ao da amostra
+    monkeypatch.setattr(gso, 'ARQUIVO_RELATORIO_INFERENCIA', None)
+
+
+def _ddl_nos_dois_modos(monkeypatch, caminho):
+    ddl = {}
+    for modo in ('completa', 'amostra'):
+        monkeypatch.setattr(gso, 'MODO_INFERENCIA', modo)
+        ddl[modo] = gso.processar_csv_em_blocos(caminho)
+    return ddl
+
+
+def _gravar_csv(caminho, cabecalho, linhas):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(cabecalho + '\n')
+        f.writelines(linha + '\n' for linha in linhas)
+
+
+def test_digito_depois_da_amostra_troca_o_prefixo_como_no_modo_completo(amostra, monkeypatch):
+    # "A1" cabe no VARCHAR2(3 CHAR) decidido pela amostra, mas ainda assim torna a coluna CD_
+    _gravar_csv('dados.csv', 'cod;nome', [f'AAA;nome{i % 7}' for i in range(5000)] + ['A1;nome'])
+
+    ddl = _ddl_nos_dois_modos(monkeypatch, 'dados.csv')
+
+    assert ddl['completa'][0] == '"CD_COD" VARCHAR2(3 CHAR)'
+    assert ddl['amostra'] == ddl['completa']
+
+
+def test_alargamento_depois_da_amostra_gera_o_mesmo_ddl(amostra, monkeypatch):
+    linhas = [f'{i % 50};ABC;2024-01-{i % 28 + 1:02d}' for i in range(5000)]
+    linhas.append('123456789012;ABCDEFGHIJ9;texto')  # Número maior, texto mais longo e data que vira texto
+    _gravar_csv('dados.csv', 'qtd;sigla;data', linhas)
+
+    ddl = _ddl_nos_dois_modos(monkeypatch, 'dados.csv')
+
+    assert ddl['amostra'] == ddl['completa']
+    assert ddl['amostra'][1].startswith('"CD_SIGLA"')
+
+
+def test_valores_sem_digito_depois_da_amostra_mantem_nm(amostra, monkeypatch):
+    _gravar_csv('dados.csv', 'cod', ['AAA'] * 5000 + ['BB', ''])
+
+    ddl = _ddl_nos_dois_modos(monkeypatch, 'dados.csv')
+
+    assert ddl['amostra'] == ddl['completa'] == ['"NM_COD" VARCHAR2(3 CHAR)']
@@ -0,0 +1,83 @@
+import csv
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+import gerar_scripts_oracle as gso
+
+CABECALHO = ['Nome', 'Código', 'Valor', 'Data', 'Observação', 'Quantidade']
+
+
+def _linhas(total_linhas):
+    # Os tipos mudam entre os blocos: inteiros que viram decimais, códigos com texto no fim, colunas vazias no início
+    linhas = []
+    for i in range(total_linhas):
+        linhas.append([
+            f'José Conceição {i}',
+            f'{i:05d}' if i < total_linhas - 3 else f'X{i}',
+            i if i < total_linhas // 2 else i + 0.25,
+            datetime(2024, 1, 1 + i % 28, i % 24, 30),
+            None if i < 10 else f'Observação; "{i}"',
+            None if i % 4 else i * 1000,
+        ])
+    return linhas
+
+
+@pytest.fixture
+def paralela(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'CHUNKSIZE', 7)  # Vários blocos, o último incompleto
+    monkeypatch.setattr(gso, 'LEITURA_PARALELA_MIN_COLUNAS', 2)
+    monkeypatch.setattr(gso, 'LEITURA_PARALELA_PROCESSOS', 2)
+    chamadas = []
+    original = gso.gravar_corpo_e_perfilar_por_colunas
+
+    def gravar_e_contar(*args, **kwargs):
+        chamadas.append(args[1])
+        return original(*args, **kwargs)
+    monkeypatch.setattr(gso, 'gravar_corpo_e_perfilar_por_colunas', gravar_e_contar)
+    return chamadas
+
+
+def _processar_nos_dois_caminhos(monkeypatch, processar):
+    saida = {}
+    for leitura_paralela in (False, True):
+        monkeypatch.setattr(gso, 'LEITURA_PARALELA_COLUNAS', leitura_paralela)
+        columns_ddl_list = processar()
+        with open(gso.ARQUIVO_DADOS_PLANO, 'rb') as f:
+            saida[leitura_paralela] = (columns_ddl_list, f.read())
+    return saida
+
+
+def test_csv_por_colunas_igual_ao_serial(paralela, monkeypatch):
+    with open('dados.csv', 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=gso.DELIMITADOR_ENTRADA_CSV)
+        writer.writerow(CABECALHO)
+        writer.writerows(['' if valor is None else valor.strftime('%d/%m/%Y %H:%M')
+                          if isinstance(valor, datetime) else valor for valor in linha] for linha in _linhas(50))
+
+    saida = _processar_nos_dois_caminhos(monkeypatch, lambda: gso.processar_csv_em_blocos('dados.csv'))
+
+    assert paralela == [len(CABECALHO)]  # Só a segunda leitura usou o pool
+    assert saida[True] == saida[False]
+    assert saida[True][0][1].startswith('"CD_CODIGO" VARCHAR2(')
+
+
+def test_excel_por_colunas_igual_ao_serial(paralela, monkeypatch):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(CABECALHO)
+    for linha in _linhas(50):
+        ws.append(linha)
+    ws.append([None] * len(CABECALHO))  # Linha vazia no fim
+    ws.append(['Última', None])  # Linha mais curta que o cabeçalho
+    wb.save('dados.xlsx')
+
+    saida = _processar_nos_dois_caminhos(monkeypatch, lambda: gso.processar_excel_streaming('dados.xlsx'))
+
+    assert paralela == [len(CABECALHO)]
+    assert saida[True] == saida[False]
+    columns_ddl_list, conteudo = saida[True]
+    assert columns_ddl_list[2].startswith('"NU_VALOR" NUMBER(')
+    assert columns_ddl_list[3] == '"DT_DATA" DATE'
+    assert conteudo.decode('utf-8-sig').count('\n') == 53  # Cabeçalho + 52 linhas
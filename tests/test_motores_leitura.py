@@ -0,0 +1,84 @@
+from datetime import date, datetime
+
+import openpyxl
+import pytest
+
+import gerar_scripts_oracle as gso
+
+requer_calamine = pytest.mark.skipif(gso.CalamineWorkbook is None, reason="python-calamine não instalado")
+
+CABECALHO = ['Nome do Beneficiário', 'Código do Plano', 'Valor', 'Data de Nascimento', 'Data/Hora Adesão',
+             'Observação', 'Titular']
+LINHAS = [
+    ['José Araújo', 101, 150.75, date(1980, 5, 17), datetime(2024, 1, 2, 8, 30, 15), 'Pendência', True],
+    ['Maria Conceição', 102.0, 3.0, datetime(1990, 1, 2), datetime(2024, 2, 29, 23, 59, 59), None, False],
+    ['Ângela', None, None, None, None, '', None],  # Vazios: None e texto vazio
+    [None, None, None, None, None, None, None],  # Linha inteiramente vazia no meio dos dados
+    ['Inês Sá', 123456789012, -0.5, date(2000, 12, 31), datetime(2023, 7, 1), 'São Luís; "aspas"', True],
+    ['Heitor', 7, 1e-05, None, None, 'fim', None],  # Última linha mais curta (colunas finais vazias)
+]
+
+
+@pytest.fixture
+def planilha(pasta_trabalho):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Beneficiários'
+    ws.append(CABECALHO)
+    for linha in LINHAS:
+        ws.append(linha)
+    for celula in ws['D'][1:]:
+        celula.number_format = 'DD/MM/YYYY'
+    wb.save('beneficiarios.xlsx')
+    return 'beneficiarios.xlsx'
+
+
+def _linhas_do_motor(caminho_arquivo, nome_motor):
+    linhas = gso.ler_linhas_excel(caminho_arquivo, 'Beneficiários', nome_motor)
+    nomes_colunas = gso.nomes_colunas_excel(next(linhas))
+    return nomes_colunas, list(gso.normalizar_linhas(linhas, len(nomes_colunas)))
+
+
+def test_openpyxl_le_a_planilha(planilha):
+    nomes_colunas, linhas = _linhas_do_motor(planilha, 'openpyxl')
+
+    assert len(nomes_colunas) == len(CABECALHO)
+    assert len(linhas) == len(LINHAS)
+    assert linhas[0][:4] == ['JOSE ARAUJO', 101, 150.75, datetime(1980, 5, 17)]
+
+
+@requer_calamine
+def test_calamine_e_openpyxl_produzem_linhas_identicas(planilha):
+    nomes_openpyxl, linhas_openpyxl = _linhas_do_motor(planilha, 'openpyxl')
+    nomes_calamine, linhas_calamine = _linhas_do_motor(planilha, 'calamine')
+
+    assert nomes_calamine == nomes_openpyxl
+    assert len(linhas_calamine) == len(linhas_openpyxl)
+    for numero_linha, (linha_calamine, linha_openpyxl) in enumerate(zip(linhas_calamine, linhas_openpyxl), start=2):
+        # Mesmos valores e mesmos tipos: o perfil das colunas (e portanto o DDL) depende do tipo
+        assert linha_calamine == linha_openpyxl, numero_linha
+        assert [type(valor) for valor in linha_calamine] == [type(valor) for valor in linha_openpyxl], numero_linha
+
+
+@requer_calamine
+def test_verificar_paridade_motores(planilha):
+    resultado = gso.verificar_paridade_motores(planilha)
+
+    assert resultado['motores'] == ['calamine', 'openpyxl']
+    assert resultado['linhas'] == len(LINHAS)
+    assert resultado['divergencias'] == []
+    assert resultado['identicos'] is True
+
+
+@requer_calamine
+def test_mesmo_ddl_com_os_dois_motores(planilha):
+    ddls = []
+    for nome_motor in ('openpyxl', 'calamine'):
+        nomes_colunas, linhas = _linhas_do_motor(planilha, nome_motor)
+        estatisticas = [gso.novas_estatisticas_coluna() for _ in nomes_colunas]
+        for linha in linhas:
+            for estatisticas_coluna, valor in zip(estatisticas, linha):
+                gso.atualizar_estatisticas_coluna(estatisticas_coluna, valor)
+        ddls.append(gso.montar_ddl_colunas(nomes_colunas, estatisticas)[0])
+
+    assert ddls[0] == ddls[1]
@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import json
+import os
+import random
+
+import pytest
+
+import gerar_scripts_oracle as gso
+
+
+@pytest.fixture
+def pacote(pasta_trabalho, monkeypatch):
+    # Blocos de ~16 KB: um arquivo pequeno já gera vários blocos (e um último bloco menor)
+    monkeypatch.setattr(gso, 'PACOTE_TAMANHO_BLOCO_MB', 1 / 64)
+    monkeypatch.setattr(gso, 'PACOTE_MAX_PARALELO', 2)
+    rng = random.Random(20240601)
+    conteudos = {
+        'temp_data_to_load_p01.csv': ''.join(f'JOSÉ CONCEIÇÃO {i};{rng.randint(0, 10 ** 9)};SÃO LUÍS\r\n'
+                                             for i in range(3000)).encode('utf-8'),
+        'temp_data_to_load_p02.csv': bytes(rng.getrandbits(8) for _ in range(40000)),  # Incompressível
+        'vazio.csv': b'',
+    }
+    for nome, dados in conteudos.items():
+        with open(nome, 'wb') as f:
+            f.write(dados)
+    os.makedirs('pacote')
+    manifesto = gso.gerar_pacote_transferencia(list(conteudos), 'pacote')
+    return conteudos, manifesto
+
+
+def test_pacote_ida_e_volta(pacote):
+    conteudos, manifesto = pacote
+
+    assert not any(os.path.exists(nome) for nome in conteudos)  # Só os blocos seguem para a VPN
+    with open(os.path.join('pacote', gso.ARQUIVO_MANIFESTO_PACOTE), encoding='utf-8') as f:
+        assert json.load(f) == manifesto
+    por_arquivo = {arquivo['arquivo']: arquivo for arquivo in manifesto['arquivos']}
+    assert len(por_arquivo['temp_data_to_load_p01.csv']['blocos']) > 1
+    for nome, dados in conteudos.items():
+        assert por_arquivo[nome]['bytes'] == len(dados)
+        assert por_arquivo[nome]['sha256'] == hashlib.sha256(dados).hexdigest()
+
+    restaurados = gso.restaurar_pacote_transferencia('pacote', 'restaurado')
+
+    assert sorted(os.path.basename(caminho) for caminho in restaurados) == sorted(conteudos)
+    for caminho in restaurados:
+        with open(caminho, 'rb') as f:
+            dados = f.read()
+        assert dados == conteudos[os.path.basename(caminho)]
+        assert hashlib.sha256(dados).hexdigest() == por_arquivo[os.path.basename(caminho)]['sha256']
+    assert sorted(os.listdir('restaurado')) == sorted(conteudos)  # Partes intermediárias removidas
+
+
+def _primeiro_bloco(manifesto):
+    return os.path.join('pacote', manifesto['arquivos'][0]['blocos'][0]['arquivo'])
+
+
+def test_bloco_com_conteudo_trocado_falha_no_manifesto(pacote):
+    _, manifesto = pacote
+    caminho_bloco = _primeiro_bloco(manifesto)
+    with gzip.open(caminho_bloco, 'rb') as f:
+        dados = bytearray(f.read())
+    dados[100] ^= 0xFF
+    with open(caminho_bloco, 'wb') as f:
+        f.write(gzip.compress(bytes(dados)))  # gzip válido, conteúdo diferente do manifesto
+
+    with pytest.raises(ValueError, match='hash divergente'):
+        gso.restaurar_pacote_transferencia('pacote', 'restaurado')
+
+
+@pytest.mark.parametrize('corromper', [
+    lambda dados: dados[:len(dados) // 2],  # Cópia interrompida
+    lambda dados: dados[:40] + bytes([dados[40] ^ 0xFF]) + dados[41:],  # Byte alterado no trecho comprimido
+])
+def test_bloco_corrompido_falha_no_manifesto(pacote, corromper):
+    _, manifesto = pacote
+    caminho_bloco = _primeiro_bloco(manifesto)
+    with open(caminho_bloco, 'rb') as f:
+        dados = f.read()
+    with open(caminho_bloco, 'wb') as f:
+        f.write(corromper(dados))
+
+    with pytest.raises(ValueError, match='hash divergente'):
+        gso.restaurar_pacote_transferencia('pacote', 'restaurado')
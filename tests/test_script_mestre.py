@@ -0,0 +1,89 @@
+import re
+
+import pytest
+
+import gerar_scripts_oracle as gso
+
+COLUNAS_DDL = ['"NU_ID" NUMBER(9)', '"NM_NOME" VARCHAR2(40 CHAR)']
+# Primeira linha de cada fase depois do seu WHENEVER SQLERROR
+INICIO_FASES = {
+    1: "SELECT 'Conectado como '",
+    11: "BEGIN\n    EXECUTE IMMEDIATE 'DROP TABLE",
+    12: 'CREATE TABLE "TB_DLT"',
+    13: 'DECLARE\n    v_colunas NUMBER;',
+    14: 'DELETE FROM "TB_PLANOS" t',
+    15: 'BEGIN\n    DBMS_STATS.GATHER_TABLE_STATS(',
+    16: 'DECLARE\n    v_linhas NUMBER;',
+}
+
+
+def _script_mestre(carga_delta=True):
+    return gso.gerar_conteudo_script_mestre('TB_DLT', COLUNAS_DDL, 'TB_PLANOS', COLUNAS_DDL,
+                                            carga_delta=carga_delta)
+
+
+def _fases(conteudo):
+    # [(código do WHENEVER, texto até o próximo WHENEVER)]
+    partes = re.split(r'^WHENEVER SQLERROR EXIT (\d+) ROLLBACK;\n', conteudo, flags=re.MULTILINE)
+    return [(int(codigo), texto.strip()) for codigo, texto in zip(partes[1::2], partes[2::2])]
+
+
+@pytest.mark.parametrize('carga_delta, pos_carga, codigos', [
+    (True, True, [1, 11, 12, 13, 3, 14, 15, 16]),
+    (False, True, [1, 11, 12, 13, 3, 15, 16]),
+    (False, False, [1, 11, 12, 13, 3, 16]),
+])
+def test_cada_fase_encerra_com_o_proprio_codigo(pasta_trabalho, monkeypatch, carga_delta, pos_carga, codigos):
+    monkeypatch.setattr(gso, 'POS_CARGA', pos_carga)
+
+    fases = _fases(_script_mestre(carga_delta))
+
+    assert [codigo for codigo, _ in fases] == codigos
+    assert {codigo for codigo, _ in fases} <= {codigo for codigo, _ in gso.FASES_SCRIPT_MESTRE.values()}
+    for codigo, texto in fases:
+        if codigo in INICIO_FASES:
+            assert texto.startswith(INICIO_FASES[codigo]), codigo
+    # Nenhum bloco troca o WHENEVER da sua fase (ex.: EXIT FAILURE de um script avulso)
+    assert all('WHENEVER' not in texto for _, texto in fases)
+
+
+def test_sqlldr_sai_com_o_codigo_da_carga(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'MODO_CARGA', 'sqlldr')
+
+    conteudo = _script_mestre()
+
+    carga = dict(_fases(conteudo))[3]
+    assert carga.startswith('PROMPT Executando a carga de dados via SQL Loader')
+    hospedeiro = carga.index(f'HOST powershell.exe -ExecutionPolicy Bypass -File '
+                             f'"{gso.caminho_na_pasta_vpn(gso.ARQUIVO_POWERSHELL_SQLLDR)}"')
+    # _RC é lido logo depois do HOST; um código fora de 0/2 dispara o erro da fase carga (EXIT 3)
+    assert carga.index('SET DEFINE ON\nDEFINE RC_CARGA = "&_RC"') > hospedeiro
+    assert "IF '&RC_CARGA' NOT IN ('0', '2') THEN" in carga
+    assert carga.endswith('SET DEFINE OFF')
+    # Código final: o da carga (0, ou 2 com linhas rejeitadas), com as substituições religadas
+    assert conteudo.endswith('\nSET DEFINE ON\nEXIT &RC_CARGA\n')
+    assert re.findall(r'^EXIT .*$', conteudo, flags=re.MULTILINE) == ['EXIT &RC_CARGA']
+
+
+def test_tabela_externa_sai_com_zero(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'MODO_CARGA', 'tabela_externa')
+
+    conteudo = _script_mestre(carga_delta=False)
+
+    assert '&RC_CARGA' not in conteudo
+    assert 'HOST ' not in conteudo
+    assert [codigo for codigo, _ in _fases(conteudo)][:5] == [1, 11, 12, 13, 3]
+    assert conteudo.endswith('\nEXIT 0\n')
+    assert re.findall(r'^EXIT .*$', conteudo, flags=re.MULTILINE) == ['EXIT 0']
+
+
+def test_batch_trata_cada_codigo_do_script_mestre(pasta_trabalho):
+    resultado_geracao = {'nome_tabela': 'TB_PLANOS', 'carga_delta': False, 'id_manifesto_delta': None}
+
+    batch = gso.gerar_bloco_batch_script_mestre(resultado_geracao)
+
+    assert f'"@!LOCAL_EXEC_PATH!\\{gso.ARQUIVO_SCRIPT_MESTRE_SQL}"\nset "MESTRE_RC=!ERRORLEVEL!"' in batch
+    assert 'if !MESTRE_RC! EQU 0 (' in batch
+    assert ') else if !MESTRE_RC! EQU 2 (' in batch
+    for codigo, descricao in gso.FASES_SCRIPT_MESTRE.values():
+        assert f'if !MESTRE_RC! EQU {codigo} echo ERRO CRITICO na fase: {descricao}.' in batch
@@ -0,0 +1,109 @@
+import csv
+import json
+import os
+
+import pandas as pd
+
+import gerar_scripts_oracle as gso
+
+
+def _gravar_arquivo_dados(cabecalho, linhas):
+    with open(gso.ARQUIVO_DADOS_PLANO, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=gso.CSV_DELIMITADOR_SAIDA, lineterminator=os.linesep)
+        writer.writerow(cabecalho)
+        writer.writerows(linhas)
+
+
+def _ler_csv(caminho):
+    with open(caminho, encoding='utf-8-sig', newline='') as f:
+        return list(csv.reader(f, delimiter=gso.CSV_DELIMITADOR_SAIDA))
+
+
+def _falhas(valores, oracle_type):
+    falhas = gso.validar_serie_pre_carga(pd.Series(valores, dtype=object), oracle_type)
+    return {motivo: mascara.fillna(False).astype(bool).tolist()
+            for motivo, mascara in falhas.items() if mascara.fillna(False).any()}
+
+
+def test_varchar2_em_bytes_conta_o_texto_multibyte_em_utf8():
+    # 'ção' tem 3 caracteres e 5 bytes: cabe em VARCHAR2(3 CHAR), não em VARCHAR2(4)
+    assert _falhas(['ção', 'abcd', ''], 'VARCHAR2(4)') == {'tamanho_varchar2': [True, False, False]}
+    assert _falhas(['ção', 'abcd', ''], 'VARCHAR2(3 CHAR)') == {'tamanho_varchar2': [False, True, False]}
+
+
+def test_varchar2_char_respeita_o_limite_de_4000_bytes():
+    # 1500 caracteres de 3 bytes cabem em VARCHAR2(2000 CHAR) pelos caracteres, mas passam dos 4000 bytes
+    assert _falhas(['€' * 1500, '€' * 1333], 'VARCHAR2(2000 CHAR)') == {'tamanho_varchar2': [True, False]}
+
+
+def test_number_com_precisao_e_valor_nao_numerico():
+    falhas = _falhas(['99999', '100000', '-100000', '12345.67', 'abc', ''], 'NUMBER(5)')
+    assert falhas == {'precisao_number': [False, True, True, False, False, False],
+                      'numero_invalido': [False, False, False, False, True, False]}
+    # NUMBER(5,2): só 3 dígitos antes da vírgula
+    assert _falhas(['999.99', '1000'], 'NUMBER(5,2)') == {'precisao_number': [False, True]}
+    assert _falhas(['1' * 40], 'NUMBER') == {}
+
+
+def test_data_fora_do_intervalo_do_pandas_e_valida():
+    falhas = _falhas(['9999-12-31 00:00:00', '0001-01-01 00:00:00', '2024-02-30 00:00:00', '31/12/2024', ''],
+                     'DATE')
+    assert falhas == {'data_invalida': [False, False, True, True, False]}
+
+
+def test_quebra_de_linha_no_campo():
+    assert _falhas(['linha1\nlinha2', 'linha1\r\nlinha2', 'ok'], 'VARCHAR2(4000)') == {
+        'quebra_de_linha': [True, True, False]}
+
+
+def test_arquivo_so_relata_por_padrao(pasta_trabalho):
+    _gravar_arquivo_dados(['NU_ID', 'NM_NOME'], [['1', 'ok'], ['x', 'ok'], ['3', 'com\nquebra']])
+
+    resumo = gso.validar_arquivo_dados_pre_carga(['"NU_ID" NUMBER(9)', '"NM_NOME" VARCHAR2(20 CHAR)'])
+
+    assert resumo['linhas'] == 3
+    assert resumo['linhas_rejeitadas'] == 2
+    assert resumo['removidas_do_arquivo'] is False
+    assert resumo['por_coluna'] == {'NU_ID': {'numero_invalido': 1}, 'NM_NOME': {'quebra_de_linha': 1}}
+    assert len(_ler_csv(gso.ARQUIVO_DADOS_PLANO)) == 4  # Arquivo de carga intacto
+    with open(gso.ARQUIVO_RESUMO_VALIDACAO, encoding='utf-8') as f:
+        assert json.load(f)['linhas_rejeitadas'] == 2
+
+
+def test_remover_rejeitadas_reescreve_o_arquivo_e_numera_as_linhas(pasta_trabalho, monkeypatch):
+    monkeypatch.setattr(gso, 'VALIDACAO_REMOVER_REJEITADAS', True)
+    monkeypatch.setattr(gso, 'CHUNKSIZE', 4)  # Rejeições em blocos diferentes
+    linhas = [[str(i), f'nome {i}', '2024-01-01 00:00:00'] for i in range(1, 11)]
+    linhas[1][0] = '1234567890'  # Linha de dados 2: precisão
+    linhas[5][1] = 'ç' * 21  # Linha 6: tamanho
+    linhas[8][2] = '9999-12-31 23:59:59'  # Linha 9: válida apesar de fora do intervalo do pandas
+    linhas[9][1] = 'com\r\nquebra'  # Linha 10: quebra de linha
+    _gravar_arquivo_dados(['NU_ID', 'NM_NOME', 'DT_DATA'], linhas)
+
+    resumo = gso.validar_arquivo_dados_pre_carga(
+        ['"NU_ID" NUMBER(9)', '"NM_NOME" VARCHAR2(20 CHAR)', '"DT_DATA" DATE'], linha_inicial_origem=5)
+
+    assert resumo['linhas_rejeitadas'] == 3
+    assert resumo['removidas_do_arquivo'] is True
+    rejeitadas = _ler_csv(gso.ARQUIVO_REJEITADAS_PRE_CARGA)
+    assert rejeitadas[0] == ['LINHA_DADOS', 'LINHA_ORIGEM', 'MOTIVOS', 'NU_ID', 'NM_NOME', 'DT_DATA']
+    assert [linha[:3] for linha in rejeitadas[1:]] == [['2', '6', 'NU_ID:precisao_number'],
+                                                        ['6', '10', 'NM_NOME:tamanho_varchar2'],
+                                                        ['10', '14', 'NM_NOME:quebra_de_linha']]
+    assert rejeitadas[3][4] == 'com\r\nquebra'
+    restantes = _ler_csv(gso.ARQUIVO_DADOS_PLANO)
+    assert restantes[0] == ['NU_ID', 'NM_NOME', 'DT_DATA']
+    assert [linha[0] for linha in restantes[1:]] == ['1', '3', '4', '5', '7', '8', '9']
+    assert restantes[-1] == ['9', 'nome 9', '9999-12-31 23:59:59']
+
+
+def test_sem_rejeicoes_remove_o_arquivo_de_uma_execucao_anterior(pasta_trabalho):
+    with open(gso.ARQUIVO_REJEITADAS_PRE_CARGA, 'w', encoding='utf-8') as f:
+        f.write('antigo\n')
+    _gravar_arquivo_dados(['NU_ID'], [['1'], ['2']])
+
+    resumo = gso.validar_arquivo_dados_pre_carga(['"NU_ID" NUMBER(1)'])
+
+    assert resumo['linhas_rejeitadas'] == 0
+    assert resumo['arquivo_rejeitadas'] is None
+    assert not os.path.exists(gso.ARQUIVO_REJEITADAS_PRE_CARGA)